@@ -0,0 +1,541 @@
+"""Teste de carga dos caminhos quentes da API, com baseline em JSON.
+
+Popula um banco com um volume realista (na escala 1: 100 mil usuários, 5 mil
+empresas, 50 mil vagas e 1 milhão de candidaturas), sobe a API com uvicorn
+e dispara requisições concorrentes contra login, listagem e detalhe de vagas,
+busca, caixa de candidaturas (ATS) e estatísticas. Para cada cenário reporta
+p50/p95/p99, vazão e consultas ao banco por requisição (lidas do ``/metrics``).
+
+O resultado sai em JSON. Com ``--baseline`` ele é comparado a uma execução
+anterior; p95 acima da tolerância ou mais consultas por requisição contam como
+regressão e o processo sai com código 1.
+
+Uso::
+
+    python benchmarks/load.py --scale 0.1 --output /tmp/load.json
+    python benchmarks/load.py --baseline benchmarks/load_baseline.json
+    DATABASE_URL=postgresql://... python benchmarks/load.py --scale 1
+    python benchmarks/load.py --database-url sqlite:////tmp/load.db --skip-seed
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+import json
+import os
+from pathlib import Path
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+
+FULL_SCALE = {
+	'usuarios': 100_000,
+	'empresas': 5_000,
+	'vagas': 50_000,
+	'candidaturas': 1_000_000,
+}
+SEED_BATCH_SIZE = 5_000
+SENHA = 'benchmark'
+ESTADOS = ('DF', 'SP', 'RJ', 'MG', 'RS', 'PR', 'BA', 'PE', 'CE', 'GO')
+CARGOS = ('Desenvolvedor', 'Analista de Dados', 'Designer', 'Gerente', 'QA')
+NIVEIS = ('Junior', 'Pleno', 'Senior', 'Executivo')
+CONTRATOS = ('CLT', 'Estagio')
+MODALIDADES = ('Presencial', 'Híbrido', 'Remoto')
+STATUS = ('Pendente', 'Em análise', 'Aceito', 'Rejeitado')
+TERMOS = ('python', 'dados', 'design', 'gerente', 'testes')
+
+QUERIES_METRIC = re.compile(
+	r'^http_request_db_queries_(sum|count)\{method="(\w+)",route="([^"]*)"\} (\S+)$'
+)
+
+
+def scaled(scale: float):
+	return {name: max(1, int(total * scale)) for name, total in FULL_SCALE.items()}
+
+
+def insertBatches(database, table, rows):
+	from sqlalchemy import insert
+
+	batch = []
+	for row in rows:
+		batch.append(row)
+		if len(batch) == SEED_BATCH_SIZE:
+			database.execute(insert(table), batch)
+			batch = []
+	if batch:
+		database.execute(insert(table), batch)
+
+
+def seed(database_url: str, scale: float, seed_value: int):
+	from sqlalchemy.orm import Session
+
+	from src.candidato.statistics import rebuildCandidatoStatistics
+	from src.counters import reconcileCounters
+	from src.database import createDatabaseEngine
+	from src.migrations import migrate
+	from src.models import (
+		Candidato,
+		Candidatura,
+		Empresa,
+		Gestor,
+		Usuario,
+		VagaDeEmprego,
+	)
+	from src.security import getPasswordHash
+	from src.vaga_de_emprego.salario import salarioColumns
+	from src.vaga_de_emprego.search import indexVagasDeEmprego
+
+	rng = random.Random(seed_value)
+	sizes = scaled(scale)
+	empresas = sizes['empresas']
+	usuarios = max(sizes['usuarios'], empresas + 1)
+	# Um gestor por empresa; os demais usuários são candidatos
+	candidatos = range(empresas + 1, usuarios + 1)
+	# Argon2 é caro de propósito: todos os usuários compartilham o mesmo hash
+	senha = getPasswordHash(SENHA)
+	hoje = date.today()
+
+	engine = createDatabaseEngine(database_url, name='load_seed')
+	migrate(engine)
+	started = time.perf_counter()
+	with Session(engine) as database:
+		insertBatches(
+			database,
+			Empresa.__table__,
+			(
+				{
+					'id_empresa': id,
+					'nome_empresa': f'Empresa {id}',
+					'cnpj': f'{id:014d}',
+					'cidade': 'Cidade',
+					'estado': rng.choice(ESTADOS),
+				}
+				for id in range(1, empresas + 1)
+			),
+		)
+		insertBatches(
+			database,
+			Usuario.__table__,
+			(
+				{
+					'id': id,
+					'nome': f'Usuario {id}',
+					'email': f'usuario{id}@example.com',
+					'senha': senha,
+					'papel': 'gestor' if id <= empresas else 'candidato',
+					'ativo': True,
+				}
+				for id in range(1, usuarios + 1)
+			),
+		)
+		insertBatches(
+			database,
+			Gestor.__table__,
+			(
+				{
+					'id_gestor': id,
+					'nome': f'Usuario {id}',
+					'email': f'usuario{id}@example.com',
+					'id_empresa': id,
+				}
+				for id in range(1, empresas + 1)
+			),
+		)
+		insertBatches(
+			database,
+			Candidato.__table__,
+			(
+				{
+					'id_candidato': id,
+					'nome': f'Usuario {id}',
+					'email': f'usuario{id}@example.com',
+					'estado': rng.choice(ESTADOS),
+				}
+				for id in candidatos
+			),
+		)
+
+		vagas = []
+		for id in range(1, sizes['vagas'] + 1):
+			cargo = rng.choice(CARGOS)
+			salario = f'{rng.randrange(2, 30) * 1000}.00'
+			vagas.append(
+				{
+					'id_vaga_de_emprego': id,
+					'id_empresa': rng.randint(1, empresas),
+					'nome_vaga_de_emprego': f'{cargo} {id}',
+					'data': hoje - timedelta(days=rng.randrange(365)),
+					'estado': rng.choice(ESTADOS),
+					'cidade': 'Cidade',
+					'salario': salario,
+					'cargo': cargo,
+					'nivel': rng.choice(NIVEIS),
+					'tipo_contrato': rng.choice(CONTRATOS),
+					'modalidade': rng.choice(MODALIDADES),
+					'descricao': f'Vaga de {cargo.lower()} com {rng.choice(TERMOS)}.',
+					**salarioColumns(salario),
+				}
+			)
+		insertBatches(database, VagaDeEmprego.__table__, vagas)
+		for inicio in range(0, len(vagas), SEED_BATCH_SIZE):
+			indexVagasDeEmprego(
+				[
+					VagaDeEmprego(**vaga)
+					for vaga in vagas[inicio : inicio + SEED_BATCH_SIZE]
+				],
+				database,
+			)
+
+		# Cada candidato se candidata a vagas distintas (índice único)
+		por_candidato = max(1, sizes['candidaturas'] // len(candidatos))
+		por_candidato = min(por_candidato, len(vagas))
+		agora = datetime.now()
+		insertBatches(
+			database,
+			Candidatura.__table__,
+			(
+				{
+					'id_candidato': id_candidato,
+					'id_vaga_de_emprego': id_vaga_de_emprego,
+					'status': rng.choice(STATUS),
+					'data': agora - timedelta(minutes=rng.randrange(525_600)),
+				}
+				for id_candidato in candidatos
+				for id_vaga_de_emprego in rng.sample(
+					range(1, len(vagas) + 1), por_candidato
+				)
+			),
+		)
+		reconcileCounters(database)
+		rebuildCandidatoStatistics(database)
+		database.commit()
+	engine.dispose()
+	return {
+		**sizes,
+		'usuarios': usuarios,
+		'candidaturas': len(candidatos) * por_candidato,
+		'seconds': time.perf_counter() - started,
+	}
+
+
+def freePort():
+	with socket.socket() as sock:
+		sock.bind(('127.0.0.1', 0))
+		return sock.getsockname()[1]
+
+
+def startServer(database_url: str, port: int):
+	env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=str(ROOT))
+	env.pop('ASYNC_DATABASE_URL', None)
+	return subprocess.Popen(
+		[
+			sys.executable,
+			'-m',
+			'uvicorn',
+			'src.main:app',
+			'--port',
+			str(port),
+			'--log-level',
+			'warning',
+			'--no-access-log',
+		],
+		cwd=ROOT,
+		env=env,
+	)
+
+
+async def waitForServer(client, process, timeout: float = 30):
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		if process.poll() is not None:
+			raise RuntimeError('uvicorn terminou antes de aceitar conexões')
+		try:
+			await client.get('/')
+			return
+		except Exception:
+			await asyncio.sleep(0.2)
+	raise RuntimeError('uvicorn não respondeu a tempo')
+
+
+async def login(client, id_usuario: int):
+	response = await client.post(
+		'/auth/login',
+		data={'username': f'usuario{id_usuario}@example.com', 'password': SENHA},
+	)
+	response.raise_for_status()
+	return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def makeScenarios(sizes: dict, tokens: dict, rng: random.Random):
+	# Cada cenário: (método, template da rota no /metrics, função que monta o
+	# pedido). O template casa com o label route do http_request_db_queries
+	empresas = sizes['empresas']
+	vagas = sizes['vagas']
+	candidatos = list(tokens['candidatos'])
+
+	def listagem():
+		params = {'limit': 20}
+		if rng.random() < 0.5:
+			params['estado'] = rng.choice(ESTADOS)
+		if rng.random() < 0.3:
+			params['nivel'] = rng.choice(NIVEIS)
+		if rng.random() < 0.2:
+			params['ordenacao'] = 'salario'
+		return {'url': '/vagas_de_emprego/', 'params': params}
+
+	def candidatoStats():
+		id_candidato = rng.choice(candidatos)
+		return {
+			'url': f'/candidatos/{id_candidato}/stats',
+			'headers': tokens['candidatos'][id_candidato],
+		}
+
+	return {
+		'login': (
+			'POST',
+			'/auth/login',
+			lambda: {
+				'url': '/auth/login',
+				'data': {
+					'username': f'usuario{rng.randint(1, sizes["usuarios"])}@example.com',
+					'password': SENHA,
+				},
+			},
+		),
+		'vagas_listagem': ('GET', '/vagas_de_emprego/', listagem),
+		'vaga_detalhe': (
+			'GET',
+			'/vagas_de_emprego/{id_vaga_de_emprego}',
+			lambda: {'url': f'/vagas_de_emprego/{rng.randint(1, vagas)}'},
+		),
+		'vagas_busca': (
+			'GET',
+			'/vagas_de_emprego/search',
+			lambda: {
+				'url': '/vagas_de_emprego/search',
+				'params': {'q': rng.choice(TERMOS)},
+			},
+		),
+		'ats_inbox': (
+			'GET',
+			'/vagas_de_emprego/{id_vaga_de_emprego}/candidaturas',
+			lambda: {
+				'url': f'/vagas_de_emprego/{rng.randint(1, vagas)}/candidaturas',
+				'params': {'limit': 20},
+			},
+		),
+		'empresa_stats': (
+			'GET',
+			'/empresas/{id_empresa}/stats',
+			lambda: {
+				'url': f'/empresas/{rng.randint(1, empresas)}/stats',
+				'headers': tokens['gestor'],
+			},
+		),
+		'candidato_stats': (
+			'GET',
+			'/candidatos/{id_candidato}/stats',
+			candidatoStats,
+		),
+	}
+
+
+async def queryTotals(client):
+	# (método, rota) → [soma de consultas, requisições], do processo do uvicorn
+	totals = {}
+	response = await client.get('/metrics')
+	for line in response.text.splitlines():
+		match = QUERIES_METRIC.match(line)
+		if match:
+			kind, method, route, value = match.groups()
+			totals.setdefault((method, route), [0.0, 0.0])[
+				0 if kind == 'sum' else 1
+			] = float(value)
+	return totals
+
+
+def percentile(latencies: list, percent: int):
+	if len(latencies) == 1:
+		return latencies[0]
+	return statistics.quantiles(latencies, n=100, method='inclusive')[percent - 1]
+
+
+async def runScenario(client, method, route, build, requests: int, concurrency: int):
+	import httpx
+
+	latencies = []
+	errors = 0
+	pending = iter(range(requests))
+
+	async def worker():
+		nonlocal errors
+		for _ in pending:
+			started = time.perf_counter()
+			try:
+				response = await client.request(method, **build())
+				failed = response.status_code >= 400
+			except httpx.HTTPError:
+				# Conexão derrubada pelo servidor (ex.: timeout do pool) conta
+				# como erro, sem interromper o cenário
+				failed = True
+			latencies.append(time.perf_counter() - started)
+			errors += failed
+
+	before = await queryTotals(client)
+	started = time.perf_counter()
+	await asyncio.gather(*(worker() for _ in range(concurrency)))
+	seconds = time.perf_counter() - started
+	after = await queryTotals(client)
+
+	queries, count = (
+		after.get((method, route), [0, 0])[index]
+		- before.get((method, route), [0, 0])[index]
+		for index in (0, 1)
+	)
+	return {
+		'requests': requests,
+		'errors': errors,
+		'seconds': seconds,
+		'throughput': requests / seconds,
+		'mean_ms': statistics.fmean(latencies) * 1000,
+		'p50_ms': percentile(latencies, 50) * 1000,
+		'p95_ms': percentile(latencies, 95) * 1000,
+		'p99_ms': percentile(latencies, 99) * 1000,
+		'queries_per_request': queries / count if count else None,
+	}
+
+
+async def drive(database_url: str, sizes: dict, args):
+	import httpx
+
+	port = freePort()
+	process = startServer(database_url, port)
+	rng = random.Random(args.seed)
+	try:
+		async with httpx.AsyncClient(
+			base_url=f'http://127.0.0.1:{port}',
+			timeout=60,
+			limits=httpx.Limits(max_connections=args.concurrency),
+		) as client:
+			await waitForServer(client, process)
+			ids_candidatos = rng.sample(
+				range(sizes['empresas'] + 1, sizes['usuarios'] + 1),
+				min(10, sizes['usuarios'] - sizes['empresas']),
+			)
+			tokens = {
+				'gestor': await login(client, 1),
+				'candidatos': {id: await login(client, id) for id in ids_candidatos},
+			}
+			scenarios = makeScenarios(sizes, tokens, rng)
+			results = {}
+			for name, (method, route, build) in scenarios.items():
+				if args.scenarios and name not in args.scenarios:
+					continue
+				# Aquecimento: conexões do pool, caches e planos de consulta
+				for _ in range(min(args.concurrency, args.requests)):
+					await client.request(method, **build())
+				requests = args.login_requests if name == 'login' else args.requests
+				results[name] = await runScenario(
+					client, method, route, build, requests, args.concurrency
+				)
+			return results
+	finally:
+		process.terminate()
+		process.wait()
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+	regressions = []
+	for name, result in results['scenarios'].items():
+		reference = baseline['scenarios'].get(name)
+		if reference is None:
+			continue
+		if result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+			regressions.append(
+				f'{name}: p95 {result["p95_ms"]:.1f} ms'
+				f' (baseline {reference["p95_ms"]:.1f} ms)'
+			)
+		# Frações vêm de caches que expiram no meio da rodada (usuário do token);
+		# uma consulta nova por requisição passa com folga desta margem
+		if (
+			result['queries_per_request'] is not None
+			and reference['queries_per_request'] is not None
+			and result['queries_per_request'] > reference['queries_per_request'] + 0.5
+		):
+			regressions.append(
+				f'{name}: {result["queries_per_request"]:.2f} consultas por requisição'
+				f' (baseline {reference["queries_per_request"]:.2f})'
+			)
+		if result['errors'] > reference['errors']:
+			regressions.append(
+				f'{name}: {result["errors"]} erros (baseline {reference["errors"]})'
+			)
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument(
+		'--scale', type=float, default=0.05, help='1 = 100k usuários e 1M candidaturas'
+	)
+	parser.add_argument('--concurrency', type=int, default=8)
+	parser.add_argument('--requests', type=int, default=1000)
+	parser.add_argument('--login-requests', type=int, default=100)
+	parser.add_argument('--scenarios', nargs='*')
+	parser.add_argument('--seed', type=int, default=42)
+	parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'))
+	parser.add_argument(
+		'--skip-seed',
+		action='store_true',
+		help='Reusa um banco já populado com a mesma --scale',
+	)
+	parser.add_argument('--output')
+	parser.add_argument('--baseline')
+	parser.add_argument('--tolerance', type=float, default=0.25)
+	args = parser.parse_args()
+
+	sys.path.insert(0, str(ROOT))
+	with tempfile.TemporaryDirectory() as directory:
+		database_url = args.database_url or f'sqlite:///{directory}/load.db'
+		sizes = scaled(args.scale)
+		seeded = None
+		if not args.skip_seed:
+			seeded = seed(database_url, args.scale, args.seed)
+			sizes.update({name: seeded[name] for name in FULL_SCALE})
+		scenarios = asyncio.run(drive(database_url, sizes, args))
+
+	results = {
+		'config': {
+			'database': database_url.split(':', 1)[0],
+			'scale': args.scale,
+			'concurrency': args.concurrency,
+			'seed': args.seed,
+			'dataset': sizes,
+		},
+		'scenarios': scenarios,
+	}
+	if seeded:
+		results['config']['seed_seconds'] = seeded['seconds']
+	print(json.dumps(results, indent=2))
+	if args.output:
+		Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+
+	if args.baseline:
+		regressions = compare(
+			results, json.loads(Path(args.baseline).read_text()), args.tolerance
+		)
+		for regression in regressions:
+			print(f'REGRESSÃO {regression}', file=sys.stderr)
+		if regressions:
+			sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
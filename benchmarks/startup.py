@@ -0,0 +1,116 @@
+"""Mede o tempo de subida da API e as instruções SQL executadas no boot.
+
+Compara o comportamento antigo (um ``Base.metadata.create_all`` por router,
+nove no total) com a checagem única de versão do schema feita hoje no
+``lifespan`` do ``src.main``. Cada amostra roda num processo novo, para medir
+uma subida a frio.
+
+Uso::
+
+    python benchmarks/startup.py --runs 7
+    DATABASE_URL=postgresql://... python benchmarks/startup.py
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+LEGACY_CREATE_ALL_CALLS = 9
+
+
+def runChild(mode: str):
+	started = time.perf_counter()
+
+	from sqlalchemy import event
+
+	from src.database import Base, engine
+	from src.main import app  # noqa: F401
+	from src.migrations import checkSchemaVersion
+
+	imported = time.perf_counter()
+	statements = 0
+
+	@event.listens_for(engine, 'before_cursor_execute')
+	def countStatement(*args):
+		nonlocal statements
+		statements += 1
+
+	if mode == 'legacy':
+		for _ in range(LEGACY_CREATE_ALL_CALLS):
+			Base.metadata.create_all(bind=engine)
+	else:
+		checkSchemaVersion(engine)
+
+	finished = time.perf_counter()
+	print(
+		json.dumps(
+			{
+				'import_seconds': imported - started,
+				'schema_seconds': finished - imported,
+				'total_seconds': finished - started,
+				'statements': statements,
+			}
+		)
+	)
+
+
+def sample(mode: str, env: dict):
+	output = subprocess.run(
+		[sys.executable, __file__, '--child', mode],
+		cwd=ROOT,
+		env=env,
+		check=True,
+		capture_output=True,
+		text=True,
+	).stdout
+	return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples: list):
+	return {key: statistics.median(item[key] for item in samples) for key in samples[0]}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--runs', type=int, default=5)
+	parser.add_argument('--child', choices=['legacy', 'current'])
+	args = parser.parse_args()
+
+	if args.child:
+		sys.path.insert(0, str(ROOT))
+		runChild(args.child)
+		return
+
+	env = dict(os.environ, PYTHONPATH=str(ROOT))
+	with tempfile.TemporaryDirectory() as directory:
+		env.setdefault('DATABASE_URL', f'sqlite:///{directory}/startup.db')
+		# Banco já migrado: é o estado de todo boot depois do primeiro deploy
+		subprocess.run(
+			[sys.executable, '-m', 'src.migrations'],
+			cwd=ROOT,
+			env=env,
+			check=True,
+			capture_output=True,
+		)
+		results = {
+			mode: summarize([sample(mode, env) for _ in range(args.runs)])
+			for mode in ('legacy', 'current')
+		}
+
+	results['runs'] = args.runs
+	results['database'] = env['DATABASE_URL'].split(':', 1)[0]
+	results['schema_speedup'] = results['legacy']['schema_seconds'] / max(
+		results['current']['schema_seconds'], 1e-9
+	)
+	print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+	main()
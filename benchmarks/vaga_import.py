@@ -0,0 +1,171 @@
+"""Mede a importação de vagas em lote contra o cadastro uma a uma.
+
+O caminho antigo repete, para cada vaga, o que o ``POST /vagas_de_emprego/``
+faz: busca o usuário do token, valida o ``VagaDeEmpregoBase``, insere, indexa
+para a busca e faz commit. O caminho novo lê o mesmo CSV com
+``readCsvRows`` e passa por ``VagaDeEmpregoRepository.importVagasDeEmprego``
+(lotes com executemany e um commit por lote).
+
+Uso::
+
+    python benchmarks/vaga_import.py --rows 10000
+    DATABASE_URL=postgresql://... python benchmarks/vaga_import.py
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CSV_COLUMNS = (
+	'nome_vaga_de_emprego',
+	'id_empresa',
+	'data',
+	'estado',
+	'cidade',
+	'salario',
+	'cargo',
+	'nivel',
+	'tipo_contrato',
+	'modalidade',
+	'descricao',
+)
+NIVEIS = ('Junior', 'Pleno', 'Senior', 'Executivo')
+MODALIDADES = ('Presencial', 'Híbrido', 'Remoto')
+
+
+def makeCsv(rows: int):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(CSV_COLUMNS)
+	for i in range(rows):
+		writer.writerow(
+			(
+				f'Desenvolvedor {i}',
+				1,
+				'2024-05-01',
+				'DF',
+				'Gama',
+				'9000.00',
+				'Desenvolvedor',
+				NIVEIS[i % len(NIVEIS)],
+				'CLT',
+				MODALIDADES[i % len(MODALIDADES)],
+				f'Vaga {i} para desenvolvimento com Python, SQL e FastAPI.',
+			)
+		)
+	return buffer.getvalue().encode()
+
+
+def seed(engine):
+	from sqlalchemy.orm import Session
+
+	from src.migrations import migrate
+	from src.models import Empresa, Gestor, Usuario
+
+	migrate(engine)
+	with Session(engine) as database:
+		database.merge(
+			Empresa(
+				id_empresa=1,
+				nome_empresa='Empresa G',
+				cnpj='12345671234567',
+				cidade='Gama',
+				estado='DF',
+			)
+		)
+		database.merge(
+			Usuario(
+				id=1,
+				nome='Gestor',
+				email='gestor@example.com',
+				senha='x',
+				papel='gestor',
+			)
+		)
+		database.merge(
+			Gestor(id_gestor=1, nome='Gestor', email='gestor@example.com', id_empresa=1)
+		)
+		database.commit()
+
+
+def importOneByOne(engine, payload: bytes):
+	from sqlalchemy.orm import sessionmaker
+
+	from src.models import Usuario, VagaDeEmprego
+	from src.vaga_de_emprego.importer import readCsvRows
+	from src.vaga_de_emprego.repository import VagaDeEmpregoRepository
+	from src.vaga_de_emprego.schema import VagaDeEmpregoBase
+
+	SessionLocal = sessionmaker(bind=engine, autoflush=False)
+	for _, dados in readCsvRows(io.BytesIO(payload)):
+		# Uma requisição por vaga: sessão nova, usuário do token, insert e commit
+		with SessionLocal() as database:
+			database.get(Usuario, 1)
+			vaga_de_emprego = VagaDeEmpregoBase.model_validate(dados)
+			VagaDeEmpregoRepository.createVagaDeEmprego(
+				VagaDeEmprego(**vaga_de_emprego.model_dump()), database
+			)
+
+
+def importBulk(engine, payload: bytes):
+	from sqlalchemy.orm import sessionmaker
+
+	from src.vaga_de_emprego.importer import readCsvRows
+	from src.vaga_de_emprego.repository import VagaDeEmpregoRepository
+
+	SessionLocal = sessionmaker(bind=engine, autoflush=False)
+	with SessionLocal() as database:
+		return VagaDeEmpregoRepository.importVagasDeEmprego(
+			readCsvRows(io.BytesIO(payload)), database
+		)
+
+
+def measure(mode: str, database_url: str, payload: bytes, rows: int):
+	from src.database import createDatabaseEngine
+
+	engine = createDatabaseEngine(database_url, name=f'benchmark_{mode}')
+	try:
+		seed(engine)
+		started = time.perf_counter()
+		if mode == 'one_by_one':
+			importOneByOne(engine, payload)
+		else:
+			importBulk(engine, payload)
+		seconds = time.perf_counter() - started
+	finally:
+		engine.dispose()
+	return {'seconds': seconds, 'rows_per_second': rows / seconds}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--rows', type=int, default=10_000)
+	args = parser.parse_args()
+
+	sys.path.insert(0, str(ROOT))
+	payload = makeCsv(args.rows)
+	results = {'rows': args.rows}
+	with tempfile.TemporaryDirectory() as directory:
+		for mode in ('one_by_one', 'bulk'):
+			# Banco novo por modo no SQLite; com DATABASE_URL os dois modos
+			# gravam no mesmo banco, então use um descartável
+			database_url = os.getenv('DATABASE_URL') or (
+				f'sqlite:///{directory}/{mode}.db'
+			)
+			results[mode] = measure(mode, database_url, payload, args.rows)
+
+	results['database'] = os.getenv('DATABASE_URL', 'sqlite').split(':', 1)[0]
+	results['speedup'] = results['one_by_one']['seconds'] / results['bulk']['seconds']
+	print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+	main()
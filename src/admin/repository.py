@@ -1,30 +1,34 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from ..auth.cache import usuario_cache
+from ..counters import getCounters, reconcileCounters
 from ..database import getDatabase
-from ..models import Candidato, Usuario, Empresa, VagaDeEmprego, Candidatura
+from ..models import Usuario
 
 
 class AdminRepository:
 	def getStatistics(database: Session = Depends(getDatabase)):
-		usuarios_totais = database.query(Usuario).count()
-		candidatos_totais = database.query(Candidato).count()
-		empresas_totais = database.query(Empresa).count()
-		vagas_totais = database.query(VagaDeEmprego).count()
-		candidaturas_totais = database.query(Candidatura).count()
+		counters = getCounters(database)
 
 		return {
-			'usuarios_totais': usuarios_totais,
-			'candidatos_totais': candidatos_totais,
-			'empresas_totais': empresas_totais,
-			'vagas_totais': vagas_totais,
-			'candidaturas_totais': candidaturas_totais,
+			'usuarios_totais': counters.usuarios,
+			'candidatos_totais': counters.candidatos,
+			'empresas_totais': counters.empresas,
+			'vagas_totais': counters.vagas,
+			'candidaturas_totais': counters.candidaturas,
 		}
 
+	def reconcileStatistics(database: Session = Depends(getDatabase)):
+		drift = reconcileCounters(database)
+		database.commit()
+		return drift
+
 	def toggleUserStatus(
 		new_status: bool, usuario: Usuario, database: Session = Depends(getDatabase)
 	):
 		usuario.ativo = new_status
 		database.commit()
 		database.refresh(usuario)
+		usuario_cache.invalidate(usuario.email, usuario.id)
 		return True
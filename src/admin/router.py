@@ -4,16 +4,24 @@ from sqlalchemy.orm import Session
 from ..models import Usuario
 from ..usuario.repository import UsuarioRepository
 
-from .schema import StatsBase, ToggleStatusRequest
+from .schema import (
+	PoolStatisticsResponse,
+	ReconcileStatsResponse,
+	ResponseCacheStatisticsResponse,
+	StatsBase,
+	ToggleStatusRequest,
+	ToggleStatusResponse,
+	UsuarioCacheStatisticsResponse,
+)
 
 from .repository import AdminRepository
 
+from ..auth.cache import usuario_cache
 from ..auth.repository import requireAdmin
 
-from ..database import engine, Base, getDatabase
-
+from ..database import getDatabase, getPoolStatistics
+from ..response_cache import response_cache
 
-Base.metadata.create_all(bind=engine)
 
 router = APIRouter(
 	prefix='/admin',
@@ -31,7 +39,32 @@ async def getAdminStatistics(
 	return statistics
 
 
-@router.put('/toggle_user_status/{id_usuario}')
+@router.post('/stats/reconcile', response_model=ReconcileStatsResponse)
+async def reconcileAdminStatistics(
+	database: Session = Depends(getDatabase),
+	current_user: Usuario = Depends(requireAdmin),
+):
+	drift = AdminRepository.reconcileStatistics(database)
+	statistics = AdminRepository.getStatistics(database)
+	return {'statistics': statistics, 'drift': drift}
+
+
+@router.get('/cache/usuarios', response_model=UsuarioCacheStatisticsResponse)
+async def getUsuarioCacheStatistics(current_user: Usuario = Depends(requireAdmin)):
+	return usuario_cache.stats()
+
+
+@router.get('/cache/respostas', response_model=ResponseCacheStatisticsResponse)
+async def getResponseCacheStatistics(current_user: Usuario = Depends(requireAdmin)):
+	return response_cache.stats()
+
+
+@router.get('/database/pool', response_model=dict[str, PoolStatisticsResponse])
+async def getDatabasePoolStatistics(current_user: Usuario = Depends(requireAdmin)):
+	return getPoolStatistics()
+
+
+@router.put('/toggle_user_status/{id_usuario}', response_model=ToggleStatusResponse)
 async def toggleUserStatus(
 	id_usuario: int,
 	payload: ToggleStatusRequest,
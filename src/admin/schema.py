@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -9,5 +11,49 @@ class StatsBase(BaseModel):
 	candidaturas_totais: int
 
 
+class ReconcileStatsResponse(BaseModel):
+	statistics: StatsBase
+	drift: dict[str, int]
+
+
 class ToggleStatusRequest(BaseModel):
 	new_status: bool
+
+
+class ToggleStatusResponse(BaseModel):
+	status: str
+	new_status: bool
+
+
+class UsuarioCacheStatisticsResponse(BaseModel):
+	hits: int
+	misses: int
+	hit_ratio: float
+	size: int
+	maxsize: int
+	ttl: float
+
+
+class ResponseCacheStatisticsResponse(BaseModel):
+	hits: int
+	shared_hits: int
+	misses: int
+	hit_ratio: float
+	invalidations: int
+	size: int
+	maxsize: int
+	bytes: int
+	max_bytes: int
+	ttl: float
+	shared: bool
+
+
+class PoolStatisticsResponse(BaseModel):
+	pool: str
+	size: Optional[int] = None
+	checked_out: Optional[int] = None
+	overflow: Optional[int] = None
+	connections: int
+	checkouts: int
+	checkins: int
+	invalidations: int
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+from threading import Lock
+import time
+
+from ..models import Papel, Usuario
+
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', 30))
+
+
+@dataclass(frozen=True)
+class UsuarioSnapshot:
+	id: int
+	nome: str
+	email: str
+	papel: Papel
+	ativo: bool
+
+	@classmethod
+	def fromUsuario(cls, usuario: Usuario):
+		return cls(
+			id=usuario.id,
+			nome=usuario.nome,
+			email=usuario.email,
+			papel=usuario.papel,
+			ativo=usuario.ativo,
+		)
+
+
+class UsuarioCache:
+	def __init__(self, maxsize: int, ttl: float):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.hits = 0
+		self.misses = 0
+		self._entries = OrderedDict()
+		self._emails_by_id = {}
+		self._lock = Lock()
+
+	def get(self, email: str):
+		with self._lock:
+			entry = self._entries.get(email)
+			if entry is None:
+				self.misses += 1
+				return None
+			expires_at, snapshot = entry
+			if expires_at < time.monotonic():
+				self._remove(email)
+				self.misses += 1
+				return None
+			self._entries.move_to_end(email)
+			self.hits += 1
+			return snapshot
+
+	def set(self, snapshot: UsuarioSnapshot):
+		if self.maxsize <= 0:
+			return
+		with self._lock:
+			self._remove(self._emails_by_id.get(snapshot.id))
+			self._entries[snapshot.email] = (time.monotonic() + self.ttl, snapshot)
+			self._emails_by_id[snapshot.id] = snapshot.email
+			while len(self._entries) > self.maxsize:
+				self._remove(next(iter(self._entries)))
+
+	def invalidate(self, email: str = None, id_usuario: int = None):
+		with self._lock:
+			self._remove(email)
+			self._remove(self._emails_by_id.get(id_usuario))
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._emails_by_id.clear()
+			self.hits = 0
+			self.misses = 0
+
+	def stats(self):
+		with self._lock:
+			total = self.hits + self.misses
+			return {
+				'hits': self.hits,
+				'misses': self.misses,
+				'hit_ratio': self.hits / total if total else 0.0,
+				'size': len(self._entries),
+				'maxsize': self.maxsize,
+				'ttl': self.ttl,
+			}
+
+	def _remove(self, email: str):
+		entry = self._entries.pop(email, None) if email is not None else None
+		if entry is not None:
+			_, snapshot = entry
+			if self._emails_by_id.get(snapshot.id) == email:
+				del self._emails_by_id[snapshot.id]
+
+
+usuario_cache = UsuarioCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
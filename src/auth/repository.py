@@ -8,7 +8,8 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from ..database import getDatabase
-from ..security import verifyPassword
+from ..security import verifyAndUpdatePasswordAsync
+from .cache import UsuarioSnapshot, usuario_cache
 from .schema import TokenData
 from ..usuario.repository import UsuarioRepository
 from ..models import Usuario
@@ -43,14 +44,19 @@ def createRefreshToken(data: dict):
 	return refresh_token
 
 
-def authenticateUser(
+async def authenticateUser(
 	username: str, senha: str, database: Session = Depends(getDatabase)
 ):
 	user = UsuarioRepository.getUsuarioByEmail(username, database)
 	if not user:
 		return False
-	if not verifyPassword(senha, user.senha):
+	valid, updated_hash = await verifyAndUpdatePasswordAsync(senha, user.senha)
+	if not valid:
 		return False
+	# Hash gerado com parâmetros antigos do Argon2: regrava com os atuais
+	if updated_hash:
+		user.senha = updated_hash
+		database.commit()
 	return user
 
 
@@ -70,9 +76,13 @@ async def getCurrentUser(
 		token_data = TokenData(username=username)
 	except InvalidTokenError:
 		raise credentials_exception from InvalidTokenError
-	user = UsuarioRepository.getUsuarioByEmail(token_data.username, database)
+	user = usuario_cache.get(token_data.username)
 	if user is None:
-		raise credentials_exception
+		usuario = UsuarioRepository.getUsuarioByEmail(token_data.username, database)
+		if usuario is None:
+			raise credentials_exception
+		user = UsuarioSnapshot.fromUsuario(usuario)
+		usuario_cache.set(user)
 	return user
 
 
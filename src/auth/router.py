@@ -11,7 +11,8 @@ from src.models import Usuario
 from src.usuario.repository import UsuarioRepository
 from src.usuario.schema import AuthResponse, UsuarioResponse
 
-from ..database import engine, Base, getDatabase
+from ..database import getDatabase
+from .schema import AccessTokenResponse
 from .repository import (
 	authenticateUser,
 	createAccessToken,
@@ -25,8 +26,6 @@ SECRET_KEY = os.getenv(
 ALGORITHM = os.getenv('ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', 30)
 
-Base.metadata.create_all(bind=engine)
-
 router = APIRouter(
 	prefix='/auth',
 	tags=['auth'],
@@ -39,7 +38,7 @@ async def login(
 	form_data: OAuth2PasswordRequestForm = Depends(),
 	database: Session = Depends(getDatabase),
 ):
-	user = authenticateUser(form_data.username, form_data.password, database)
+	user = await authenticateUser(form_data.username, form_data.password, database)
 	if not user:
 		raise HTTPException(
 			status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,11 +55,10 @@ async def login(
 		data={'sub': user.email}, expires_delta=access_token_expires
 	)
 	refresh_token = createRefreshToken({'sub': user.email})
-	usuario = UsuarioRepository.getUsuarioByEmail(user.email, database)
 	return {
 		'access_token': access_token,
 		'refresh_token': refresh_token,
-		'user': UsuarioResponse.model_validate(usuario),
+		'user': UsuarioResponse.model_validate(user),
 	}
 
 
@@ -69,7 +67,7 @@ async def get_me(current_user: Usuario = Depends(getCurrentActiveUser)):
 	return current_user
 
 
-@router.post('/refresh')
+@router.post('/refresh', response_model=AccessTokenResponse)
 def refresh_token(
 	refresh_token: str = Body(...), database: Session = Depends(getDatabase)
 ):
@@ -7,5 +7,9 @@ class Token(BaseModel):
 	token_type: str
 
 
+class AccessTokenResponse(BaseModel):
+	access_token: str
+
+
 class TokenData(BaseModel):
 	username: str | None = None
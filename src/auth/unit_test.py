@@ -0,0 +1,149 @@
+import asyncio
+import sys
+from pathlib import Path
+import pytest
+from fastapi import HTTPException
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from ..models import Candidato, Gestor, Usuario
+from .cache import UsuarioCache, UsuarioSnapshot, usuario_cache
+from .repository import authenticateUser, createAccessToken, getCurrentUser
+from .. import security
+from ..admin.repository import AdminRepository
+from ..candidato.repository import CandidatoRepository
+from ..gestor.repository import GestorRepository
+from ..usuario.repository import UsuarioRepository
+
+
+def make_snapshot(id, email, ativo=True):
+	return UsuarioSnapshot(
+		id=id, nome='Teste', email=email, papel='candidato', ativo=ativo
+	)
+
+
+@pytest.fixture(autouse=True)
+def clear_usuario_cache():
+	usuario_cache.clear()
+	yield
+	usuario_cache.clear()
+
+
+def test_get_UsuarioCache():
+	cache = UsuarioCache(maxsize=2, ttl=60)
+	cache.set(make_snapshot(1, 'joao@example.com'))
+
+	assert cache.get('joao@example.com').id == 1
+	assert cache.get('maria@example.com') is None
+	assert cache.stats()['hits'] == 1
+	assert cache.stats()['misses'] == 1
+
+
+def test_lruEviction_UsuarioCache():
+	cache = UsuarioCache(maxsize=2, ttl=60)
+	cache.set(make_snapshot(1, 'joao@example.com'))
+	cache.set(make_snapshot(2, 'maria@example.com'))
+	cache.get('joao@example.com')
+	cache.set(make_snapshot(3, 'carlos@example.com'))
+
+	assert cache.get('maria@example.com') is None
+	assert cache.get('joao@example.com') is not None
+	assert cache.stats()['size'] == 2
+
+
+def test_ttlExpiration_UsuarioCache():
+	cache = UsuarioCache(maxsize=2, ttl=-1)
+	cache.set(make_snapshot(1, 'joao@example.com'))
+
+	assert cache.get('joao@example.com') is None
+	assert cache.stats()['size'] == 0
+
+
+def test_invalidateById_UsuarioCache():
+	cache = UsuarioCache(maxsize=2, ttl=60)
+	cache.set(make_snapshot(1, 'joao@example.com'))
+	cache.invalidate(id_usuario=1)
+
+	assert cache.get('joao@example.com') is None
+
+
+def test_snapshotIsImmutable():
+	snapshot = make_snapshot(1, 'joao@example.com')
+	with pytest.raises(AttributeError):
+		snapshot.ativo = False
+
+
+def test_toggleUserStatus_invalidatesCache(db):
+	usuario = UsuarioRepository.createUsuario(
+		Usuario(nome='João', email='joao@example.com', senha='123', papel='candidato'),
+		db,
+	)
+	usuario_cache.set(UsuarioSnapshot.fromUsuario(usuario))
+
+	AdminRepository.toggleUserStatus(False, usuario, db)
+
+	assert usuario_cache.get('joao@example.com') is None
+
+
+@pytest.mark.parametrize('papel', ['candidato', 'gestor'])
+def test_deletePerfil_rejectsToken(papel, db):
+	usuario = UsuarioRepository.createUsuario(
+		Usuario(nome='João', email='joao@example.com', senha='123', papel=papel), db
+	)
+	if papel == 'candidato':
+		perfil = Candidato(id_candidato=usuario.id, nome='João', email=usuario.email)
+		db.add(perfil)
+	else:
+		perfil = Gestor(id_gestor=usuario.id, nome='João', email=usuario.email)
+		db.add(perfil)
+	db.commit()
+	token = createAccessToken({'sub': usuario.email})
+	# Primeira requisição guarda o snapshot do usuário no cache
+	assert asyncio.run(getCurrentUser(token, db)).id == usuario.id
+
+	if papel == 'candidato':
+		CandidatoRepository.deleteCandidato(perfil, db)
+	else:
+		GestorRepository.deleteGestor(perfil, db)
+
+	with pytest.raises(HTTPException) as error:
+		asyncio.run(getCurrentUser(token, db))
+	assert error.value.status_code == 401
+
+
+def test_authenticateUser(db):
+	senha = asyncio.run(security.getPasswordHashAsync('segredo'))
+	UsuarioRepository.createUsuario(
+		Usuario(nome='João', email='joao@example.com', senha=senha, papel='candidato'),
+		db,
+	)
+
+	assert asyncio.run(authenticateUser('joao@example.com', 'segredo', db))
+	assert not asyncio.run(authenticateUser('joao@example.com', 'errada', db))
+
+
+def test_outdatedHash_authenticateUser(db):
+	senha_antiga = Argon2Hasher(time_cost=1, memory_cost=1024).hash('segredo')
+	usuario = UsuarioRepository.createUsuario(
+		Usuario(
+			nome='João', email='joao@example.com', senha=senha_antiga, papel='candidato'
+		),
+		db,
+	)
+
+	result = asyncio.run(authenticateUser('joao@example.com', 'segredo', db))
+
+	assert result.id == usuario.id
+	assert usuario.senha != senha_antiga
+	assert not security.password_hash.current_hasher.check_needs_rehash(usuario.senha)
+	assert security.verifyPassword('segredo', usuario.senha)
+
+
+def test_queueFull_getPasswordHashAsync(monkeypatch):
+	monkeypatch.setattr(security, 'PASSWORD_HASH_QUEUE_SIZE', 0)
+
+	with pytest.raises(HTTPException) as error:
+		asyncio.run(security.getPasswordHashAsync('segredo'))
+	assert error.value.status_code == 503
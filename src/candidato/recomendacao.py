@@ -0,0 +1,411 @@
+from datetime import datetime
+import logging
+import os
+import re
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import (
+	Candidato,
+	CandidatoRecomendacao,
+	Candidatura,
+	Experiencia,
+	RecomendacaoPendente,
+	VagaDeEmprego,
+)
+
+logger = logging.getLogger(__name__)
+
+RECOMENDACAO_TOP_K = int(os.getenv('RECOMENDACAO_TOP_K', 50))
+# Dimensão do hashing de termos: colisões ficam raras sem guardar vocabulário
+RECOMENDACAO_FEATURES = 2**18
+# Candidatos por multiplicação de matrizes: limita a matriz densa de scores
+# (candidatos x vagas, float32) a algumas dezenas de MB
+RECOMENDACAO_CHUNK_SIZE = 256
+REFRESH_BATCH_SIZE = 1000
+
+PENDENTE_CANDIDATO = 'candidato'
+PENDENTE_VAGA = 'vaga'
+
+STOPWORDS = frozenset(
+	'de da do das dos e em para com a o as os um uma no na nos nas por ao aos '
+	'se que ou sem sobre entre como mais'.split()
+)
+TOKEN = re.compile(r'[a-z0-9+#]{2,}')
+
+
+def tokens(texto: str):
+	texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore')
+	return [
+		termo
+		for termo in TOKEN.findall(texto.decode().lower())
+		if termo not in STOPWORDS
+	]
+
+
+def weighted(texto: str, peso: float):
+	return [(termo, peso) for termo in tokens(texto)]
+
+
+def localFeatures(estado: str, cidade: str):
+	features = []
+	if estado:
+		features.append((f'estado:{estado.lower()}', 1.0))
+	if cidade:
+		features.append((f'cidade:{"_".join(tokens(cidade))}', 0.5))
+	return features
+
+
+def vagaDocument(vaga_de_emprego):
+	documento = [
+		*weighted(vaga_de_emprego.nome_vaga_de_emprego, 1.0),
+		*weighted(vaga_de_emprego.cargo, 2.0),
+		*weighted(vaga_de_emprego.descricao, 0.5),
+		(f'nivel:{vaga_de_emprego.nivel.lower()}', 1.0),
+	]
+	# Vaga remota não depende de onde o candidato mora
+	if vaga_de_emprego.modalidade != 'Remoto':
+		documento += localFeatures(vaga_de_emprego.estado, vaga_de_emprego.cidade)
+	return documento
+
+
+def documentMatrix(documentos: list):
+	# Termos viram colunas por hash estável (crc32): o mesmo termo cai na mesma
+	# coluna em qualquer processo, sem vocabulário compartilhado
+	rows, cols, values = [], [], []
+	for row, documento in enumerate(documentos):
+		for termo, peso in documento:
+			rows.append(row)
+			cols.append(zlib.crc32(termo.encode()) % RECOMENDACAO_FEATURES)
+			values.append(peso)
+	matrix = sparse.csr_matrix(
+		(np.asarray(values, dtype=np.float32), (rows, cols)),
+		shape=(len(documentos), RECOMENDACAO_FEATURES),
+	)
+	matrix.sum_duplicates()
+	return matrix
+
+
+def normalizeRows(matrix):
+	norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+	norms[norms == 0] = 1
+	return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+class RecomendacaoModel:
+	# Vagas em TF-IDF normalizado (uma linha por vaga, ordenadas por id). O IDF
+	# vem do corpus de vagas e é aplicado também aos perfis dos candidatos
+	def __init__(self, vaga_ids: np.ndarray, documentos: list):
+		self.vaga_ids = vaga_ids
+		counts = documentMatrix(documentos)
+		df = np.bincount(counts.indices, minlength=RECOMENDACAO_FEATURES)
+		self.idf = (np.log((1 + len(vaga_ids)) / (1 + df)) + 1).astype(np.float32)
+		self.matrix = self.tfidf(counts)
+		self.matrix_t = self.matrix.T.tocsc()
+
+	def tfidf(self, counts):
+		return normalizeRows(counts @ sparse.diags(self.idf)).tocsr()
+
+	def positions(self, vaga_ids):
+		# Posição de cada id na matriz; -1 para vagas que não existem mais
+		vaga_ids = np.asarray(vaga_ids, dtype=self.vaga_ids.dtype)
+		if not len(self.vaga_ids):
+			return np.full(len(vaga_ids), -1)
+		positions = np.searchsorted(self.vaga_ids, vaga_ids)
+		positions[positions >= len(self.vaga_ids)] = 0
+		return np.where(self.vaga_ids[positions] == vaga_ids, positions, -1)
+
+
+def loadModel(database: Session):
+	vagas_de_emprego = database.execute(
+		select(
+			VagaDeEmprego.id_vaga_de_emprego,
+			VagaDeEmprego.nome_vaga_de_emprego,
+			VagaDeEmprego.cargo,
+			VagaDeEmprego.descricao,
+			VagaDeEmprego.nivel,
+			VagaDeEmprego.modalidade,
+			VagaDeEmprego.estado,
+			VagaDeEmprego.cidade,
+		).order_by(VagaDeEmprego.id_vaga_de_emprego)
+	).all()
+	return RecomendacaoModel(
+		np.array(
+			[vaga.id_vaga_de_emprego for vaga in vagas_de_emprego], dtype=np.int64
+		),
+		[vagaDocument(vaga) for vaga in vagas_de_emprego],
+	)
+
+
+def candidatoDocuments(database: Session, ids: list):
+	# Perfil: título, resumo, cargos das experiências e das vagas a que já se
+	# candidatou, e localização. Três consultas por lote, nenhuma por candidato
+	documentos = {}
+	for candidato in database.execute(
+		select(
+			Candidato.id_candidato,
+			Candidato.titulo_profissional,
+			Candidato.resumo,
+			Candidato.estado,
+			Candidato.cidade,
+		).where(Candidato.id_candidato.in_(ids))
+	):
+		documentos[candidato.id_candidato] = [
+			*weighted(candidato.titulo_profissional, 2.0),
+			*weighted(candidato.resumo, 0.5),
+			*localFeatures(candidato.estado, candidato.cidade),
+		]
+
+	for experiencia in database.execute(
+		select(Experiencia.id_candidato, Experiencia.cargo).where(
+			Experiencia.id_candidato.in_(ids)
+		)
+	):
+		if experiencia.id_candidato in documentos:
+			documentos[experiencia.id_candidato] += weighted(experiencia.cargo, 1.5)
+
+	aplicadas = {id_candidato: [] for id_candidato in documentos}
+	for candidatura in database.execute(
+		select(
+			Candidatura.id_candidato,
+			Candidatura.id_vaga_de_emprego,
+			VagaDeEmprego.nome_vaga_de_emprego,
+			VagaDeEmprego.cargo,
+		)
+		.join(
+			VagaDeEmprego,
+			VagaDeEmprego.id_vaga_de_emprego == Candidatura.id_vaga_de_emprego,
+		)
+		.where(Candidatura.id_candidato.in_(ids))
+	):
+		if candidatura.id_candidato in documentos:
+			documentos[candidatura.id_candidato] += [
+				*weighted(candidatura.cargo, 1.0),
+				*weighted(candidatura.nome_vaga_de_emprego, 0.5),
+			]
+			aplicadas[candidatura.id_candidato].append(candidatura.id_vaga_de_emprego)
+
+	ids = list(documentos)
+	return ids, [documentos[id] for id in ids], [aplicadas[id] for id in ids]
+
+
+def topRecomendacoes(model, ids: list, documentos: list, aplicadas: list, k: int):
+	# Gera (id_candidato, id_vaga_de_emprego, score) com as k melhores vagas de
+	# cada candidato, tirando as vagas a que ele já se candidatou
+	if not ids or not len(model.vaga_ids):
+		return
+	perfis = model.tfidf(documentMatrix(documentos))
+	k = min(k, len(model.vaga_ids))
+	for inicio in range(0, len(ids), RECOMENDACAO_CHUNK_SIZE):
+		fim = inicio + RECOMENDACAO_CHUNK_SIZE
+		scores = (perfis[inicio:fim] @ model.matrix_t).toarray()
+
+		linhas = np.repeat(
+			np.arange(len(aplicadas[inicio:fim])),
+			[len(vagas) for vagas in aplicadas[inicio:fim]],
+		)
+		if len(linhas):
+			posicoes = model.positions(np.concatenate(aplicadas[inicio:fim]))
+			scores[linhas[posicoes >= 0], posicoes[posicoes >= 0]] = -np.inf
+
+		melhores = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+		valores = np.take_along_axis(scores, melhores, axis=1)
+		ordem = np.argsort(-valores, axis=1)
+		melhores = np.take_along_axis(melhores, ordem, axis=1)
+		valores = np.take_along_axis(valores, ordem, axis=1)
+		for linha, id_candidato in enumerate(ids[inicio:fim]):
+			# Sem nenhum termo em comum a vaga não é recomendação
+			for posicao, score in zip(melhores[linha], valores[linha], strict=True):
+				if score > 0:
+					yield id_candidato, int(model.vaga_ids[posicao]), float(score)
+
+
+def writeRecomendacoes(database: Session, model, ids: list, k: int):
+	for inicio in range(0, len(ids), REFRESH_BATCH_SIZE):
+		lote = ids[inicio : inicio + REFRESH_BATCH_SIZE]
+		database.execute(
+			delete(CandidatoRecomendacao).where(
+				CandidatoRecomendacao.id_candidato.in_(lote)
+			)
+		)
+		recomendacoes = [
+			{
+				'id_candidato': id_candidato,
+				'id_vaga_de_emprego': id_vaga,
+				'score': score,
+			}
+			for id_candidato, id_vaga, score in topRecomendacoes(
+				model, *candidatoDocuments(database, lote), k
+			)
+		]
+		if recomendacoes:
+			database.execute(insert(CandidatoRecomendacao), recomendacoes)
+
+
+def candidatosAfetados(database: Session, model, vaga_ids: list, k: int):
+	# Quem já tinha a vaga na lista (o texto pode ter mudado) e quem passaria a
+	# tê-la: score acima do último da lista atual, ou lista ainda incompleta
+	afetados = set(
+		database.scalars(
+			select(CandidatoRecomendacao.id_candidato).where(
+				CandidatoRecomendacao.id_vaga_de_emprego.in_(vaga_ids)
+			)
+		)
+	)
+	posicoes = model.positions(vaga_ids)
+	posicoes = posicoes[posicoes >= 0]
+	if not len(posicoes):
+		return afetados
+
+	limiares = {
+		row.id_candidato: row.minimo if row.quantidade >= k else 0.0
+		for row in database.execute(
+			select(
+				CandidatoRecomendacao.id_candidato,
+				func.min(CandidatoRecomendacao.score).label('minimo'),
+				func.count().label('quantidade'),
+			).group_by(CandidatoRecomendacao.id_candidato)
+		)
+	}
+	vagas = model.matrix_t[:, posicoes]
+	last_id = 0
+	while True:
+		ids = database.scalars(
+			select(Candidato.id_candidato)
+			.where(Candidato.id_candidato > last_id)
+			.order_by(Candidato.id_candidato)
+			.limit(REFRESH_BATCH_SIZE)
+		).all()
+		if not ids:
+			return afetados
+		last_id = ids[-1]
+		ids, documentos, _ = candidatoDocuments(database, ids)
+		melhores = (model.tfidf(documentMatrix(documentos)) @ vagas).max(axis=1)
+		melhores = melhores.toarray().ravel()
+		limiar = np.array([limiares.get(id, 0.0) for id in ids], dtype=np.float32)
+		afetados.update(np.asarray(ids)[melhores > limiar].tolist())
+
+
+def markRecomendacoesPendentes(database, tipo: str, ids):
+	# Chamado pelas escritas, na mesma transação. Marcar de novo atualiza a data:
+	# o refresh só apaga a marcação que leu, não uma posterior
+	ids = {id for id in ids if id is not None}
+	if not ids:
+		return
+	if database.get_bind().dialect.name == 'postgresql':
+		upsert = postgresql.insert(RecomendacaoPendente)
+	else:
+		upsert = sqlite.insert(RecomendacaoPendente)
+	agora = datetime.now()
+	database.execute(
+		upsert.values(
+			[{'tipo': tipo, 'id': id, 'data': agora} for id in ids]
+		).on_conflict_do_update(
+			index_elements=['tipo', 'id'], set_={'data': upsert.excluded.data}
+		)
+	)
+
+
+def refreshRecomendacoes(database: Session, k: int = RECOMENDACAO_TOP_K):
+	# Incremental: recalcula só os candidatos marcados e os afetados pelas vagas
+	# marcadas. Roda fora das requisições (python -m src.candidato.recomendacao)
+	pendentes = database.execute(
+		select(
+			RecomendacaoPendente.tipo,
+			RecomendacaoPendente.id,
+			RecomendacaoPendente.data,
+		)
+	).all()
+	if not pendentes:
+		return 0
+
+	model = loadModel(database)
+	candidatos = {row.id for row in pendentes if row.tipo == PENDENTE_CANDIDATO}
+	vagas = [row.id for row in pendentes if row.tipo == PENDENTE_VAGA]
+	if vagas:
+		candidatos |= candidatosAfetados(database, model, vagas, k)
+	writeRecomendacoes(database, model, sorted(candidatos), k)
+
+	for inicio in range(0, len(pendentes), REFRESH_BATCH_SIZE):
+		database.execute(
+			delete(RecomendacaoPendente).where(
+				tuple_(
+					RecomendacaoPendente.tipo,
+					RecomendacaoPendente.id,
+					RecomendacaoPendente.data,
+				).in_(
+					[
+						(row.tipo, row.id, row.data)
+						for row in pendentes[inicio : inicio + REFRESH_BATCH_SIZE]
+					]
+				)
+			)
+		)
+	database.commit()
+	return len(candidatos)
+
+
+def rebuildRecomendacoes(database: Session, k: int = RECOMENDACAO_TOP_K):
+	# Recalcula todos os candidatos, em lotes por id com commit próprio
+	model = loadModel(database)
+	database.execute(delete(RecomendacaoPendente))
+	last_id = 0
+	total = 0
+	while True:
+		ids = database.scalars(
+			select(Candidato.id_candidato)
+			.where(Candidato.id_candidato > last_id)
+			.order_by(Candidato.id_candidato)
+			.limit(REFRESH_BATCH_SIZE)
+		).all()
+		if not ids:
+			database.commit()
+			return total
+		writeRecomendacoes(database, model, ids, k)
+		database.commit()
+		total += len(ids)
+		last_id = ids[-1]
+		logger.info('%s candidatos com recomendações recalculadas', total)
+
+
+if __name__ == '__main__':
+	import argparse
+
+	from ..database import SessionLocal
+
+	parser = argparse.ArgumentParser(
+		description='Recalcula as recomendações de vagas dos candidatos'
+	)
+	parser.add_argument('--full', action='store_true', help='Recalcula todos')
+	parser.add_argument(
+		'--intervalo',
+		type=float,
+		default=None,
+		help='Segundos entre rodadas incrementais (sem ele, roda uma vez)',
+	)
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO)
+	with SessionLocal() as database:
+		if args.full:
+			logger.info('%s candidatos recalculados', rebuildRecomendacoes(database))
+		else:
+			logger.info('%s candidatos recalculados', refreshRecomendacoes(database))
+		while args.intervalo:
+			time.sleep(args.intervalo)
+			try:
+				logger.info(
+					'%s candidatos recalculados', refreshRecomendacoes(database)
+				)
+			except Exception:
+				# Uma rodada com falha (conexão perdida, lock) não derruba o processo:
+				# desfaz a transação e a próxima rodada retoma as marcações pendentes
+				logger.exception('Falha ao recalcular as recomendações')
+				database.rollback()
@@ -1,8 +1,22 @@
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
+from ..auth.cache import usuario_cache
+from ..counters import incrementCounters
+from .recomendacao import PENDENTE_CANDIDATO, markRecomendacoesPendentes
+from .statistics import getCandidatoStatistics
 from ..database import getDatabase
-from ..models import Candidato, Candidatura, Experiencia
+from ..models import (
+	Candidato,
+	CandidatoRecomendacao,
+	Candidatura,
+	Experiencia,
+	VagaDeEmprego,
+)
+from ..response_cache import response_cache
+from ..vaga_de_emprego.ranking import rankingCacheTags
+from ..vaga_de_emprego.repository import VAGA_DE_EMPREGO_RESUMO_COLUMNS
 
 
 class CandidatoRepository:
@@ -18,28 +32,84 @@ class CandidatoRepository:
 		)
 		return candidato
 
+	def getCandidatoVersao(id_candidato: int, database: Session):
+		return database.scalar(
+			select(Candidato.versao).where(Candidato.id_candidato == id_candidato)
+		)
+
 	def getStatisticsByCandidatoId(
 		id_candidato: int, database: Session = Depends(getDatabase)
 	):
-		candidaturas = (
-			database.query(Candidatura)
-			.filter(Candidatura.id_candidato == id_candidato)
-			.count()
+		return getCandidatoStatistics(id_candidato, database)
+
+	def getPerfilByCandidatoId(
+		id_candidato: int, database: Session, limit_candidaturas: int = 5
+	):
+		# Número fixo de consultas: candidato, experiências (selectinload),
+		# candidaturas recentes com as vagas (JOIN) e contadores por status
+		candidato = database.scalar(
+			select(Candidato)
+			.options(selectinload(Candidato.experiencias))
+			.where(Candidato.id_candidato == id_candidato)
 		)
-		candidaturas_aceitas = (
-			database.query(Candidatura)
-			.filter(
-				(Candidatura.id_candidato == id_candidato)
-				& (Candidatura.status == 'Aceito')
+		if candidato is None:
+			return None
+		candidaturas = database.execute(
+			select(
+				# A vaga também tem data: as colunas da candidatura ganham rótulo
+				Candidatura.id_candidatura,
+				Candidatura.status.label('status_candidatura'),
+				Candidatura.data.label('data_candidatura'),
+				Candidatura.data_atualizacao.label('data_atualizacao_candidatura'),
+				*VAGA_DE_EMPREGO_RESUMO_COLUMNS,
+			)
+			.join(
+				VagaDeEmprego,
+				VagaDeEmprego.id_vaga_de_emprego == Candidatura.id_vaga_de_emprego,
 			)
-			.count()
+			.where(Candidatura.id_candidato == id_candidato)
+			.order_by(Candidatura.data.desc(), Candidatura.id_candidatura.desc())
+			.limit(limit_candidaturas)
 		)
-
 		return {
-			'candidaturas': candidaturas,
-			'candidaturas_aceitas': candidaturas_aceitas,
+			**{
+				column.key: getattr(candidato, column.key)
+				for column in Candidato.__table__.columns
+			},
+			'experiencias': candidato.experiencias,
+			'candidaturas_recentes': [
+				{
+					'id_candidatura': candidatura.id_candidatura,
+					'status': candidatura.status_candidatura,
+					'data': candidatura.data_candidatura,
+					'data_atualizacao': candidatura.data_atualizacao_candidatura,
+					'vaga_de_emprego': candidatura,
+				}
+				for candidatura in candidaturas
+			],
+			'estatisticas': getCandidatoStatistics(id_candidato, database),
 		}
 
+	def getRecomendacoesByCandidatoId(
+		id_candidato: int, database: Session, limit: int = 20
+	):
+		# Lê o top-K já calculado, numa consulta pelo índice (id_candidato, score)
+		recomendacoes = database.execute(
+			select(*VAGA_DE_EMPREGO_RESUMO_COLUMNS, CandidatoRecomendacao.score)
+			.join(
+				CandidatoRecomendacao,
+				CandidatoRecomendacao.id_vaga_de_emprego
+				== VagaDeEmprego.id_vaga_de_emprego,
+			)
+			.where(CandidatoRecomendacao.id_candidato == id_candidato)
+			.order_by(CandidatoRecomendacao.score.desc())
+			.limit(limit)
+		)
+		return [
+			{'vaga_de_emprego': recomendacao, 'score': recomendacao.score}
+			for recomendacao in recomendacoes
+		]
+
 	def candidatoExistsByEmail(
 		email_candidato: int, database: Session = Depends(getDatabase)
 	):
@@ -55,18 +125,36 @@ class CandidatoRepository:
 		new_candidato: Candidato, database: Session = Depends(getDatabase)
 	):
 		database.add(new_candidato)
+		incrementCounters(database, candidatos=1)
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [new_candidato.id_candidato]
+		)
+		tags = rankingCacheTags(database, [new_candidato.id_candidato])
 		database.commit()
+		response_cache.invalidate(*tags)
 		database.refresh(new_candidato)
 		return new_candidato
 
 	def updateCandidato(candidato: Candidato, database: Session):
 		database.merge(candidato)
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [candidato.id_candidato]
+		)
+		tags = rankingCacheTags(database, [candidato.id_candidato])
 		database.commit()
+		response_cache.invalidate(*tags)
 		return candidato
 
 	def deleteCandidato(candidato: Candidato, database: Session = Depends(getDatabase)):
+		usuario = candidato.usuario
+		email = usuario.email if usuario else None
+		tags = rankingCacheTags(database, [candidato.id_candidato])
 		database.delete(candidato)
+		# O usuário do candidato é removido em cascata
+		incrementCounters(database, candidatos=-1, usuarios=-1 if usuario else 0)
 		database.commit()
+		usuario_cache.invalidate(email, candidato.id_candidato)
+		response_cache.invalidate(*tags)
 		return True
 
 	def getExperienciasByCandidatoId(
@@ -93,6 +181,9 @@ class CandidatoRepository:
 	):
 		new_experiencia = experiencia_data
 		database.add(new_experiencia)
+		markRecomendacoesPendentes(database, PENDENTE_CANDIDATO, [id_candidato])
+		tags = rankingCacheTags(database, [id_candidato])
 		database.commit()
+		response_cache.invalidate(*tags)
 		database.refresh(new_experiencia)
 		return new_experiencia
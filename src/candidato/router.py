@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, Response, status, Depends
+from fastapi import APIRouter, HTTPException, Header, Query, Response, status, Depends
 from sqlalchemy.orm import Session
 
 from ..auth.repository import requireAdmin, requireCandidato
 
-from ..database import engine, Base, getDatabase
+from ..database import getDatabase
+from ..etag import makeEtag, notModified, setEtag
 from .repository import CandidatoRepository
-from .schema import CandidatoBase
+from .recomendacao import RECOMENDACAO_TOP_K
+from .schema import (
+	CandidatoBase,
+	CandidatoPerfilResponse,
+	CandidatoResponse,
+	CandidatoStatisticsResponse,
+	RecomendacaoResponse,
+)
 from ..models import Candidato, Notificacao, Usuario
 
-Base.metadata.create_all(bind=engine)
-
 router = APIRouter(
 	prefix='/candidatos',
 	tags=['candidatos'],
@@ -17,13 +23,13 @@ router = APIRouter(
 )
 
 
-@router.get('/')
+@router.get('/', response_model=list[CandidatoResponse])
 async def getCandidatos(database: Session = Depends(getDatabase)):
 	candidatos = CandidatoRepository.getAllCandidatos(database)
 	return candidatos
 
 
-@router.get('/{id_candidato}/stats')
+@router.get('/{id_candidato}/stats', response_model=CandidatoStatisticsResponse)
 async def getStatisticsByCandidatoId(
 	id_candidato: int,
 	database: Session = Depends(getDatabase),
@@ -33,15 +39,67 @@ async def getStatisticsByCandidatoId(
 	return statistics
 
 
-@router.get('/{id_candidato}')
-async def getCandidatoById(id_candidato: int, database: Session = Depends(getDatabase)):
+@router.get('/{id_candidato}/perfil', response_model=CandidatoPerfilResponse)
+async def getPerfilByCandidatoId(
+	id_candidato: int,
+	limit_candidaturas: int = Query(5, ge=1, le=20),
+	database: Session = Depends(getDatabase),
+	current_candidato: Usuario = Depends(requireCandidato),
+):
+	# O perfil traz email, candidaturas e estatísticas: só o próprio candidato
+	if id_candidato != current_candidato.id:
+		raise HTTPException(
+			status_code=403,
+			detail='Você não pode ver o perfil de outro usuário.',
+		)
+	perfil = CandidatoRepository.getPerfilByCandidatoId(
+		id_candidato, database, limit_candidaturas
+	)
+	if not perfil:
+		raise HTTPException(status_code=404, detail='Candidato não encontrado')
+	return perfil
+
+
+@router.get('/{id_candidato}/recomendacoes', response_model=list[RecomendacaoResponse])
+async def getRecomendacoesByCandidatoId(
+	id_candidato: int,
+	limit: int = Query(20, ge=1, le=RECOMENDACAO_TOP_K),
+	database: Session = Depends(getDatabase),
+	current_candidato: Usuario = Depends(requireCandidato),
+):
+	if id_candidato != current_candidato.id:
+		raise HTTPException(
+			status_code=403,
+			detail='Você não pode ver as recomendações de outro usuário.',
+		)
+	return CandidatoRepository.getRecomendacoesByCandidatoId(
+		id_candidato, database, limit
+	)
+
+
+@router.get('/{id_candidato}', response_model=CandidatoResponse)
+async def getCandidatoById(
+	id_candidato: int,
+	response: Response,
+	if_none_match: str = Header(None),
+	database: Session = Depends(getDatabase),
+):
+	if if_none_match:
+		versao = CandidatoRepository.getCandidatoVersao(id_candidato, database)
+		if versao is not None:
+			not_modified = notModified(
+				if_none_match, makeEtag('candidato', id_candidato, versao)
+			)
+			if not_modified:
+				return not_modified
 	candidato = CandidatoRepository.getCandidatoById(id_candidato, database)
 	if not candidato:
 		raise HTTPException(status_code=404, detail='Candidato não encontrado')
+	setEtag(response, makeEtag('candidato', id_candidato, candidato.versao))
 	return candidato
 
 
-@router.post('/')
+@router.post('/', response_model=CandidatoResponse)
 async def createCandidato(
 	new_candidato: CandidatoBase, database: Session = Depends(getDatabase)
 ):
@@ -57,7 +115,7 @@ async def createCandidato(
 		return new_candidato
 
 
-@router.put('/{id_candidato}')
+@router.put('/{id_candidato}', response_model=CandidatoResponse)
 async def updateCandidatoById(
 	id_candidato: int,
 	candidato_data: CandidatoBase,
@@ -78,7 +136,9 @@ async def updateCandidatoById(
 	return updated_candidato
 
 
-@router.delete('/{id_candidato}')
+@router.delete(
+	'/{id_candidato}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteCandidatoById(
 	id_candidato: int,
 	database: Session = Depends(getDatabase),
@@ -91,5 +151,3 @@ async def deleteCandidatoById(
 	if not success:
 		raise HTTPException(status_code=500, detail='Erro ao deletar candidato')
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
-
-
@@ -1,6 +1,10 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
 
+from ..experiencia.schema import ExperienciaResponse
+from ..vaga_de_emprego.schema import VagaDeEmpregoResumoResponse
+
 
 class CandidatoBase(BaseModel):
 	id_candidato: int
@@ -15,3 +19,36 @@ class CandidatoBase(BaseModel):
 
 class CandidatoResponse(CandidatoBase):
 	id_candidato: int
+
+
+class CandidatoStatisticsResponse(BaseModel):
+	candidaturas: int
+	candidaturas_pendentes: int
+	candidaturas_em_analise: int
+	candidaturas_aceitas: int
+	candidaturas_rejeitadas: int
+	data_ultima_candidatura: Optional[datetime] = None
+	data_ultima_atualizacao: Optional[datetime] = None
+
+	model_config = {'from_attributes': True}
+
+
+class RecomendacaoResponse(BaseModel):
+	vaga_de_emprego: VagaDeEmpregoResumoResponse
+	score: float
+
+
+class CandidaturaRecenteResponse(BaseModel):
+	id_candidatura: int
+	status: str
+	data: datetime
+	data_atualizacao: Optional[datetime] = None
+	vaga_de_emprego: VagaDeEmpregoResumoResponse
+
+
+class CandidatoPerfilResponse(CandidatoResponse):
+	experiencias: list[ExperienciaResponse]
+	candidaturas_recentes: list[CandidaturaRecenteResponse]
+	estatisticas: CandidatoStatisticsResponse
+
+	model_config = {'from_attributes': True}
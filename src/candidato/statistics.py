@@ -0,0 +1,133 @@
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..candidatura.schema import Status
+from ..models import Candidatura, CandidatoStatistics
+
+STATUS_COUNTERS = {
+	Status.PENDENTE.value: 'candidaturas_pendentes',
+	Status.ANALISE.value: 'candidaturas_em_analise',
+	Status.ACEITO.value: 'candidaturas_aceitas',
+	Status.REJEITADO.value: 'candidaturas_rejeitadas',
+}
+
+
+def statusDeltas(status: str, delta: int):
+	deltas = {'candidaturas': delta}
+	if status in STATUS_COUNTERS:
+		deltas[STATUS_COUNTERS[status]] = delta
+	return deltas
+
+
+def statusChangeDeltas(status_anterior: str, status: str):
+	deltas = statusDeltas(status, 1)
+	for counter, delta in statusDeltas(status_anterior, -1).items():
+		deltas[counter] = deltas.get(counter, 0) + delta
+	return deltas
+
+
+def latest(column, value):
+	return case((or_(column.is_(None), column < value), value), else_=column)
+
+
+def incrementCandidatoStatistics(
+	database: Session,
+	id_candidato: int,
+	data_candidatura=None,
+	data_atualizacao=None,
+	**deltas: int,
+):
+	values = {
+		counter: getattr(CandidatoStatistics, counter) + delta
+		for counter, delta in deltas.items()
+		if delta
+	}
+	if data_candidatura is not None:
+		values['data_ultima_candidatura'] = latest(
+			CandidatoStatistics.data_ultima_candidatura, data_candidatura
+		)
+	if data_atualizacao is not None:
+		values['data_ultima_atualizacao'] = latest(
+			CandidatoStatistics.data_ultima_atualizacao, data_atualizacao
+		)
+	if not values:
+		return
+	statement = (
+		update(CandidatoStatistics)
+		.where(CandidatoStatistics.id_candidato == id_candidato)
+		.values(values)
+	)
+	if not database.execute(statement).rowcount:
+		# Primeira candidatura do candidato: cria a linha pela contagem exata,
+		# já incluindo as alterações pendentes desta transação
+		database.flush()
+		if not insertCandidatoStatisticsRow(database, id_candidato):
+			# Uma transação concorrente criou a linha antes, com uma contagem
+			# que não vê esta: aplica o incremento sobre ela
+			database.execute(statement)
+
+
+def insertCandidatoStatisticsRow(database: Session, id_candidato: int):
+	# Duas primeiras candidaturas concorrentes tentam criar a linha: a segunda
+	# não falha na chave primária, espera a primeira e não insere nada
+	if database.get_bind().dialect.name == 'postgresql':
+		statement = postgresql.insert(CandidatoStatistics)
+	else:
+		statement = sqlite.insert(CandidatoStatistics)
+	contagem = candidatoStatisticsStatement([id_candidato])
+	return database.execute(
+		statement.from_select(
+			[column.name for column in contagem.selected_columns], contagem
+		).on_conflict_do_nothing(index_elements=['id_candidato'])
+	).rowcount
+
+
+def candidatoStatisticsStatement(ids: list = None):
+	statement = (
+		select(
+			Candidatura.id_candidato,
+			func.count().label('candidaturas'),
+			*[
+				func.coalesce(
+					func.sum(case((Candidatura.status == status, 1), else_=0)), 0
+				).label(counter)
+				for status, counter in STATUS_COUNTERS.items()
+			],
+			func.max(Candidatura.data).label('data_ultima_candidatura'),
+			func.max(Candidatura.data_atualizacao).label('data_ultima_atualizacao'),
+		)
+		.where(Candidatura.id_candidato.is_not(None))
+		.group_by(Candidatura.id_candidato)
+	)
+	if ids is not None:
+		statement = statement.where(Candidatura.id_candidato.in_(ids))
+	return statement
+
+
+def rebuildCandidatoStatistics(database, ids: list = None):
+	# Recalcula num único INSERT ... SELECT agrupado. Sem ids, refaz a tabela toda.
+	# Aceita Session ou Connection (a migração usa a conexão)
+	limpeza = delete(CandidatoStatistics)
+	if ids is not None:
+		limpeza = limpeza.where(CandidatoStatistics.id_candidato.in_(ids))
+	database.execute(limpeza)
+
+	statement = candidatoStatisticsStatement(ids)
+	return database.execute(
+		insert(CandidatoStatistics).from_select(
+			[column.name for column in statement.selected_columns], statement
+		)
+	).rowcount
+
+
+def getCandidatoStatistics(id_candidato: int, database: Session):
+	statistics = database.get(CandidatoStatistics, id_candidato, populate_existing=True)
+	if statistics is None:
+		# Sem linha: o candidato ainda não se candidatou a nenhuma vaga
+		return CandidatoStatistics(
+			id_candidato=id_candidato,
+			candidaturas=0,
+			**{counter: 0 for counter in STATUS_COUNTERS.values()},
+		)
+	return statistics
@@ -1,16 +1,41 @@
+import asyncio
+from datetime import date, datetime
 import sys
 from pathlib import Path
 import pytest
+from fastapi import HTTPException, Response
 
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from ..models import Candidato, Usuario
+from ..models import (
+	Candidato,
+	Candidatura,
+	CandidatoStatistics,
+	Empresa,
+	Experiencia,
+	RecomendacaoPendente,
+	Usuario,
+	VagaDeEmprego,
+)
 from .repository import CandidatoRepository
+from .router import getCandidatoById, getPerfilByCandidatoId
+from .recomendacao import refreshRecomendacoes
+from ..auth.cache import UsuarioSnapshot
+from ..profiling import RequestProfile, current_profile
+from .statistics import (
+	incrementCandidatoStatistics,
+	insertCandidatoStatisticsRow,
+	rebuildCandidatoStatistics,
+)
+from ..candidatura.repository import CandidaturaRepository
+from ..empresa.repository import EmpresaRepository
+from ..vaga_de_emprego.repository import VagaDeEmpregoRepository
 from ..usuario.repository import UsuarioRepository
 
 # # E não é q testes funcionam?
 
+
 @pytest.fixture
 def make_usuarios(db):
 	usuarios = [
@@ -302,3 +327,369 @@ def test_deleteCandidato(
 def test_nonExistentCandidato_deleteCandidato(id, db):
 	with pytest.raises(Exception):
 		CandidatoRepository.deleteCandidato(id, db)
+
+
+@pytest.fixture
+def add_vagas(sample_candidato, db):
+	CandidatoRepository.createCandidato(
+		Candidato(
+			id_candidato=sample_candidato.id,
+			nome='João Silva',
+			email='joao@example.com',
+		),
+		db,
+	)
+	EmpresaRepository.createEmpresa(
+		Empresa(
+			id_empresa=1,
+			nome_empresa='Empresa G',
+			cnpj='12345671234567',
+			cidade='Gama',
+			estado='DF',
+		),
+		db,
+	)
+	for id_vaga in (1, 2, 3):
+		VagaDeEmpregoRepository.createVagaDeEmprego(
+			VagaDeEmprego(
+				id_vaga_de_emprego=id_vaga,
+				id_empresa=1,
+				nome_vaga_de_emprego=f'Vaga {id_vaga}',
+				data=date(2024, 1, 1),
+				cidade='Gama',
+				estado='DF',
+				salario='5000.00',
+				cargo='Desenvolvedor',
+				nivel='Pleno',
+				tipo_contrato='CLT',
+				modalidade='Remoto',
+				descricao='Vaga de teste.',
+			),
+			db,
+		)
+	return sample_candidato.id
+
+
+def test_getStatisticsByCandidatoId(add_vagas, db):
+	id_candidato = add_vagas
+	vazio = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert vazio.candidaturas == 0
+	assert vazio.data_ultima_candidatura is None
+
+	candidatura = CandidaturaRepository.createCandidatura(
+		Candidatura(
+			id_candidato=id_candidato,
+			id_vaga_de_emprego=1,
+			status='Pendente',
+			data=datetime(2025, 1, 1),
+		),
+		db,
+	)
+	CandidaturaRepository.createCandidaturas(
+		[(id_candidato, 2), (id_candidato, 3)], datetime(2025, 2, 1), db
+	)
+	candidatura.status = 'Aceito'
+	candidatura.data_atualizacao = datetime(2025, 3, 1)
+	CandidaturaRepository.updateCandidatura(candidatura, db)
+
+	statistics = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert statistics.candidaturas == 3
+	assert statistics.candidaturas_pendentes == 2
+	assert statistics.candidaturas_aceitas == 1
+	assert statistics.candidaturas_em_analise == 0
+	assert statistics.data_ultima_candidatura == datetime(2025, 2, 1)
+	assert statistics.data_ultima_atualizacao == datetime(2025, 3, 1)
+
+	CandidaturaRepository.deleteCandidatura(candidatura, db)
+
+	statistics = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert statistics.candidaturas == 2
+	assert statistics.candidaturas_aceitas == 0
+	assert statistics.data_ultima_atualizacao is None
+
+
+def test_rebuildCandidatoStatistics(add_vagas, db):
+	id_candidato = add_vagas
+	for id_vaga, status in ((1, 'Em análise'), (2, 'Rejeitado')):
+		CandidaturaRepository.createCandidatura(
+			Candidatura(
+				id_candidato=id_candidato,
+				id_vaga_de_emprego=id_vaga,
+				status=status,
+				data=datetime(2025, 1, id_vaga),
+			),
+			db,
+		)
+	mantidas = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	mantidas = {
+		column.key: getattr(mantidas, column.key)
+		for column in mantidas.__table__.columns
+	}
+
+	assert rebuildCandidatoStatistics(db) == 1
+
+	recalculadas = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert {
+		column.key: getattr(recalculadas, column.key)
+		for column in recalculadas.__table__.columns
+	} == mantidas
+	assert recalculadas.candidaturas_em_analise == 1
+	assert recalculadas.candidaturas_rejeitadas == 1
+
+
+def test_missingRow_incrementCandidatoStatistics(add_vagas, db):
+	id_candidato = add_vagas
+	db.add(
+		Candidatura(
+			id_candidato=id_candidato,
+			id_vaga_de_emprego=1,
+			status='Pendente',
+			data=datetime(2025, 1, 1),
+		)
+	)
+	incrementCandidatoStatistics(
+		db,
+		id_candidato,
+		data_candidatura=datetime(2025, 1, 1),
+		candidaturas=1,
+		candidaturas_pendentes=1,
+	)
+	db.commit()
+
+	statistics = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert db.query(CandidatoStatistics).count() == 1
+	assert statistics.candidaturas == 1
+	assert statistics.candidaturas_pendentes == 1
+	assert statistics.data_ultima_candidatura == datetime(2025, 1, 1)
+
+
+def test_existingRow_insertCandidatoStatisticsRow(add_vagas, db):
+	id_candidato = add_vagas
+	CandidaturaRepository.createCandidatura(
+		Candidatura(
+			id_candidato=id_candidato,
+			id_vaga_de_emprego=1,
+			status='Pendente',
+			data=datetime(2025, 1, 1),
+		),
+		db,
+	)
+	# Outra transação criou a linha entre o UPDATE sem efeito e o INSERT
+	assert insertCandidatoStatisticsRow(db, id_candidato) == 0
+
+	statistics = CandidatoRepository.getStatisticsByCandidatoId(id_candidato, db)
+	assert db.query(CandidatoStatistics).count() == 1
+	assert statistics.candidaturas == 1
+
+
+def test_etag_getCandidatoById(add_vagas, db):
+	id_candidato = add_vagas
+	response = Response()
+	candidato = asyncio.run(getCandidatoById(id_candidato, response, None, db))
+	etag = response.headers['ETag']
+
+	not_modified = asyncio.run(getCandidatoById(id_candidato, Response(), etag, db))
+	assert not_modified.status_code == 304
+
+	candidato.cidade = 'Gama'
+	CandidatoRepository.updateCandidato(candidato, db)
+	assert CandidatoRepository.getCandidatoVersao(id_candidato, db) == 2
+
+	response = Response()
+	atualizado = asyncio.run(getCandidatoById(id_candidato, response, etag, db))
+	assert atualizado.cidade == 'Gama'
+	assert response.headers['ETag'] != etag
+
+
+def make_vaga_recomendacao(id_vaga, cargo, descricao):
+	return VagaDeEmprego(
+		id_vaga_de_emprego=id_vaga,
+		id_empresa=1,
+		nome_vaga_de_emprego=cargo,
+		data=date(2024, 1, 1),
+		cidade='Gama',
+		estado='DF',
+		salario='5000.00',
+		cargo=cargo,
+		nivel='Pleno',
+		tipo_contrato='CLT',
+		modalidade='Presencial',
+		descricao=descricao,
+	)
+
+
+@pytest.fixture
+def add_recomendacoes(sample_candidato, db):
+	CandidatoRepository.createCandidato(
+		Candidato(
+			id_candidato=sample_candidato.id,
+			nome='João Silva',
+			email='joao@example.com',
+			titulo_profissional='Desenvolvedor Python',
+			estado='DF',
+			cidade='Gama',
+		),
+		db,
+	)
+	CandidatoRepository.createExperienciaByCandidatoId(
+		sample_candidato.id,
+		Experiencia(
+			id_candidato=sample_candidato.id,
+			nome_instituicao='Empresa X',
+			cargo='Desenvolvedor Backend',
+			periodo_experiencia='2 anos',
+		),
+		db,
+	)
+	EmpresaRepository.createEmpresa(
+		Empresa(
+			id_empresa=1,
+			nome_empresa='Empresa G',
+			cnpj='12345671234567',
+			cidade='Gama',
+			estado='DF',
+		),
+		db,
+	)
+	for vaga in (
+		make_vaga_recomendacao(1, 'Desenvolvedor Python', 'APIs em Python e FastAPI.'),
+		make_vaga_recomendacao(2, 'Desenvolvedor Backend', 'Serviços backend.'),
+		make_vaga_recomendacao(3, 'Contador', 'Fechamento contábil.'),
+	):
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga, db)
+	return sample_candidato.id
+
+
+def test_refreshRecomendacoes(add_recomendacoes, db):
+	id_candidato = add_recomendacoes
+	assert db.query(RecomendacaoPendente).count() > 0
+
+	assert refreshRecomendacoes(db) == 1
+	assert db.query(RecomendacaoPendente).count() == 0
+
+	recomendacoes = CandidatoRepository.getRecomendacoesByCandidatoId(id_candidato, db)
+	ids = [r['vaga_de_emprego'].id_vaga_de_emprego for r in recomendacoes]
+	assert ids[:2] == [1, 2]
+	scores = [r['score'] for r in recomendacoes]
+	assert scores == sorted(scores, reverse=True)
+	assert (
+		len(CandidatoRepository.getRecomendacoesByCandidatoId(id_candidato, db, 1)) == 1
+	)
+
+	# Candidatar-se tira a vaga das recomendações no próximo refresh
+	CandidaturaRepository.createCandidatura(
+		Candidatura(
+			id_candidato=id_candidato,
+			id_vaga_de_emprego=1,
+			status='Pendente',
+			data=datetime(2025, 1, 1),
+		),
+		db,
+	)
+	refreshRecomendacoes(db)
+	recomendacoes = CandidatoRepository.getRecomendacoesByCandidatoId(id_candidato, db)
+	assert 1 not in [r['vaga_de_emprego'].id_vaga_de_emprego for r in recomendacoes]
+
+
+def test_refreshRecomendacoes_nova_vaga(add_recomendacoes, db):
+	id_candidato = add_recomendacoes
+	refreshRecomendacoes(db)
+
+	VagaDeEmpregoRepository.createVagaDeEmprego(
+		make_vaga_recomendacao(4, 'Desenvolvedor Python Sênior', 'Python.'), db
+	)
+	assert db.query(RecomendacaoPendente).filter_by(tipo='vaga', id=4).count() == 1
+
+	assert refreshRecomendacoes(db) == 1
+	recomendacoes = CandidatoRepository.getRecomendacoesByCandidatoId(id_candidato, db)
+	assert 4 in [r['vaga_de_emprego'].id_vaga_de_emprego for r in recomendacoes]
+	assert refreshRecomendacoes(db) == 0
+
+
+def test_getPerfilByCandidatoId(add_recomendacoes, db):
+	id_candidato = add_recomendacoes
+
+	def perfilQueries():
+		db.expire_all()
+		profile = RequestProfile({})
+		token = current_profile.set(profile)
+		try:
+			perfil = CandidatoRepository.getPerfilByCandidatoId(id_candidato, db, 2)
+		finally:
+			current_profile.reset(token)
+		return perfil, profile.queries
+
+	perfil, queries = perfilQueries()
+	assert queries == 4
+	assert len(perfil['experiencias']) == 1
+	assert perfil['candidaturas_recentes'] == []
+	assert perfil['estatisticas'].candidaturas == 0
+
+	CandidatoRepository.createExperienciaByCandidatoId(
+		id_candidato,
+		Experiencia(
+			id_candidato=id_candidato,
+			nome_instituicao='Empresa Y',
+			cargo='Desenvolvedor Python',
+			periodo_experiencia='1 ano',
+		),
+		db,
+	)
+	for id_vaga in (1, 2, 3):
+		CandidaturaRepository.createCandidatura(
+			Candidatura(
+				id_candidato=id_candidato,
+				id_vaga_de_emprego=id_vaga,
+				status='Pendente',
+				data=datetime(2025, 1, id_vaga),
+			),
+			db,
+		)
+
+	# Mais experiências e candidaturas não mudam o número de consultas
+	perfil, queries = perfilQueries()
+	assert queries == 4
+	assert len(perfil['experiencias']) == 2
+	assert [
+		candidatura['vaga_de_emprego'].id_vaga_de_emprego
+		for candidatura in perfil['candidaturas_recentes']
+	] == [3, 2]
+	assert perfil['candidaturas_recentes'][0]['data'] == datetime(2025, 1, 3)
+	assert perfil['estatisticas'].candidaturas_pendentes == 3
+
+
+def test_nonExistentCandidato_getPerfilByCandidatoId(db):
+	assert CandidatoRepository.getPerfilByCandidatoId(999, db) is None
+
+
+def test_otherCandidato_getPerfilByCandidatoId(add_recomendacoes, db):
+	id_candidato = add_recomendacoes
+	outro = UsuarioRepository.createUsuario(
+		Usuario(
+			nome='Maria Souza',
+			email='maria@example.com',
+			senha='123',
+			papel='candidato',
+		),
+		db,
+	)
+
+	perfil = asyncio.run(
+		getPerfilByCandidatoId(
+			id_candidato,
+			5,
+			db,
+			UsuarioSnapshot.fromUsuario(
+				UsuarioRepository.getUsuarioById(id_candidato, db)
+			),
+		)
+	)
+	assert perfil['id_candidato'] == id_candidato
+
+	with pytest.raises(HTTPException) as error:
+		asyncio.run(
+			getPerfilByCandidatoId(
+				id_candidato, 5, db, UsuarioSnapshot.fromUsuario(outro)
+			)
+		)
+	assert error.value.status_code == 403
@@ -1,14 +1,120 @@
+from datetime import datetime
+
 from fastapi import Depends
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
 
+from ..candidato.recomendacao import PENDENTE_CANDIDATO, markRecomendacoesPendentes
+from ..candidato.statistics import (
+	incrementCandidatoStatistics,
+	rebuildCandidatoStatistics,
+	statusChangeDeltas,
+	statusDeltas,
+)
+from ..counters import incrementCounters
 from ..database import getDatabase
-from ..models import Candidatura
+from ..models import Candidato, Candidatura, VagaDeEmprego
+from ..pagination import decodeCursor, encodeCursor
+from ..response_cache import response_cache, vagaCacheTag
+from .schema import (
+	CamposCandidatura,
+	Ordem,
+	OrdenacaoCandidatura,
+	ResultadoCandidatura,
+	Status,
+)
+
+# Colunas que a lista de candidatos de uma vaga exibe; o perfil completo
+# (com o resumo) é carregado só quando o recrutador abre o candidato
+CANDIDATURA_INBOX_COLUMNS = (
+	Candidatura.id_candidatura,
+	Candidatura.id_candidato,
+	Candidatura.status,
+	Candidatura.data,
+	Candidatura.data_atualizacao,
+	Candidato.nome,
+	Candidato.titulo_profissional,
+	Candidato.estado,
+	Candidato.cidade,
+)
+
+CANDIDATURA_SORT_KEYS = {
+	OrdenacaoCandidatura.DATA: Candidatura.data,
+	# Candidaturas nunca atualizadas entram pela data de envio
+	OrdenacaoCandidatura.DATA_ATUALIZACAO: func.coalesce(
+		Candidatura.data_atualizacao, Candidatura.data
+	),
+}
+
+
+def insertCandidaturaStatement(database: Session):
+	# INSERT ... ON CONFLICT DO NOTHING: o índice único decide se a candidatura já
+	# existe, no mesmo comando que insere
+	if database.get_bind().dialect.name == 'postgresql':
+		insert = postgresql.insert
+	else:
+		insert = sqlite.insert
+	return insert(Candidatura).on_conflict_do_nothing()
+
+
+def candidaturasByVagaDeEmpregoPageStatement(
+	id_vaga_de_emprego: int,
+	limit: int,
+	cursor: str = None,
+	status: Status = None,
+	ordenar_por: OrdenacaoCandidatura = OrdenacaoCandidatura.DATA,
+	ordem: Ordem = Ordem.DESC,
+	campos: CamposCandidatura = CamposCandidatura.RESUMO,
+):
+	if campos == CamposCandidatura.COMPLETO:
+		statement = select(Candidatura).options(joinedload(Candidatura.candidato))
+	else:
+		statement = select(*CANDIDATURA_INBOX_COLUMNS).join(Candidatura.candidato)
+	statement = statement.where(Candidatura.id_vaga_de_emprego == id_vaga_de_emprego)
+	if status is not None:
+		statement = statement.where(Candidatura.status == Status(status).value)
+
+	sort_key = CANDIDATURA_SORT_KEYS[ordenar_por]
+	keyset = tuple_(sort_key, Candidatura.id_candidatura)
+	if cursor:
+		last_key, last_id = decodeCursor(cursor, datetime.fromisoformat, int)
+		if ordem == Ordem.ASC:
+			statement = statement.where(keyset > tuple_(last_key, last_id))
+		else:
+			statement = statement.where(keyset < tuple_(last_key, last_id))
+
+	if ordem == Ordem.ASC:
+		statement = statement.order_by(sort_key.asc(), Candidatura.id_candidatura.asc())
+	else:
+		statement = statement.order_by(
+			sort_key.desc(), Candidatura.id_candidatura.desc()
+		)
+	return statement.limit(limit + 1)
+
+
+def candidaturasPage(candidaturas: list, limit: int, ordenar_por: str):
+	next_cursor = None
+	if len(candidaturas) > limit:
+		candidaturas = candidaturas[:limit]
+		last = candidaturas[-1]
+		if ordenar_por == OrdenacaoCandidatura.DATA_ATUALIZACAO:
+			last_key = last.data_atualizacao or last.data
+		else:
+			last_key = last.data
+		next_cursor = encodeCursor(last_key, last.id_candidatura)
+	return {'items': candidaturas, 'next_cursor': next_cursor}
 
 
 class CandidaturaRepository:
 	def getAllCandidaturas(database: Session = Depends(getDatabase)):
 		return database.query(Candidatura).all()
 
+	async def getAllCandidaturasAsync(database: AsyncSession):
+		result = await database.execute(select(*Candidatura.__table__.columns))
+		return result.all()
+
 	def getCandidaturaById(
 		id_candidatura: int, database: Session = Depends(getDatabase)
 	):
@@ -19,6 +125,9 @@ class CandidaturaRepository:
 		)
 		return candidatura
 
+	async def getCandidaturaByIdAsync(id_candidatura: int, database: AsyncSession):
+		return await database.get(Candidatura, id_candidatura)
+
 	def getCandidaturasByCandidatoId(
 		id_candidato: int, database: Session = Depends(getDatabase)
 	):
@@ -42,6 +151,19 @@ class CandidaturaRepository:
 		candidaturas = query.all()
 		return candidaturas
 
+	async def getCandidaturasWithVagasDeEmpregoByCandidatoIdAsync(
+		id_candidato: int, database: AsyncSession, limit: int = None
+	):
+		statement = (
+			select(Candidatura)
+			.options(joinedload(Candidatura.vaga))
+			.where(Candidatura.id_candidato == id_candidato)
+		)
+		if limit:
+			statement = statement.limit(limit)
+		result = await database.execute(statement)
+		return result.scalars().all()
+
 	def getCandidaturasWithCandidatoByVagaDeEmpregoId(
 		id_vaga_de_emprego: int, database: Session
 	):
@@ -55,6 +177,46 @@ class CandidaturaRepository:
 		)
 		return candidaturas
 
+	def getCandidaturasByVagaDeEmpregoIdPage(
+		id_vaga_de_emprego: int,
+		database: Session,
+		limit: int = 20,
+		cursor: str = None,
+		status: Status = None,
+		ordenar_por: OrdenacaoCandidatura = OrdenacaoCandidatura.DATA,
+		ordem: Ordem = Ordem.DESC,
+		campos: CamposCandidatura = CamposCandidatura.RESUMO,
+	):
+		statement = candidaturasByVagaDeEmpregoPageStatement(
+			id_vaga_de_emprego, limit, cursor, status, ordenar_por, ordem, campos
+		)
+		result = database.execute(statement)
+		if campos == CamposCandidatura.COMPLETO:
+			candidaturas = result.scalars().all()
+		else:
+			candidaturas = result.all()
+		return candidaturasPage(candidaturas, limit, ordenar_por)
+
+	async def getCandidaturasByVagaDeEmpregoIdPageAsync(
+		id_vaga_de_emprego: int,
+		database: AsyncSession,
+		limit: int = 20,
+		cursor: str = None,
+		status: Status = None,
+		ordenar_por: OrdenacaoCandidatura = OrdenacaoCandidatura.DATA,
+		ordem: Ordem = Ordem.DESC,
+		campos: CamposCandidatura = CamposCandidatura.RESUMO,
+	):
+		statement = candidaturasByVagaDeEmpregoPageStatement(
+			id_vaga_de_emprego, limit, cursor, status, ordenar_por, ordem, campos
+		)
+		result = await database.execute(statement)
+		if campos == CamposCandidatura.COMPLETO:
+			candidaturas = result.scalars().all()
+		else:
+			candidaturas = result.all()
+		return candidaturasPage(candidaturas, limit, ordenar_por)
+
 	def getCandidaturasByVagaDeEmpregoId(
 		id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
 	):
@@ -83,22 +245,177 @@ class CandidaturaRepository:
 		else:
 			return False
 
+	async def candidaturaExistsAsync(
+		id_candidato: int, id_vaga_de_emprego: int, database: AsyncSession
+	):
+		result = await database.execute(
+			select(Candidatura.id_candidatura)
+			.where(
+				Candidatura.id_candidato == id_candidato,
+				Candidatura.id_vaga_de_emprego == id_vaga_de_emprego,
+			)
+			.limit(1)
+		)
+		return result.first() is not None
+
 	def createCandidatura(
 		new_candidatura: Candidatura, database: Session = Depends(getDatabase)
 	):
+		values = {
+			column.key: getattr(new_candidatura, column.key)
+			for column in Candidatura.__table__.columns
+			if getattr(new_candidatura, column.key) is not None
+		}
+		id_candidatura = database.execute(
+			insertCandidaturaStatement(database)
+			.values(values)
+			.returning(Candidatura.id_candidatura)
+		).scalar()
+		if id_candidatura is None:
+			return None
+
+		new_candidatura.id_candidatura = id_candidatura
+		make_transient_to_detached(new_candidatura)
 		database.add(new_candidatura)
+		incrementCounters(database, candidaturas=1)
+		incrementCandidatoStatistics(
+			database,
+			new_candidatura.id_candidato,
+			data_candidatura=new_candidatura.data,
+			**statusDeltas(new_candidatura.status, 1),
+		)
+		# A vaga sai das recomendações e o cargo dela entra no histórico do perfil
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [new_candidatura.id_candidato]
+		)
 		database.commit()
-		database.refresh(new_candidatura)
+		response_cache.invalidate(vagaCacheTag(new_candidatura.id_vaga_de_emprego))
 		return new_candidatura
 
+	def createCandidaturas(pares: list, data, database: Session):
+		pares = [tuple(par) for par in pares]
+		unicos = list(dict.fromkeys(pares))
+		candidatos = set(
+			database.scalars(
+				select(Candidato.id_candidato).where(
+					Candidato.id_candidato.in_({par[0] for par in unicos})
+				)
+			)
+		)
+		vagas = set(
+			database.scalars(
+				select(VagaDeEmprego.id_vaga_de_emprego).where(
+					VagaDeEmprego.id_vaga_de_emprego.in_({par[1] for par in unicos})
+				)
+			)
+		)
+		validos = [par for par in unicos if par[0] in candidatos and par[1] in vagas]
+
+		criadas = {}
+		if validos:
+			rows = database.execute(
+				insertCandidaturaStatement(database)
+				.values(
+					[
+						{
+							'id_candidato': id_candidato,
+							'id_vaga_de_emprego': id_vaga_de_emprego,
+							'status': Status.PENDENTE.value,
+							'data': data,
+						}
+						for id_candidato, id_vaga_de_emprego in validos
+					]
+				)
+				.returning(
+					Candidatura.id_candidatura,
+					Candidatura.id_candidato,
+					Candidatura.id_vaga_de_emprego,
+				)
+			)
+			criadas = {
+				(row.id_candidato, row.id_vaga_de_emprego): row.id_candidatura
+				for row in rows
+			}
+			if criadas:
+				incrementCounters(database, candidaturas=len(criadas))
+				por_candidato = {}
+				for id_candidato, _ in criadas:
+					por_candidato[id_candidato] = por_candidato.get(id_candidato, 0) + 1
+				for id_candidato, quantidade in por_candidato.items():
+					incrementCandidatoStatistics(
+						database,
+						id_candidato,
+						data_candidatura=data,
+						**statusDeltas(Status.PENDENTE.value, quantidade),
+					)
+				markRecomendacoesPendentes(database, PENDENTE_CANDIDATO, por_candidato)
+		database.commit()
+		if criadas:
+			response_cache.invalidate(
+				*{vagaCacheTag(id_vaga_de_emprego) for _, id_vaga_de_emprego in criadas}
+			)
+
+		resultados = []
+		vistos = set()
+		for par in pares:
+			id_candidato, id_vaga_de_emprego = par
+			id_candidatura = None
+			if par in vistos:
+				resultado = ResultadoCandidatura.REPETIDA
+			elif id_candidato not in candidatos:
+				resultado = ResultadoCandidatura.CANDIDATO_NAO_ENCONTRADO
+			elif id_vaga_de_emprego not in vagas:
+				resultado = ResultadoCandidatura.VAGA_NAO_ENCONTRADA
+			elif par in criadas:
+				resultado = ResultadoCandidatura.CRIADA
+				id_candidatura = criadas[par]
+			else:
+				resultado = ResultadoCandidatura.JA_EXISTENTE
+			vistos.add(par)
+			resultados.append(
+				{
+					'id_candidato': id_candidato,
+					'id_vaga_de_emprego': id_vaga_de_emprego,
+					'resultado': resultado,
+					'id_candidatura': id_candidatura,
+				}
+			)
+		return {'criadas': len(criadas), 'resultados': resultados}
+
 	def updateCandidatura(candidatura: Candidatura, database: Session):
-		database.merge(candidatura)
+		merged = database.merge(candidatura)
+		history = inspect(merged).attrs.status.history
+		status_anterior = history.deleted[0] if history.deleted else None
+		if history.added and status_anterior is None:
+			# Status alterado num objeto expirado: o valor anterior só está no banco
+			with database.no_autoflush:
+				status_anterior = database.scalar(
+					select(Candidatura.status).where(
+						Candidatura.id_candidatura == merged.id_candidatura
+					)
+				)
+		if status_anterior is not None and status_anterior != merged.status:
+			incrementCandidatoStatistics(
+				database,
+				merged.id_candidato,
+				data_atualizacao=merged.data_atualizacao,
+				**statusChangeDeltas(status_anterior, merged.status),
+			)
 		database.commit()
+		response_cache.invalidate(vagaCacheTag(merged.id_vaga_de_emprego))
 		return candidatura
 
 	def deleteCandidatura(
 		candidatura: Candidatura, database: Session = Depends(getDatabase)
 	):
 		database.delete(candidatura)
+		incrementCounters(database, candidaturas=-1)
+		# As datas mais recentes não dá para decrementar: recalcula só este candidato
+		database.flush()
+		rebuildCandidatoStatistics(database, [candidatura.id_candidato])
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [candidatura.id_candidato]
+		)
 		database.commit()
+		response_cache.invalidate(vagaCacheTag(candidatura.id_vaga_de_emprego))
 		return True
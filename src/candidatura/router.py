@@ -1,12 +1,29 @@
+from typing import Union
+
 from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import engine, Base, getDatabase
+from ..database import getAsyncDatabase, getDatabase
 from .repository import CandidaturaRepository
-from .schema import CandidaturaBase, CandidaturaUpdate
+from .schema import (
+	CamposCandidatura,
+	CandidaturaBase,
+	CandidaturaBulkCreate,
+	CandidaturaBulkResponse,
+	CandidaturaCompletaPageResponse,
+	CandidaturaExistsResponse,
+	CandidaturaInboxPageResponse,
+	CandidaturaResponse,
+	CandidaturaUpdate,
+	CandidaturaWithVagaResponse,
+	Ordem,
+	OrdenacaoCandidatura,
+	Status,
+)
 from ..models import Candidatura
-
-Base.metadata.create_all(bind=engine)
+from ..notificacao.repository import NotificacaoRepository
+from ..notificacao.stream import publishNotificacoes
 
 router = APIRouter(
 	prefix='/candidaturas',
@@ -15,79 +32,110 @@ router = APIRouter(
 )
 
 
-@router.get('/')
-async def getAllCandidatura(database: Session = Depends(getDatabase)):
-	candidaturas = CandidaturaRepository.getAllCandidaturas(database)
+@router.get('/', response_model=list[CandidaturaResponse])
+async def getAllCandidatura(database: AsyncSession = Depends(getAsyncDatabase)):
+	candidaturas = await CandidaturaRepository.getAllCandidaturasAsync(database)
 	return candidaturas
 
 
-@router.get('/{id_candidatura}')
+@router.get('/{id_candidatura}', response_model=CandidaturaResponse)
 async def getCandidaturaById(
-	id_candidatura: int, database: Session = Depends(getDatabase)
+	id_candidatura: int, database: AsyncSession = Depends(getAsyncDatabase)
 ):
-	candidatura = CandidaturaRepository.getCandidaturaById(id_candidatura, database)
+	candidatura = await CandidaturaRepository.getCandidaturaByIdAsync(
+		id_candidatura, database
+	)
 	if candidatura is None:
 		raise HTTPException(status_code=404, detail='Candidatura not found')
 	return candidatura
 
 
-@router.get('/candidato/{id_candidato}')
+@router.get(
+	'/candidato/{id_candidato}', response_model=list[CandidaturaWithVagaResponse]
+)
 async def getCandidaturasFromCandidatoById(
 	id_candidato: int,
-	database: Session = Depends(getDatabase),
+	database: AsyncSession = Depends(getAsyncDatabase),
 	limit: int = Query(None, ge=1, le=5),
 ):
-	if limit:
-		candidaturas = (
-			CandidaturaRepository.getCandidaturasWithVagasDeEmpregoByCandidatoId(
-				id_candidato, database, limit
-			)
-		)
-	else:
-		candidaturas = (
-			CandidaturaRepository.getCandidaturasWithVagasDeEmpregoByCandidatoId(
-				id_candidato, database
-			)
+	candidaturas = (
+		await CandidaturaRepository.getCandidaturasWithVagasDeEmpregoByCandidatoIdAsync(
+			id_candidato, database, limit
 		)
+	)
 	return candidaturas
 
 
-@router.get('/vaga_de_emprego/{id_vaga_de_emprego}')
+@router.get(
+	'/vaga_de_emprego/{id_vaga_de_emprego}',
+	response_model=Union[CandidaturaInboxPageResponse, CandidaturaCompletaPageResponse],
+)
 async def getCandidaturasFromVagaDeEmpregoId(
-	id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
+	id_vaga_de_emprego: int,
+	database: AsyncSession = Depends(getAsyncDatabase),
+	limit: int = Query(20, ge=1, le=100),
+	cursor: str = Query(None),
+	status: Status = Query(None),
+	ordenar_por: OrdenacaoCandidatura = Query(OrdenacaoCandidatura.DATA),
+	ordem: Ordem = Query(Ordem.DESC),
+	campos: CamposCandidatura = Query(CamposCandidatura.RESUMO),
 ):
-	candidaturas = CandidaturaRepository.getCandidaturasWithCandidatoByVagaDeEmpregoId(
-		id_vaga_de_emprego, database
+	candidaturas = (
+		await CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPageAsync(
+			id_vaga_de_emprego,
+			database,
+			limit=limit,
+			cursor=cursor,
+			status=status,
+			ordenar_por=ordenar_por,
+			ordem=ordem,
+			campos=campos,
+		)
 	)
 	return candidaturas
 
 
-@router.get('/{id_vaga_de_emprego}/{id_candidato}')
+@router.get(
+	'/{id_vaga_de_emprego}/{id_candidato}', response_model=CandidaturaExistsResponse
+)
 async def candidaturaExists(
-	id_candidato: int, id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
+	id_candidato: int,
+	id_vaga_de_emprego: int,
+	database: AsyncSession = Depends(getAsyncDatabase),
 ):
-	candidatura_exists = CandidaturaRepository.candidaturaExists(
+	candidatura_exists = await CandidaturaRepository.candidaturaExistsAsync(
 		id_candidato, id_vaga_de_emprego, database
 	)
 	return {'has_applied': candidatura_exists}
 
 
-@router.post('/')
+@router.post('/', response_model=CandidaturaResponse)
 async def createCandidatura(
 	new_candidatura: CandidaturaBase, database: Session = Depends(getDatabase)
 ):
-	candidatura_already_exists = CandidaturaRepository.candidaturaExists(
-		new_candidatura.id_candidato, new_candidatura.id_vaga_de_emprego, database
-	)
-	if candidatura_already_exists:
-		raise HTTPException(status_code=400, detail='Candidatura already registered')
 	new_candidatura = CandidaturaRepository.createCandidatura(
 		Candidatura(**new_candidatura.model_dump()), database
 	)
+	if new_candidatura is None:
+		raise HTTPException(status_code=400, detail='Candidatura already registered')
 	return new_candidatura
 
 
-@router.put('/{id_candidatura}')
+@router.post('/bulk', response_model=CandidaturaBulkResponse)
+async def createCandidaturas(
+	candidaturas: CandidaturaBulkCreate, database: Session = Depends(getDatabase)
+):
+	return CandidaturaRepository.createCandidaturas(
+		[
+			(candidatura.id_candidato, candidatura.id_vaga_de_emprego)
+			for candidatura in candidaturas.candidaturas
+		],
+		candidaturas.data,
+		database,
+	)
+
+
+@router.put('/{id_candidatura}', response_model=CandidaturaResponse)
 async def updateCandidaturaById(
 	id_candidatura: int,
 	dados_atualizacao: CandidaturaUpdate,
@@ -98,15 +146,22 @@ async def updateCandidaturaById(
 	if not candidatura:
 		raise HTTPException(status_code=404, detail='Candidatura não encontrada')
 
-	candidatura.status = dados_atualizacao.status
+	status_anterior = candidatura.status
+	candidatura.status = dados_atualizacao.status.value
 	candidatura.data_atualizacao = dados_atualizacao.data_atualizacao
+	notificacoes = NotificacaoRepository.notifyStatusChanges(
+		[(candidatura, status_anterior)], database
+	)
 
 	updated_candidatura = CandidaturaRepository.updateCandidatura(candidatura, database)
+	await publishNotificacoes(notificacoes)
 
 	return updated_candidatura
 
 
-@router.delete('/{id_candidatura}')
+@router.delete(
+	'/{id_candidatura}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteCandidaturaById(
 	id_candidatura: int, database: Session = Depends(getDatabase)
 ):
@@ -4,7 +4,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from src.vaga_de_emprego.schema import VagaDeEmpregoBase
+from src.candidato.schema import CandidatoResponse
+from src.vaga_de_emprego.schema import VagaDeEmpregoResponse
 
 
 class Status(str, Enum):
@@ -24,6 +25,25 @@ class CandidaturaBase(BaseModel):
 	model_config = {'from_attributes': True}
 
 
+class OrdenacaoCandidatura(str, Enum):
+	DATA = 'data'
+	DATA_ATUALIZACAO = 'data_atualizacao'
+
+
+class Ordem(str, Enum):
+	ASC = 'asc'
+	DESC = 'desc'
+
+
+class CamposCandidatura(str, Enum):
+	RESUMO = 'resumo'
+	COMPLETO = 'completo'
+
+
+class CandidaturaExistsResponse(BaseModel):
+	has_applied: bool
+
+
 class CandidaturaUpdate(BaseModel):
 	status: Status
 	data_atualizacao: datetime
@@ -34,6 +54,62 @@ class CandidaturaResponse(CandidaturaBase):
 
 
 class CandidaturaWithVagaResponse(CandidaturaResponse):
-	vaga_de_emprego: VagaDeEmpregoBase
+	vaga: VagaDeEmpregoResponse
+
+	model_config = {'from_attributes': True}
+
+
+class CandidaturaInboxItem(BaseModel):
+	id_candidatura: int
+	id_candidato: int
+	status: Status
+	data: datetime
+	data_atualizacao: Optional[datetime] = None
+	nome: str
+	titulo_profissional: Optional[str] = None
+	estado: Optional[str] = None
+	cidade: Optional[str] = None
 
 	model_config = {'from_attributes': True}
+
+
+class CandidaturaWithCandidatoResponse(CandidaturaResponse):
+	candidato: CandidatoResponse
+
+
+class CandidaturaInboxPageResponse(BaseModel):
+	items: list[CandidaturaInboxItem]
+	next_cursor: Optional[str] = None
+
+
+class CandidaturaCompletaPageResponse(BaseModel):
+	items: list[CandidaturaWithCandidatoResponse]
+	next_cursor: Optional[str] = None
+
+
+class ResultadoCandidatura(str, Enum):
+	CRIADA = 'criada'
+	JA_EXISTENTE = 'ja_existente'
+	REPETIDA = 'repetida_na_requisicao'
+	CANDIDATO_NAO_ENCONTRADO = 'candidato_nao_encontrado'
+	VAGA_NAO_ENCONTRADA = 'vaga_nao_encontrada'
+
+
+class CandidaturaBulkItem(BaseModel):
+	id_candidato: int
+	id_vaga_de_emprego: int
+
+
+class CandidaturaBulkCreate(BaseModel):
+	candidaturas: list[CandidaturaBulkItem] = Field(min_length=1, max_length=500)
+	data: datetime = Field(default_factory=datetime.now)
+
+
+class CandidaturaBulkResult(CandidaturaBulkItem):
+	resultado: ResultadoCandidatura
+	id_candidatura: Optional[int] = None
+
+
+class CandidaturaBulkResponse(BaseModel):
+	criadas: int
+	resultados: list[CandidaturaBulkResult]
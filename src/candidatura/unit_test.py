@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
 import sys
 import pytest
@@ -8,6 +8,13 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from ..models import Candidatura, Usuario, VagaDeEmprego, Candidato, Empresa
 from .repository import CandidaturaRepository
+from .schema import (
+	CamposCandidatura,
+	Ordem,
+	OrdenacaoCandidatura,
+	ResultadoCandidatura,
+	Status,
+)
 from ..candidato.repository import CandidatoRepository
 from ..empresa.repository import EmpresaRepository
 from ..vaga_de_emprego.repository import VagaDeEmpregoRepository
@@ -102,6 +109,141 @@ def test_createCandidatura(candidatura, add_candidato, add_vaga_de_emprego, db):
 	assert result.status == candidatura.status
 
 
+def test_duplicateCandidatura_createCandidatura(add_candidato, add_vaga_de_emprego, db):
+	for _ in range(2):
+		result = CandidaturaRepository.createCandidatura(
+			Candidatura(
+				id_candidato=add_candidato.id_candidato,
+				id_vaga_de_emprego=add_vaga_de_emprego.id_vaga_de_emprego,
+				status=Status.PENDENTE,
+				data=datetime(2025, 10, 28),
+			),
+			db,
+		)
+	assert result is None
+	assert db.query(Candidatura).count() == 1
+
+
+def test_createCandidaturas(add_candidato, add_vaga_de_emprego, db):
+	CandidaturaRepository.createCandidatura(make_candidaturas()[0], db)
+	vaga = VagaDeEmpregoRepository.createVagaDeEmprego(
+		VagaDeEmprego(
+			id_vaga_de_emprego=2,
+			id_empresa=add_vaga_de_emprego.id_empresa,
+			nome_vaga_de_emprego='Desenvolvedor Frontend',
+			data=date(2023, 10, 29),
+			cidade='São Paulo',
+			estado='SP',
+			salario='7000.00',
+			cargo='Desenvolvedor Frontend',
+			nivel='Pleno',
+			tipo_contrato='CLT',
+			modalidade='Remoto',
+			descricao='Vaga para desenvolvedor frontend.',
+		),
+		db,
+	)
+
+	result = CandidaturaRepository.createCandidaturas(
+		[(1, 1), (1, 2), (1, 2), (99, 2), (1, 99)], datetime(2025, 11, 1), db
+	)
+
+	assert result['criadas'] == 1
+	assert [item['resultado'] for item in result['resultados']] == [
+		ResultadoCandidatura.JA_EXISTENTE,
+		ResultadoCandidatura.CRIADA,
+		ResultadoCandidatura.REPETIDA,
+		ResultadoCandidatura.CANDIDATO_NAO_ENCONTRADO,
+		ResultadoCandidatura.VAGA_NAO_ENCONTRADA,
+	]
+	created = CandidaturaRepository.getCandidaturaById(
+		result['resultados'][1]['id_candidatura'], db
+	)
+	assert created.id_vaga_de_emprego == vaga.id_vaga_de_emprego
+	assert created.status == 'Pendente'
+	assert db.query(Candidatura).count() == 2
+
+
+@pytest.fixture
+def add_candidaturas_inbox(add_vaga_de_emprego, db):
+	for id in range(1, 6):
+		UsuarioRepository.createUsuario(
+			Usuario(
+				id=id,
+				nome=f'Candidato {id}',
+				email=f'candidato{id}@example.com',
+				senha='123',
+				papel='candidato',
+			),
+			db,
+		)
+		CandidatoRepository.createCandidato(
+			Candidato(
+				id_candidato=id,
+				nome=f'Candidato {id}',
+				email=f'candidato{id}@example.com',
+				titulo_profissional='Desenvolvedor',
+				resumo='Resumo longo ' * 50,
+			),
+			db,
+		)
+		CandidaturaRepository.createCandidatura(
+			Candidatura(
+				id_candidato=id,
+				id_vaga_de_emprego=add_vaga_de_emprego.id_vaga_de_emprego,
+				status='Em análise' if id % 2 else 'Pendente',
+				data=datetime(2025, 1, id),
+				data_atualizacao=datetime(2025, 2, 6 - id) if id > 3 else None,
+			),
+			db,
+		)
+
+
+def test_getCandidaturasByVagaDeEmpregoIdPage(add_candidaturas_inbox, db):
+	first_page = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, limit=2
+	)
+	second_page = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, limit=2, cursor=first_page['next_cursor']
+	)
+	last_page = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, limit=2, cursor=second_page['next_cursor']
+	)
+
+	pages = [first_page, second_page, last_page]
+	assert [[item.id_candidato for item in page['items']] for page in pages] == [
+		[5, 4],
+		[3, 2],
+		[1],
+	]
+	assert last_page['next_cursor'] is None
+	assert first_page['items'][0].nome == 'Candidato 5'
+	assert 'resumo' not in first_page['items'][0]._fields
+
+
+def test_getCandidaturasByVagaDeEmpregoIdPage_filters_and_sorts(
+	add_candidaturas_inbox, db
+):
+	em_analise = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, status=Status.ANALISE, ordem=Ordem.ASC
+	)
+	por_atualizacao = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, ordenar_por=OrdenacaoCandidatura.DATA_ATUALIZACAO
+	)
+
+	assert [item.id_candidato for item in em_analise['items']] == [1, 3, 5]
+	assert [item.id_candidato for item in por_atualizacao['items']] == [4, 5, 3, 2, 1]
+
+
+def test_getCandidaturasByVagaDeEmpregoIdPage_completo(add_candidaturas_inbox, db):
+	page = CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPage(
+		1, db, limit=1, campos=CamposCandidatura.COMPLETO
+	)
+
+	assert page['items'][0].candidato.resumo.startswith('Resumo longo')
+	assert page['next_cursor'] is not None
+
+
 @pytest.mark.parametrize('candidatura', make_candidaturas())
 def test_candidaturaExists(candidatura, add_candidato, add_vaga_de_emprego, db):
 	CandidaturaRepository.createCandidatura(candidatura, db)
@@ -161,3 +303,61 @@ def test_nonExistentCandidatura_deleteCandidatura(
 ):
 	with pytest.raises(Exception):
 		CandidaturaRepository.deleteCandidatura(candidatura, db)
+
+
+def test_candidaturaExistsAsync(run_async_db):
+	async def scenario(database):
+		database.add(
+			Usuario(
+				id=1,
+				nome='João',
+				email='joao@example.com',
+				senha='123',
+				papel='candidato',
+			)
+		)
+		database.add(
+			Candidato(id_candidato=1, nome='João Silva', email='joao@example.com')
+		)
+		database.add(
+			Empresa(
+				id_empresa=1,
+				nome_empresa='Empresa G',
+				cnpj='12345671234567',
+				cidade='Gama',
+				estado='DF',
+			)
+		)
+		database.add(
+			VagaDeEmprego(
+				id_vaga_de_emprego=1,
+				id_empresa=1,
+				nome_vaga_de_emprego='Desenvolvedor Backend',
+				data=date(2023, 10, 28),
+				cidade='São Paulo',
+				estado='SP',
+				salario='8000.00',
+				cargo='Desenvolvedor Backend',
+				nivel='Pleno',
+				tipo_contrato='CLT',
+				modalidade='Presencial',
+				descricao='Vaga para desenvolvedor backend.',
+			)
+		)
+		database.add_all(make_candidaturas())
+		await database.commit()
+
+		exists = await CandidaturaRepository.candidaturaExistsAsync(1, 1, database)
+		not_exists = await CandidaturaRepository.candidaturaExistsAsync(1, 2, database)
+		candidaturas = await (
+			CandidaturaRepository.getCandidaturasWithVagasDeEmpregoByCandidatoIdAsync(
+				1, database
+			)
+		)
+		return exists, not_exists, candidaturas
+
+	exists, not_exists, candidaturas = run_async_db(scenario)
+
+	assert exists
+	assert not not_exists
+	assert candidaturas[0].vaga.nome_vaga_de_emprego == 'Desenvolvedor Backend'
@@ -1,12 +1,12 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import pytest
 
-from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 project_root = Path(__file__).resolve().parent
 sys.path.append(str(project_root))
@@ -26,33 +26,13 @@ DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///:memory:')
 
 print(f'--- INICIANDO TESTES COM DATABASE: {DATABASE_URL} ---')
 
-engine_args = {}
-
-if DATABASE_URL.startswith('sqlite'):
-	print('--- Configurando para SQLite (local) ---')
-	engine_args['connect_args'] = {'check_same_thread': False}
-	engine_args['poolclass'] = StaticPool
-else:
-	print('--- Configurando para PostgreSQL (Docker) ---')
-	pass
-
-engine = create_engine(DATABASE_URL, **engine_args)
-
-if DATABASE_URL.startswith('sqlite'):
-
-	@event.listens_for(Engine, 'connect')
-	def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
-		"""Ativa o suporte a Foreign Keys no SQLite."""
-		print('--- Habilitando Foreign Keys (PRAGMA) para SQLite ---')
-		cursor = dbapi_connection.cursor()
-		cursor.execute('PRAGMA foreign_keys=ON')
-		cursor.close()
-
-
 try:
-	from src.database import Base
+	from src.database import Base, createAsyncDatabaseEngine, createDatabaseEngine
 except ImportError:
-	from .database import Base
+	from .database import Base, createAsyncDatabaseEngine, createDatabaseEngine
+
+# Mesma configuração de pool e PRAGMAs (WAL, foreign keys) usada pela aplicação
+engine = createDatabaseEngine(DATABASE_URL, name='testing')
 
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -84,3 +64,30 @@ def db(db_engine):
 	session.close()
 	transaction.rollback()
 	connection.close()
+
+
+@pytest.fixture(scope='function')
+def run_async_db():
+	"""
+	Executa um cenário assíncrono com uma AsyncSession ligada a um
+	banco SQLite em memória próprio, criado e descartado a cada chamada.
+	"""
+
+	def run(scenario):
+		async def main():
+			async_engine = createAsyncDatabaseEngine(
+				'sqlite+aiosqlite:///:memory:', name='testing_async'
+			)
+			async with async_engine.begin() as connection:
+				await connection.run_sync(Base.metadata.create_all)
+			try:
+				async with AsyncSession(
+					async_engine, autoflush=False, expire_on_commit=False
+				) as session:
+					return await scenario(session)
+			finally:
+				await async_engine.dispose()
+
+		return asyncio.run(main())
+
+	return run
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import (
+	Candidato,
+	Candidatura,
+	Empresa,
+	PlatformCounters,
+	Usuario,
+	VagaDeEmprego,
+)
+
+PLATFORM_COUNTERS_ID = 1
+
+COUNTED_MODELS = {
+	'usuarios': Usuario,
+	'candidatos': Candidato,
+	'empresas': Empresa,
+	'vagas': VagaDeEmprego,
+	'candidaturas': Candidatura,
+}
+
+
+def incrementCounters(database: Session, **deltas: int):
+	deltas = {counter: delta for counter, delta in deltas.items() if delta}
+	if not deltas:
+		return
+	updated = database.execute(
+		update(PlatformCounters)
+		.where(PlatformCounters.id == PLATFORM_COUNTERS_ID)
+		.values(
+			{
+				counter: getattr(PlatformCounters, counter) + delta
+				for counter, delta in deltas.items()
+			}
+		)
+	).rowcount
+	if not updated:
+		# Primeira escrita: cria a linha com as contagens exatas, já incluindo
+		# as alterações pendentes desta transação
+		database.flush()
+		reconcileCounters(database)
+
+
+def getCounters(database: Session):
+	counters = database.get(PlatformCounters, PLATFORM_COUNTERS_ID)
+	if counters is None:
+		reconcileCounters(database)
+		database.commit()
+		counters = database.get(PlatformCounters, PLATFORM_COUNTERS_ID)
+	return counters
+
+
+def insertCountersRow(database: Session):
+	# Duas primeiras escritas concorrentes tentam criar a linha: a segunda
+	# não falha na chave primária, espera a primeira e segue para a recontagem
+	if database.get_bind().dialect.name == 'postgresql':
+		statement = postgresql.insert(PlatformCounters)
+	else:
+		statement = sqlite.insert(PlatformCounters)
+	database.execute(
+		statement.values(
+			id=PLATFORM_COUNTERS_ID,
+			**{counter: 0 for counter in COUNTED_MODELS},
+		).on_conflict_do_nothing(index_elements=['id'])
+	)
+
+
+def reconcileCounters(database: Session):
+	insertCountersRow(database)
+	# Bloqueia a linha para que incrementos concorrentes esperem a recontagem
+	counters = (
+		database.query(PlatformCounters)
+		.filter(PlatformCounters.id == PLATFORM_COUNTERS_ID)
+		.with_for_update()
+		.one()
+	)
+
+	drift = {}
+	for counter, model in COUNTED_MODELS.items():
+		exact = database.query(func.count()).select_from(model).scalar()
+		drift[counter] = exact - (getattr(counters, counter) or 0)
+		setattr(counters, counter, exact)
+	counters.data_reconciliacao = datetime.now()
+	database.flush()
+	return drift
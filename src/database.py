@@ -1,13 +1,195 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+
+from .profiling import recordQuery
 
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///:memory:')
 
-engine = create_engine(DATABASE_URL)
+DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv('DATABASE_POOL_TIMEOUT', 30))
+DATABASE_POOL_RECYCLE = int(os.getenv('DATABASE_POOL_RECYCLE', 1800))
+DATABASE_POOL_PRE_PING = os.getenv('DATABASE_POOL_PRE_PING', 'true').lower() == 'true'
+DATABASE_STATEMENT_TIMEOUT_MS = int(os.getenv('DATABASE_STATEMENT_TIMEOUT_MS', 30000))
+
+SQLITE_PRAGMAS = (
+	'PRAGMA journal_mode=WAL',
+	'PRAGMA synchronous=NORMAL',
+	'PRAGMA foreign_keys=ON',
+)
+
+# Cada conexão a ':memory:' abre um banco vazio próprio: a aplicação usa um
+# banco em memória nomeado, com cache compartilhado, visto pelos dois engines
+SQLITE_SHARED_MEMORY_DATABASE = 'file:talent_base'
+SQLITE_SHARED_MEMORY_QUERY = {'mode': 'memory', 'cache': 'shared', 'uri': 'true'}
+
+ASYNC_DRIVERS = {
+	'postgresql': 'postgresql+asyncpg',
+	'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def isSqliteMemory(url):
+	return url.get_backend_name() == 'sqlite' and (
+		url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+	)
+
+
+def getSharedMemoryUrl(database_url: str):
+	url = make_url(database_url)
+	if url.get_backend_name() != 'sqlite' or url.database not in (None, '', ':memory:'):
+		return database_url
+	return url.set(
+		database=SQLITE_SHARED_MEMORY_DATABASE, query=SQLITE_SHARED_MEMORY_QUERY
+	).render_as_string(hide_password=False)
+
+
+def getAsyncDatabaseUrl(database_url: str):
+	url = make_url(database_url)
+	return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+ASYNC_DATABASE_URL = os.getenv(
+	'ASYNC_DATABASE_URL',
+	getAsyncDatabaseUrl(DATABASE_URL).render_as_string(hide_password=False),
+)
+
+
+class PoolMetrics:
+	def __init__(self, engine):
+		self.engine = engine
+		self.connections = 0
+		self.checkouts = 0
+		self.checkins = 0
+		self.invalidations = 0
+
+	def snapshot(self):
+		pool = self.engine.pool
+		return {
+			'pool': type(pool).__name__,
+			'size': pool.size() if hasattr(pool, 'size') else None,
+			'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+			'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+			'connections': self.connections,
+			'checkouts': self.checkouts,
+			'checkins': self.checkins,
+			'invalidations': self.invalidations,
+		}
+
+
+pool_metrics = {}
+
+
+def getEngineOptions(database_url: str):
+	url = make_url(database_url)
+	if url.get_backend_name() == 'sqlite':
+		options = {'connect_args': {'check_same_thread': False}}
+		# Banco em memória: o engine reusa uma única conexão, que mantém o banco
+		# vivo (ele some quando a última conexão fecha). Outro engine só enxerga
+		# o mesmo banco pelo URI compartilhado (getSharedMemoryUrl)
+		if isSqliteMemory(url):
+			options['poolclass'] = StaticPool
+		return options
+
+	options = {
+		'pool_size': DATABASE_POOL_SIZE,
+		'max_overflow': DATABASE_MAX_OVERFLOW,
+		'pool_timeout': DATABASE_POOL_TIMEOUT,
+		'pool_recycle': DATABASE_POOL_RECYCLE,
+		'pool_pre_ping': DATABASE_POOL_PRE_PING,
+	}
+	if url.get_backend_name() == 'postgresql' and DATABASE_STATEMENT_TIMEOUT_MS:
+		# Enviado na abertura da conexão, sem um round-trip extra por SET
+		if url.get_driver_name() == 'asyncpg':
+			options['connect_args'] = {
+				'server_settings': {
+					'statement_timeout': str(DATABASE_STATEMENT_TIMEOUT_MS)
+				}
+			}
+		else:
+			options['connect_args'] = {
+				'options': f'-c statement_timeout={DATABASE_STATEMENT_TIMEOUT_MS}'
+			}
+	return options
+
+
+def registerEngineEvents(engine, name: str):
+	metrics = PoolMetrics(engine)
+	pool_metrics[name] = metrics
+
+	@event.listens_for(engine, 'connect')
+	def onConnect(dbapi_connection, connection_record):
+		metrics.connections += 1
+		if engine.dialect.name == 'sqlite':
+			cursor = dbapi_connection.cursor()
+			for pragma in SQLITE_PRAGMAS:
+				cursor.execute(pragma)
+			cursor.close()
+
+	@event.listens_for(engine, 'checkout')
+	def onCheckout(dbapi_connection, connection_record, connection_proxy):
+		metrics.checkouts += 1
+
+	@event.listens_for(engine, 'checkin')
+	def onCheckin(dbapi_connection, connection_record):
+		metrics.checkins += 1
+
+	@event.listens_for(engine, 'invalidate')
+	def onInvalidate(dbapi_connection, connection_record, exception):
+		metrics.invalidations += 1
+
+	@event.listens_for(engine, 'before_cursor_execute')
+	def beforeCursorExecute(
+		connection, cursor, statement, parameters, context, executemany
+	):
+		connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+	@event.listens_for(engine, 'after_cursor_execute')
+	def afterCursorExecute(
+		connection, cursor, statement, parameters, context, executemany
+	):
+		started = connection.info['query_started'].pop()
+		recordQuery(statement, time.perf_counter() - started)
+
+	@event.listens_for(engine, 'handle_error')
+	def onError(exception_context):
+		# Consulta que falhou não passa pelo after_cursor_execute
+		connection = exception_context.connection
+		if connection is not None and connection.info.get('query_started'):
+			connection.info['query_started'].pop()
+
+	return engine
+
+
+def createDatabaseEngine(database_url: str, name: str = 'sync'):
+	engine = create_engine(database_url, **getEngineOptions(database_url))
+	return registerEngineEvents(engine, name)
+
+
+def createAsyncDatabaseEngine(database_url: str, name: str = 'async'):
+	async_engine = create_async_engine(database_url, **getEngineOptions(database_url))
+	registerEngineEvents(async_engine.sync_engine, name)
+	return async_engine
+
+
+def getPoolStatistics():
+	return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+
+engine = createDatabaseEngine(getSharedMemoryUrl(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = createAsyncDatabaseEngine(getSharedMemoryUrl(ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(
+	async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 def getDatabase(expire_on_commit: bool = True):
 	db = SessionLocal(expire_on_commit=expire_on_commit)
@@ -15,3 +197,8 @@ def getDatabase(expire_on_commit: bool = True):
 		yield db
 	finally:
 		db.close()
+
+
+async def getAsyncDatabase():
+	async with AsyncSessionLocal() as db:
+		yield db
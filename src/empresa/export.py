@@ -0,0 +1,99 @@
+import csv
+from datetime import date, datetime, time, timedelta
+import io
+
+import orjson
+from sqlalchemy import select
+
+from ..database import AsyncSessionLocal
+from ..models import Candidato, Candidatura, VagaDeEmprego
+
+EXPORT_BATCH_SIZE = 500
+
+CANDIDATURA_EXPORT_COLUMNS = (
+	Candidatura.id_candidatura,
+	Candidatura.status,
+	Candidatura.data,
+	Candidatura.data_atualizacao,
+	VagaDeEmprego.id_vaga_de_emprego,
+	VagaDeEmprego.nome_vaga_de_emprego,
+	Candidato.id_candidato,
+	Candidato.nome.label('nome_candidato'),
+	Candidato.email.label('email_candidato'),
+	Candidato.titulo_profissional,
+	Candidato.cidade.label('cidade_candidato'),
+	Candidato.estado.label('estado_candidato'),
+)
+
+
+def candidaturasExportStatement(
+	id_empresa: int,
+	status: str = None,
+	data_inicio: date = None,
+	data_fim: date = None,
+):
+	statement = (
+		select(*CANDIDATURA_EXPORT_COLUMNS)
+		.join(
+			VagaDeEmprego,
+			VagaDeEmprego.id_vaga_de_emprego == Candidatura.id_vaga_de_emprego,
+		)
+		.join(Candidato, Candidato.id_candidato == Candidatura.id_candidato)
+		.where(VagaDeEmprego.id_empresa == id_empresa)
+	)
+	if status:
+		statement = statement.where(Candidatura.status == status)
+	# Intervalo de dias inclusivo nas duas pontas
+	if data_inicio:
+		statement = statement.where(
+			Candidatura.data >= datetime.combine(data_inicio, time.min)
+		)
+	if data_fim:
+		statement = statement.where(
+			Candidatura.data < datetime.combine(data_fim + timedelta(days=1), time.min)
+		)
+	# Mesma ordem do índice (vaga, data, id): o banco entrega as linhas sem ordenar
+	return statement.order_by(
+		VagaDeEmprego.id_vaga_de_emprego,
+		Candidatura.data,
+		Candidatura.id_candidatura,
+	).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def formatNdjson(rows: list, cabecalho: bool):
+	return b''.join(orjson.dumps(row._asdict()) + b'\n' for row in rows)
+
+
+def formatCsv(rows: list, cabecalho: bool):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	if cabecalho:
+		writer.writerow(column.key for column in CANDIDATURA_EXPORT_COLUMNS)
+	for row in rows:
+		writer.writerow(
+			value.isoformat() if isinstance(value, datetime) else value for value in row
+		)
+	return buffer.getvalue().encode()
+
+
+EXPORT_FORMATS = {
+	'ndjson': ('application/x-ndjson', formatNdjson),
+	'csv': ('text/csv; charset=utf-8', formatCsv),
+}
+
+
+async def candidaturasExport(
+	statement, formato: str, database_factory=AsyncSessionLocal
+):
+	# Sessão própria: a do Depends fecha antes do corpo terminar de ser enviado.
+	# O stream usa cursor no servidor e só um lote fica em memória por vez
+	format_rows = EXPORT_FORMATS[formato][1]
+	cabecalho = True
+	async with database_factory() as database:
+		result = await database.stream(statement)
+		async for rows in result.partitions():
+			yield format_rows(rows, cabecalho)
+			cabecalho = False
+	if cabecalho and formato == 'csv':
+		# Exportação vazia ainda traz o cabeçalho
+		yield format_rows([], True)
@@ -1,54 +1,93 @@
 from fastapi import Depends
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..candidatura.schema import Status
+from ..counters import incrementCounters
 from ..database import getDatabase
 from ..models import Candidatura, Empresa, VagaDeEmprego
+from ..response_cache import CACHE_TAG_EMPRESAS, response_cache
+
+
+def empresaStatisticsStatement(id_empresa: int):
+	# Uma única varredura: vagas da empresa com agregação condicional por status
+	contagens_por_status = [
+		func.coalesce(
+			func.sum(case((Candidatura.status == status.value, 1), else_=0)), 0
+		).label(status.name)
+		for status in Status
+	]
+	return (
+		select(
+			VagaDeEmprego.id_vaga_de_emprego,
+			VagaDeEmprego.nome_vaga_de_emprego,
+			func.count(Candidatura.id_candidatura).label('candidaturas'),
+			*contagens_por_status,
+		)
+		.outerjoin(
+			Candidatura,
+			Candidatura.id_vaga_de_emprego == VagaDeEmprego.id_vaga_de_emprego,
+		)
+		.where(VagaDeEmprego.id_empresa == id_empresa)
+		.group_by(VagaDeEmprego.id_vaga_de_emprego, VagaDeEmprego.nome_vaga_de_emprego)
+		.order_by(VagaDeEmprego.id_vaga_de_emprego)
+	)
+
+
+def empresaStatistics(vagas: list):
+	candidaturas_por_status = {
+		status.value: sum(getattr(vaga, status.name) for vaga in vagas)
+		for status in Status
+	}
+
+	return {
+		'vagas_totais': len(vagas),
+		'candidatos_totais': sum(vaga.candidaturas for vaga in vagas),
+		'candidaturas_pendentes': candidaturas_por_status[Status.PENDENTE.value],
+		'candidaturas_por_status': candidaturas_por_status,
+		'candidaturas_por_vaga': [
+			{
+				'id_vaga_de_emprego': vaga.id_vaga_de_emprego,
+				'nome_vaga_de_emprego': vaga.nome_vaga_de_emprego,
+				'candidaturas': vaga.candidaturas,
+			}
+			for vaga in vagas
+		],
+	}
 
 
 class EmpresaRepository:
 	def getAllEmpresas(database: Session = Depends(getDatabase)):
 		return database.query(Empresa).all()
 
+	async def getAllEmpresasAsync(database: AsyncSession):
+		result = await database.execute(select(*Empresa.__table__.columns))
+		return result.all()
+
 	def getEmpresaById(id_empresa: int, database: Session = Depends(getDatabase)):
 		empresa = (
 			database.query(Empresa).filter(Empresa.id_empresa == id_empresa).first()
 		)
 		return empresa
 
+	async def getEmpresaByIdAsync(id_empresa: int, database: AsyncSession):
+		return await database.get(Empresa, id_empresa)
+
+	async def getEmpresaVersaoAsync(id_empresa: int, database: AsyncSession):
+		return await database.scalar(
+			select(Empresa.versao).where(Empresa.id_empresa == id_empresa)
+		)
+
 	def getStatisticsByEmpresaId(
 		id_empresa: int, database: Session = Depends(getDatabase)
 	):
-		vagas_totais = (
-			database.query(VagaDeEmprego)
-			.filter(VagaDeEmprego.id_empresa == id_empresa)
-			.count()
-		)
-		candidatos_totais = (
-			database.query(Candidatura)
-			.join(
-				VagaDeEmprego,
-				Candidatura.id_vaga_de_emprego == VagaDeEmprego.id_vaga_de_emprego,
-			)
-			.filter(VagaDeEmprego.id_empresa == id_empresa)
-			.count()
-		)
-		candidaturas_pendentes = (
-			database.query(Candidatura)
-			.join(
-				VagaDeEmprego,
-				Candidatura.id_vaga_de_emprego == VagaDeEmprego.id_vaga_de_emprego,
-			)
-			.filter(
-				VagaDeEmprego.id_empresa == id_empresa, Candidatura.status == 'Pendente'
-			)
-			.count()
-		)
+		vagas = database.execute(empresaStatisticsStatement(id_empresa)).all()
+		return empresaStatistics(vagas)
 
-		return {
-			'vagas_totais': vagas_totais,
-			'candidatos_totais': candidatos_totais,
-			'candidaturas_pendentes': candidaturas_pendentes,
-		}
+	async def getStatisticsByEmpresaIdAsync(id_empresa: int, database: AsyncSession):
+		vagas = (await database.execute(empresaStatisticsStatement(id_empresa))).all()
+		return empresaStatistics(vagas)
 
 	def empresaAlredyExists(
 		cnpj: str, nome_empresa: str, database: Session = Depends(getDatabase)
@@ -65,16 +104,21 @@ class EmpresaRepository:
 
 	def createEmpresa(new_empresa: Empresa, database: Session = Depends(getDatabase)):
 		database.add(new_empresa)
+		incrementCounters(database, empresas=1)
 		database.commit()
+		response_cache.invalidate(CACHE_TAG_EMPRESAS)
 		database.refresh(new_empresa)
 		return new_empresa
 
 	def updateEmpresa(empresa: Empresa, database: Session = Depends(getDatabase)):
 		database.merge(empresa)
 		database.commit()
+		response_cache.invalidate(CACHE_TAG_EMPRESAS)
 		return empresa
 
 	def deleteEmpresa(empresa: Empresa, database: Session = Depends(getDatabase)):
 		database.delete(empresa)
+		incrementCounters(database, empresas=-1)
 		database.commit()
+		response_cache.invalidate(CACHE_TAG_EMPRESAS)
 		return True
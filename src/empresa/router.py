@@ -1,17 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..auth.repository import requireGestor
 
-from ..database import engine, Base, getDatabase
+from ..database import getAsyncDatabase, getDatabase
+from ..etag import makeEtag, notModified, setEtag
+from ..response_cache import CACHE_TAG_EMPRESAS, cachedJsonResponse
+from .export import EXPORT_FORMATS, candidaturasExport, candidaturasExportStatement
 from .repository import EmpresaRepository
-from .schema import EmpresaBase
+from .schema import (
+	EmpresaBase,
+	EmpresaResponse,
+	EmpresaStatisticsResponse,
+	FormatoExportacao,
+)
+from ..candidatura.schema import Status
 from ..models import Empresa, Usuario
 
 from ..vaga_de_emprego.repository import VagaDeEmpregoRepository
 from ..gestor.repository import GestorRepository
-
-Base.metadata.create_all(bind=engine)
+from ..gestor.schema import GestorResponse
+from ..vaga_de_emprego.schema import VagaDeEmpregoResponse
 
 router = APIRouter(
 	prefix='/empresas',
@@ -19,32 +33,90 @@ router = APIRouter(
 	responses={404: {'description': 'Not found'}},
 )
 
+EMPRESAS_ADAPTER = TypeAdapter(list[EmpresaResponse])
 
-@router.get('/')
-async def getEmpresas(database: Session = Depends(getDatabase)):
-	empresas = EmpresaRepository.getAllEmpresas(database)
-	return empresas
 
+@router.get('/', response_model=list[EmpresaResponse])
+async def getEmpresas(database: AsyncSession = Depends(getAsyncDatabase)):
+	async def load():
+		return await EmpresaRepository.getAllEmpresasAsync(database)
 
-@router.get('/{id_empresa}')
-async def getEmpresaById(id_empresa: int, database: Session = Depends(getDatabase)):
-	empresa = EmpresaRepository.getEmpresaById(id_empresa, database)
+	return await cachedJsonResponse(
+		'empresas', {}, (CACHE_TAG_EMPRESAS,), EMPRESAS_ADAPTER, load
+	)
+
+
+@router.get('/{id_empresa}', response_model=EmpresaResponse)
+async def getEmpresaById(
+	id_empresa: int,
+	response: Response,
+	if_none_match: str = Header(None),
+	database: AsyncSession = Depends(getAsyncDatabase),
+):
+	if if_none_match:
+		versao = await EmpresaRepository.getEmpresaVersaoAsync(id_empresa, database)
+		if versao is not None:
+			not_modified = notModified(
+				if_none_match, makeEtag('empresa', id_empresa, versao)
+			)
+			if not_modified:
+				return not_modified
+	empresa = await EmpresaRepository.getEmpresaByIdAsync(id_empresa, database)
 	if not empresa:
 		raise HTTPException(status_code=404, detail='Empresa não encontrada')
+	setEtag(response, makeEtag('empresa', id_empresa, empresa.versao))
 	return empresa
 
 
-@router.get('/{id_empresa}/stats')
+@router.get('/{id_empresa}/stats', response_model=EmpresaStatisticsResponse)
 async def getStatisticsByEmpresaId(
 	id_empresa: int,
-	database: Session = Depends(getDatabase),
+	database: AsyncSession = Depends(getAsyncDatabase),
 	current_user: Usuario = Depends(requireGestor),
 ):
-	statistics = EmpresaRepository.getStatisticsByEmpresaId(id_empresa, database)
+	statistics = await EmpresaRepository.getStatisticsByEmpresaIdAsync(
+		id_empresa, database
+	)
 	return statistics
 
 
-@router.post('/')
+@router.get('/{id_empresa}/candidaturas/export', response_class=StreamingResponse)
+async def exportCandidaturasByEmpresaId(
+	id_empresa: int,
+	formato: FormatoExportacao = Query(FormatoExportacao.NDJSON),
+	status: Status = Query(None),
+	data_inicio: date = Query(None),
+	data_fim: date = Query(None),
+	database: AsyncSession = Depends(getAsyncDatabase),
+	current_user: Usuario = Depends(requireGestor),
+):
+	# Exporta nome, email e cidade dos candidatos: só da empresa do gestor
+	gestor = await GestorRepository.getGestorByIdAsync(current_user.id, database)
+	if gestor is None or gestor.id_empresa != id_empresa:
+		raise HTTPException(
+			status_code=403,
+			detail='Você não pode exportar candidaturas de outra empresa.',
+		)
+	empresa = await EmpresaRepository.getEmpresaByIdAsync(id_empresa, database)
+	if not empresa:
+		raise HTTPException(status_code=404, detail='Empresa não encontrada')
+
+	statement = candidaturasExportStatement(
+		id_empresa, status.value if status else None, data_inicio, data_fim
+	)
+	media_type = EXPORT_FORMATS[formato.value][0]
+	return StreamingResponse(
+		candidaturasExport(statement, formato.value),
+		media_type=media_type,
+		headers={
+			'Content-Disposition': (
+				f'attachment; filename=candidaturas-empresa-{id_empresa}.{formato.value}'
+			)
+		},
+	)
+
+
+@router.post('/', response_model=EmpresaResponse)
 async def createEmpresa(
 	empresa_data: EmpresaBase, database: Session = Depends(getDatabase)
 ):
@@ -60,7 +132,9 @@ async def createEmpresa(
 		return new_empresa
 
 
-@router.delete('/{id_empresa}')
+@router.delete(
+	'/{id_empresa}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteEmpresaById(id_empresa: int, database: Session = Depends(getDatabase)):
 	empresa = EmpresaRepository.getEmpresaById(id_empresa, database)
 	if not empresa:
@@ -71,7 +145,7 @@ async def deleteEmpresaById(id_empresa: int, database: Session = Depends(getData
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.put('/{id_empresa}')
+@router.put('/{id_empresa}', response_model=EmpresaResponse)
 async def updateEmpresaById(
 	id_empresa: int,
 	empresa_data: EmpresaBase,
@@ -87,24 +161,21 @@ async def updateEmpresaById(
 	return updated_empresa
 
 
-@router.get('/{id_empresa}/vagas_de_emprego')
+@router.get(
+	'/{id_empresa}/vagas_de_emprego', response_model=list[VagaDeEmpregoResponse]
+)
 async def getEmpresasVagaDeEmprego(
 	id_empresa: int,
-	database: Session = Depends(getDatabase),
+	database: AsyncSession = Depends(getAsyncDatabase),
 	limit: int = Query(None, ge=1, le=5),
 ):
-	if limit:
-		vagas_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaId(
-			id_empresa, database, limit
-		)
-	else:
-		vagas_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaId(
-			id_empresa, database
-		)
+	vagas_de_emprego = await VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaIdAsync(
+		id_empresa, database, limit
+	)
 	return vagas_de_emprego
 
 
-@router.get('{id_empresa}/getores')
+@router.get('{id_empresa}/getores', response_model=list[GestorResponse])
 async def getEmpresasGestores(
 	id_empresa: int, database: Session = Depends(getDatabase)
 ):
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Optional
 from pydantic import BaseModel
 
@@ -13,3 +14,22 @@ class EmpresaBase(BaseModel):
 
 class EmpresaResponse(EmpresaBase):
 	id_empresa: int
+
+
+class VagaStatisticsResponse(BaseModel):
+	id_vaga_de_emprego: int
+	nome_vaga_de_emprego: str
+	candidaturas: int
+
+
+class EmpresaStatisticsResponse(BaseModel):
+	vagas_totais: int
+	candidatos_totais: int
+	candidaturas_pendentes: int
+	candidaturas_por_status: dict[str, int]
+	candidaturas_por_vaga: list[VagaStatisticsResponse]
+
+
+class FormatoExportacao(str, Enum):
+	NDJSON = 'ndjson'
+	CSV = 'csv'
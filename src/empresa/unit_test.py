@@ -1,11 +1,23 @@
+import csv
+import io
+import json
 import sys
 from pathlib import Path
 import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from ..models import Empresa
+from datetime import date, datetime
+
+from ..auth.cache import UsuarioSnapshot
+from ..models import Candidato, Candidatura, Empresa, Gestor, Usuario, VagaDeEmprego
+from .export import candidaturasExport, candidaturasExportStatement
 from .repository import EmpresaRepository
+from .router import exportCandidaturasByEmpresaId
+from .schema import FormatoExportacao
 
 
 def make_empresas():
@@ -115,3 +127,260 @@ def test_deleteEmpresa(empresa, db):
 def test_nonExistentEmpresa_deleteEmpresa(empresa, db):
 	with pytest.raises(Exception):
 		EmpresaRepository.deleteEmpresa(empresa, db)
+
+
+def make_vaga_de_emprego(id_empresa, nome):
+	return VagaDeEmprego(
+		id_empresa=id_empresa,
+		nome_vaga_de_emprego=nome,
+		data=date(2023, 10, 28),
+		cidade='Gama',
+		estado='DF',
+		salario='5000.00',
+		cargo=nome,
+		nivel='Pleno',
+		tipo_contrato='CLT',
+		modalidade='Remoto',
+		descricao='Descrição da vaga',
+	)
+
+
+def test_getStatisticsByEmpresaId(sample_empresa, db):
+	empresa = EmpresaRepository.createEmpresa(sample_empresa, db)
+	vagas = [
+		make_vaga_de_emprego(empresa.id_empresa, 'Backend'),
+		make_vaga_de_emprego(empresa.id_empresa, 'Frontend'),
+		make_vaga_de_emprego(empresa.id_empresa, 'Sem candidatos'),
+	]
+	db.add_all(vagas)
+	db.flush()
+
+	status_por_candidato = ['Pendente', 'Pendente', 'Aceito']
+	for i, status in enumerate(status_por_candidato):
+		usuario = Usuario(
+			nome=f'Candidato {i}',
+			email=f'candidato{i}@example.com',
+			senha='123',
+			papel='candidato',
+		)
+		db.add(usuario)
+		db.flush()
+		db.add(
+			Candidato(id_candidato=usuario.id, nome=usuario.nome, email=usuario.email)
+		)
+		db.add(
+			Candidatura(
+				id_candidato=usuario.id,
+				id_vaga_de_emprego=vagas[0 if i < 2 else 1].id_vaga_de_emprego,
+				status=status,
+				data=datetime(2025, 10, 28),
+			)
+		)
+	db.commit()
+
+	result = EmpresaRepository.getStatisticsByEmpresaId(empresa.id_empresa, db)
+
+	assert result['vagas_totais'] == 3
+	assert result['candidatos_totais'] == 3
+	assert result['candidaturas_pendentes'] == 2
+	assert result['candidaturas_por_status'] == {
+		'Pendente': 2,
+		'Em análise': 0,
+		'Aceito': 1,
+		'Rejeitado': 0,
+	}
+	assert [vaga['candidaturas'] for vaga in result['candidaturas_por_vaga']] == [
+		2,
+		1,
+		0,
+	]
+
+
+def test_nonExistentEmpresa_getStatisticsByEmpresaId(db):
+	result = EmpresaRepository.getStatisticsByEmpresaId(-1, db)
+
+	assert result['vagas_totais'] == 0
+	assert result['candidatos_totais'] == 0
+	assert result['candidaturas_por_vaga'] == []
+
+
+def test_getStatisticsByEmpresaIdAsync(run_async_db):
+	async def scenario(database):
+		database.add(
+			Empresa(
+				id_empresa=1,
+				nome_empresa='Empresa G',
+				cnpj='12345671234567',
+				cidade='Gama',
+				estado='DF',
+			)
+		)
+		database.add(make_vaga_de_emprego(1, 'Backend'))
+		await database.commit()
+
+		empresa = await EmpresaRepository.getEmpresaByIdAsync(1, database)
+		statistics = await EmpresaRepository.getStatisticsByEmpresaIdAsync(1, database)
+		return empresa, statistics
+
+	empresa, statistics = run_async_db(scenario)
+
+	assert empresa.nome_empresa == 'Empresa G'
+	assert statistics['vagas_totais'] == 1
+	assert statistics['candidatos_totais'] == 0
+
+
+def export_candidaturas(run_async_db, formato, **filtros):
+	async def scenario(database):
+		database.add_all(
+			[
+				Empresa(
+					id_empresa=id_empresa,
+					nome_empresa=f'Empresa {id_empresa}',
+					cnpj=str(id_empresa),
+					cidade='Gama',
+					estado='DF',
+				)
+				for id_empresa in (1, 2)
+			]
+		)
+		database.add_all(
+			[make_vaga_de_emprego(1, 'Backend'), make_vaga_de_emprego(2, 'Outra')]
+		)
+		for id in range(1, 4):
+			database.add(
+				Usuario(
+					id=id,
+					nome=f'Candidato {id}',
+					email=f'candidato{id}@example.com',
+					senha='123',
+					papel='candidato',
+				)
+			)
+			database.add(
+				Candidato(
+					id_candidato=id,
+					nome=f'Candidato {id}',
+					email=f'candidato{id}@example.com',
+				)
+			)
+		await database.flush()
+		database.add_all(
+			[
+				Candidatura(
+					id_candidato=1,
+					id_vaga_de_emprego=1,
+					status='Pendente',
+					data=datetime(2025, 1, 10, 9),
+				),
+				Candidatura(
+					id_candidato=2,
+					id_vaga_de_emprego=1,
+					status='Aceito',
+					data=datetime(2025, 1, 20, 18),
+				),
+				Candidatura(
+					id_candidato=3,
+					id_vaga_de_emprego=2,
+					status='Pendente',
+					data=datetime(2025, 1, 15),
+				),
+			]
+		)
+		await database.commit()
+
+		statement = candidaturasExportStatement(1, **filtros)
+		chunks = [
+			chunk
+			async for chunk in candidaturasExport(
+				statement, formato, lambda: AsyncSession(database.bind)
+			)
+		]
+		return b''.join(chunks).decode()
+
+	return run_async_db(scenario)
+
+
+def test_candidaturasExport_ndjson(run_async_db):
+	body = export_candidaturas(run_async_db, 'ndjson')
+
+	linhas = [json.loads(linha) for linha in body.splitlines()]
+	assert [linha['nome_candidato'] for linha in linhas] == [
+		'Candidato 1',
+		'Candidato 2',
+	]
+	assert linhas[0]['nome_vaga_de_emprego'] == 'Backend'
+	assert linhas[0]['data'] == '2025-01-10T09:00:00'
+
+
+def test_candidaturasExport_csv_filters(run_async_db):
+	body = export_candidaturas(
+		run_async_db,
+		'csv',
+		status='Aceito',
+		data_inicio=date(2025, 1, 20),
+		data_fim=date(2025, 1, 20),
+	)
+
+	linhas = list(csv.DictReader(io.StringIO(body)))
+	assert len(linhas) == 1
+	assert linhas[0]['email_candidato'] == 'candidato2@example.com'
+	assert linhas[0]['status'] == 'Aceito'
+
+
+def test_empty_candidaturasExport_csv(run_async_db):
+	body = export_candidaturas(run_async_db, 'csv', status='Em análise')
+
+	assert body.splitlines()[0].startswith('id_candidatura,status,data')
+	assert len(body.splitlines()) == 1
+
+
+def test_otherEmpresa_exportCandidaturasByEmpresaId(run_async_db):
+	async def scenario(database):
+		database.add_all(
+			[
+				Empresa(
+					id_empresa=id_empresa,
+					nome_empresa=f'Empresa {id_empresa}',
+					cnpj=str(id_empresa),
+					cidade='Gama',
+					estado='DF',
+				)
+				for id_empresa in (1, 2)
+			]
+		)
+		usuario = Usuario(
+			id=10,
+			nome='Gestor',
+			email='gestor@example.com',
+			senha='123',
+			papel='gestor',
+		)
+		database.add(usuario)
+		await database.flush()
+		database.add(
+			Gestor(
+				id_gestor=10, nome='Gestor', email='gestor@example.com', id_empresa=1
+			)
+		)
+		await database.commit()
+
+		async def export(id_empresa):
+			return await exportCandidaturasByEmpresaId(
+				id_empresa,
+				formato=FormatoExportacao.NDJSON,
+				status=None,
+				data_inicio=None,
+				data_fim=None,
+				database=database,
+				current_user=UsuarioSnapshot.fromUsuario(usuario),
+			)
+
+		propria = await export(1)
+		with pytest.raises(HTTPException) as error:
+			await export(2)
+		return propria, error.value.status_code
+
+	propria, status_code = run_async_db(scenario)
+
+	assert isinstance(propria, StreamingResponse)
+	assert status_code == 403
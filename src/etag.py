@@ -0,0 +1,38 @@
+import hashlib
+
+from fastapi import Response, status
+
+# Sem max-age: o navegador guarda a resposta, mas sempre revalida com If-None-Match
+ETAG_CACHE_CONTROL = 'private, no-cache'
+
+
+def makeEtag(*parts):
+	# Derivado só de ids e versões: calculável sem buscar a linha inteira
+	digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+	return f'"{digest}"'
+
+
+def etagMatches(if_none_match: str, etag: str):
+	if not if_none_match:
+		return False
+	if if_none_match.strip() == '*':
+		return True
+	# Comparação fraca (RFC 9110): ignora o prefixo W/ de proxies que recomprimem
+	candidates = (
+		candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')
+	)
+	return etag in candidates
+
+
+def notModified(if_none_match: str, etag: str):
+	if not etagMatches(if_none_match, etag):
+		return None
+	return Response(
+		status_code=status.HTTP_304_NOT_MODIFIED,
+		headers={'ETag': etag, 'Cache-Control': ETAG_CACHE_CONTROL},
+	)
+
+
+def setEtag(response: Response, etag: str):
+	response.headers['ETag'] = etag
+	response.headers['Cache-Control'] = ETAG_CACHE_CONTROL
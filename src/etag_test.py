@@ -0,0 +1,27 @@
+from .etag import etagMatches, makeEtag, notModified
+
+
+def test_makeEtag_changes_with_versao():
+	assert makeEtag('empresa', 1, 1) == makeEtag('empresa', 1, 1)
+	assert makeEtag('empresa', 1, 1) != makeEtag('empresa', 1, 2)
+	assert makeEtag('empresa', 1, 1).startswith('"')
+
+
+def test_etagMatches():
+	etag = makeEtag('empresa', 1, 1)
+
+	assert etagMatches(etag, etag)
+	assert etagMatches(f'"outro", W/{etag}', etag)
+	assert etagMatches('*', etag)
+	assert not etagMatches(None, etag)
+	assert not etagMatches(makeEtag('empresa', 1, 2), etag)
+
+
+def test_notModified():
+	etag = makeEtag('candidato', 1, 3)
+
+	response = notModified(etag, etag)
+
+	assert response.status_code == 304
+	assert response.headers['ETag'] == etag
+	assert notModified('"outro"', etag) is None
@@ -1,8 +1,12 @@
 from fastapi import Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..candidato.recomendacao import PENDENTE_CANDIDATO, markRecomendacoesPendentes
 from ..database import getDatabase
 from ..models import Experiencia
+from ..response_cache import response_cache
+from ..vaga_de_emprego.ranking import rankingCacheTags
 
 
 class ExperienciaRepository:
@@ -16,6 +20,13 @@ class ExperienciaRepository:
 		)
 		return experiencias
 
+	def getExperienciasVersoes(id_candidato: int, database: Session):
+		return database.execute(
+			select(Experiencia.id_experiencia, Experiencia.versao).where(
+				Experiencia.id_candidato == id_candidato
+			)
+		).all()
+
 	def getExperienciaById(
 		id_experiencia: int, database: Session = Depends(getDatabase)
 	):
@@ -31,7 +42,13 @@ class ExperienciaRepository:
 	):
 		new_experiencia = experiencia_data
 		database.add(new_experiencia)
+		# O cargo da experiência entra no perfil usado pelas recomendações
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [new_experiencia.id_candidato]
+		)
+		tags = rankingCacheTags(database, [new_experiencia.id_candidato])
 		database.commit()
+		response_cache.invalidate(*tags)
 		database.refresh(new_experiencia)
 		return new_experiencia
 
@@ -39,10 +56,20 @@ class ExperienciaRepository:
 		experiencia: Experiencia, database: Session = Depends(getDatabase)
 	):
 		database.delete(experiencia)
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [experiencia.id_candidato]
+		)
+		tags = rankingCacheTags(database, [experiencia.id_candidato])
 		database.commit()
+		response_cache.invalidate(*tags)
 		return True
 
 	def updateExperiencia(experiencia_data: Experiencia, database: Session):
-		database.merge(experiencia_data)
+		experiencia = database.merge(experiencia_data)
+		markRecomendacoesPendentes(
+			database, PENDENTE_CANDIDATO, [experiencia.id_candidato]
+		)
+		tags = rankingCacheTags(database, [experiencia.id_candidato])
 		database.commit()
-		return experiencia_data
+		response_cache.invalidate(*tags)
+		return experiencia
@@ -1,16 +1,15 @@
-from fastapi import APIRouter, HTTPException, Response, status, Depends
+from fastapi import APIRouter, HTTPException, Header, Response, status, Depends
 from sqlalchemy.orm import Session
 
 from ..auth.repository import requireAdminCandidato, requireCandidato
 
-from ..database import engine, Base, getDatabase
+from ..database import getDatabase
+from ..etag import makeEtag, notModified, setEtag
 from .repository import ExperienciaRepository
-from .schema import ExperienciaBase
+from .schema import ExperienciaBase, ExperienciaResponse
 from ..models import Experiencia, Usuario
 
 
-Base.metadata.create_all(bind=engine)
-
 router = APIRouter(
 	prefix='/experiencias',
 	tags=['experiencias'],
@@ -18,18 +17,33 @@ router = APIRouter(
 )
 
 
-@router.get('/{id_candidato}')
+@router.get('/{id_candidato}', response_model=list[ExperienciaResponse])
 async def getExperienciasByCandidatoId(
-	id_candidato: int, database: Session = Depends(getDatabase)
+	id_candidato: int,
+	response: Response,
+	if_none_match: str = Header(None),
+	database: Session = Depends(getDatabase),
 ):
+	# A lista muda quando alguma experiência é criada, removida ou editada
+	if if_none_match:
+		versoes = ExperienciaRepository.getExperienciasVersoes(id_candidato, database)
+		not_modified = notModified(
+			if_none_match,
+			makeEtag('experiencias', id_candidato, sorted(map(tuple, versoes))),
+		)
+		if not_modified:
+			return not_modified
 	experiencias = ExperienciaRepository.getExperienciasByCandidatoId(
 		id_candidato, database
 	)
-
+	versoes = [
+		(experiencia.id_experiencia, experiencia.versao) for experiencia in experiencias
+	]
+	setEtag(response, makeEtag('experiencias', id_candidato, sorted(versoes)))
 	return experiencias
 
 
-@router.post('/{id_candidato}')
+@router.post('/{id_candidato}', response_model=ExperienciaResponse)
 async def createExperienciaByCandidatoId(
 	id_candidato: int,
 	experiencia_data: ExperienciaBase,
@@ -45,7 +59,9 @@ async def createExperienciaByCandidatoId(
 	return experiencias
 
 
-@router.delete('/{id_experiencia}')
+@router.delete(
+	'/{id_experiencia}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteExperienciaById(
 	id_experiencia: int,
 	database: Session = Depends(getDatabase),
@@ -60,16 +76,17 @@ async def deleteExperienciaById(
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.put('/{id_experiencia}')
+@router.put('/{id_experiencia}', response_model=ExperienciaResponse)
 async def updateExperienciaById(
 	id_experiencia: int,
 	experiencia_data: ExperienciaBase,
 	database: Session = Depends(getDatabase),
 ):
 	experiencia = ExperienciaRepository.getExperienciaById(id_experiencia, database)
-	if experiencia:
-		updated_experiencia = ExperienciaRepository.updateExperiencia(
-			Experiencia(id_experiencia=id_experiencia, **experiencia_data.model_dump()),
-			database,
-		)
-		return updated_experiencia
+	if not experiencia:
+		raise HTTPException(status_code=404, detail='Experiência não encontrada')
+	updated_experiencia = ExperienciaRepository.updateExperiencia(
+		Experiencia(id_experiencia=id_experiencia, **experiencia_data.model_dump()),
+		database,
+	)
+	return updated_experiencia
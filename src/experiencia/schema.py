@@ -12,4 +12,5 @@ class ExperienciaBase(BaseModel):
 
 
 class ExperienciaResponse(ExperienciaBase):
-	id: int
+	id_experiencia: int
+	id_candidato: int
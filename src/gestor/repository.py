@@ -1,6 +1,9 @@
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..auth.cache import usuario_cache
+from ..counters import incrementCounters
 from ..database import getDatabase
 from ..models import Gestor
 
@@ -14,6 +17,9 @@ class GestorRepository:
 		gestor = database.query(Gestor).filter(Gestor.id_gestor == id_gestor).first()
 		return gestor
 
+	async def getGestorByIdAsync(id_gestor: int, database: AsyncSession):
+		return await database.get(Gestor, id_gestor)
+
 	def getGestoresByEmpresaId(
 		id_empresa: int, database: Session = Depends(getDatabase)
 	):
@@ -41,6 +47,11 @@ class GestorRepository:
 		return gestor
 
 	def deleteGestor(gestor: Gestor, database: Session = Depends(getDatabase)):
+		usuario = gestor.usuario
+		email = usuario.email if usuario else None
 		database.delete(gestor)
+		# O usuário do gestor é removido em cascata
+		incrementCounters(database, usuarios=-1 if usuario else 0)
 		database.commit()
+		usuario_cache.invalidate(email, gestor.id_gestor)
 		return True
@@ -5,14 +5,12 @@ from src.auth.repository import requireGestor
 from src.empresa.repository import EmpresaRepository
 from src.empresa.schema import EmpresaBase
 
-from ..database import engine, Base, getDatabase
+from ..database import getDatabase
 from .repository import GestorRepository
-from .schema import GestorBase
+from .schema import GestorBase, GestorResponse
 from ..models import Gestor, Usuario
 
 
-Base.metadata.create_all(bind=engine)
-
 router = APIRouter(
 	prefix='/gestores',
 	tags=['gestores'],
@@ -20,13 +18,13 @@ router = APIRouter(
 )
 
 
-@router.get('/')
+@router.get('/', response_model=list[GestorResponse])
 async def getGestores(database: Session = Depends(getDatabase)):
 	gestores = GestorRepository.getAllGestores(database)
 	return gestores
 
 
-@router.get('/{id_gestor}')
+@router.get('/{id_gestor}', response_model=GestorResponse)
 async def getGestorById(id_gestor: int, database: Session = Depends(getDatabase)):
 	gestor = GestorRepository.getGestorById(id_gestor, database)
 	if not gestor:
@@ -34,7 +32,7 @@ async def getGestorById(id_gestor: int, database: Session = Depends(getDatabase)
 	return gestor
 
 
-@router.post('/')
+@router.post('/', response_model=GestorResponse)
 async def createGestor(
 	new_gestor: GestorBase,
 	empresa_data: EmpresaBase,
@@ -57,7 +55,7 @@ async def createGestor(
 		return new_gestor
 
 
-@router.put('/{id_gestor}')
+@router.put('/{id_gestor}', response_model=GestorResponse)
 async def updateGestorById(
 	id_gestor: int,
 	gestor_data: GestorBase,
@@ -65,14 +63,17 @@ async def updateGestorById(
 	current_gestor: Gestor = Depends(requireGestor),
 ):
 	gestor = GestorRepository.getGestorById(id_gestor, database)
-	if gestor:
-		updated_gestor = GestorRepository.updateGestor(
-			Gestor(id_usuario=id_gestor, **gestor_data.model_dump()), database
-		)
-		return updated_gestor
+	if not gestor:
+		raise HTTPException(status_code=404, detail='Gestor não encontrado')
+	updated_gestor = GestorRepository.updateGestor(
+		Gestor(id_gestor=id_gestor, **gestor_data.model_dump()), database
+	)
+	return updated_gestor
 
 
-@router.delete('/{id_gestor}')
+@router.delete(
+	'/{id_gestor}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteGestor(
 	id_gestor: int,
 	database: Session = Depends(getDatabase),
@@ -84,4 +85,4 @@ async def deleteGestor(
 	success = GestorRepository.deleteGestor(gestor, database)
 	if not success:
 		raise HTTPException(status_code=500, detail='Erro ao deletar candidato')
-	return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+	return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,5 +1,15 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
+
+from .database import getPoolStatistics
+from .migrations import checkSchemaVersion
+from .notificacao.events import event_broker
+from .profiling import ProfilingMiddleware, renderMetrics
 
 from .usuario.router import router as usuario_router
 from .candidato.router import router as candidato_router
@@ -10,9 +20,30 @@ from .vaga_de_emprego.router import router as vaga_de_emprego_router
 from .candidatura.router import router as candidatura_router
 from .auth.router import router as auth_router
 from .admin.router import router as admin_router
+from .notificacao.router import router as notificacao_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	# Só confere a versão do schema; as migrações rodam uma vez por deploy
+	await run_in_threadpool(checkSchemaVersion)
+	yield
+	await event_broker.close()
+
 
+# As rotas declaram response_model: o Pydantic serializa direto dos atributos e o
+# orjson gera o JSON, sem passar pelo jsonable_encoder
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+@app.exception_handler(StaleDataError)
+async def staleDataHandler(request: Request, error: StaleDataError):
+	# A versão da linha mudou entre a leitura e o UPDATE (edição concorrente)
+	return ORJSONResponse(
+		status_code=status.HTTP_409_CONFLICT,
+		content={'detail': 'Registro alterado por outra requisição, tente novamente'},
+	)
 
-app = FastAPI()
 
 app.include_router(usuario_router)
 app.include_router(candidato_router)
@@ -23,6 +54,7 @@ app.include_router(gestor_router)
 app.include_router(vaga_de_emprego_router)
 app.include_router(auth_router)
 app.include_router(admin_router)
+app.include_router(notificacao_router)
 
 
 app.add_middleware(
@@ -31,7 +63,20 @@ app.add_middleware(
 	allow_credentials=True,
 	allow_methods=['*'],
 	allow_headers=['*'],
+	# O front lê o ETag para mandar If-None-Match nas próximas leituras
+	expose_headers=['ETag'],
 )
+# Por último: fica por fora dos demais e mede a requisição inteira
+app.add_middleware(ProfilingMiddleware)
+
+
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+	# Formato texto do Prometheus (version=0.0.4)
+	return PlainTextResponse(
+		renderMetrics(getPoolStatistics()),
+		media_type='text/plain; version=0.0.4; charset=utf-8',
+	)
 
 
 @app.get('/')
@@ -0,0 +1,254 @@
+from datetime import datetime
+import logging
+import os
+
+from sqlalchemy import (
+	Column,
+	DateTime,
+	Integer,
+	MetaData,
+	Table,
+	delete,
+	func,
+	inspect,
+	literal,
+	select,
+	text,
+	update,
+)
+
+from . import models  # noqa: F401 - registra as tabelas no Base.metadata
+from .candidato.statistics import rebuildCandidatoStatistics
+from .database import DATABASE_URL, Base, engine
+from .vaga_de_emprego import search  # noqa: F401 - índice de busca textual
+
+logger = logging.getLogger(__name__)
+
+# Em produção as migrações rodam uma vez por deploy (python -m src.migrations);
+# com SQLite (desenvolvimento/testes) a aplicação migra sozinha ao subir
+DATABASE_AUTO_MIGRATE = (
+	os.getenv('DATABASE_AUTO_MIGRATE', str(DATABASE_URL.startswith('sqlite'))).lower()
+	== 'true'
+)
+
+MIGRATION_LOCK_ID = 740_125_001
+
+schema_metadata = MetaData()
+schema_version_table = Table(
+	'schema_version',
+	schema_metadata,
+	Column('version', Integer, primary_key=True),
+	Column('data_aplicacao', DateTime, nullable=False),
+)
+
+
+class SchemaVersionError(RuntimeError):
+	pass
+
+
+def createBaseline(connection):
+	Base.metadata.create_all(bind=connection)
+
+
+def addCandidaturaUniqueIndex(connection):
+	Candidatura = models.Candidatura
+	# Mantém só a candidatura mais antiga de cada par antes de criar o índice único
+	mais_antigas = select(func.min(Candidatura.id_candidatura)).group_by(
+		Candidatura.id_candidato, Candidatura.id_vaga_de_emprego
+	)
+	repetidas = select(Candidatura.id_candidatura).where(
+		Candidatura.id_candidatura.not_in(mais_antigas)
+	)
+	connection.execute(
+		update(models.Notificacao)
+		.where(models.Notificacao.id_candidatura.in_(repetidas))
+		.values(id_candidatura=None)
+	)
+	removidas = connection.execute(
+		delete(Candidatura).where(Candidatura.id_candidatura.in_(repetidas))
+	).rowcount
+	connection.execute(
+		text(
+			'CREATE UNIQUE INDEX IF NOT EXISTS uq_candidatura_candidato_vaga'
+			' ON candidatura (id_candidato, id_vaga_de_emprego)'
+		)
+	)
+	if removidas:
+		connection.execute(
+			update(models.PlatformCounters).values(
+				candidaturas=select(func.count())
+				.select_from(Candidatura)
+				.scalar_subquery()
+			)
+		)
+		logger.info('%s candidaturas repetidas removidas', removidas)
+
+
+def createIndexes(connection, model, *names):
+	for index in model.__table__.indexes:
+		if index.name in names:
+			index.create(bind=connection, checkfirst=True)
+
+
+def addColumns(connection, model, *names):
+	table = model.__table__
+	existentes = {
+		column['name'] for column in inspect(connection).get_columns(table.name)
+	}
+	preparer = connection.dialect.identifier_preparer
+	for name in names:
+		if name in existentes:
+			continue
+		column = table.columns[name]
+		definicao = (
+			f'{preparer.format_column(column)}'
+			f' {column.type.compile(dialect=connection.dialect)}'
+		)
+		# Coluna NOT NULL precisa do default do banco para as linhas existentes
+		if column.server_default is not None:
+			definicao += f' DEFAULT {column.server_default.arg}'
+		if not column.nullable:
+			definicao += ' NOT NULL'
+		connection.execute(
+			text(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {definicao}')
+		)
+
+
+def addCandidaturaInboxIndexes(connection):
+	createIndexes(
+		connection,
+		models.Candidatura,
+		'ix_candidatura_vaga_data_id',
+		'ix_candidatura_vaga_status_data_id',
+	)
+
+
+def addNotificacaoInboxIndex(connection):
+	createIndexes(
+		connection, models.Notificacao, 'ix_notificacao_candidato_visualizada_data'
+	)
+
+
+def addCandidatoStatistics(connection):
+	models.CandidatoStatistics.__table__.create(bind=connection, checkfirst=True)
+	rebuildCandidatoStatistics(connection)
+
+
+def addVagaDeEmpregoSalarioRange(connection):
+	# Colunas vazias: os valores vêm do backfill
+	# (python -m src.vaga_de_emprego.salario), fora da migração
+	addColumns(connection, models.VagaDeEmprego, 'salario_min', 'salario_max')
+	createIndexes(
+		connection,
+		models.VagaDeEmprego,
+		'ix_vagaDeEmprego_salario_max_id',
+		'ix_vagaDeEmprego_salario_min',
+	)
+
+
+def addVersaoColumns(connection):
+	for model in (
+		models.Candidato,
+		models.Experiencia,
+		models.Empresa,
+		models.VagaDeEmprego,
+	):
+		addColumns(connection, model, 'versao')
+
+
+def addRecomendacoes(connection):
+	models.CandidatoRecomendacao.__table__.create(bind=connection, checkfirst=True)
+	models.RecomendacaoPendente.__table__.create(bind=connection, checkfirst=True)
+	# O refresh incremental preenche a tabela a partir destas marcações
+	Candidato = models.Candidato
+	connection.execute(
+		models.RecomendacaoPendente.__table__.insert().from_select(
+			['tipo', 'id', 'data'],
+			select(
+				literal('candidato'), Candidato.id_candidato, literal(datetime.now())
+			),
+		)
+	)
+
+
+# Cada nova alteração de schema entra aqui com o próximo número de versão.
+# Bancos novos são criados direto pelo create_all e marcados com a última versão.
+MIGRATIONS = {
+	1: createBaseline,
+	2: addCandidaturaUniqueIndex,
+	3: addCandidaturaInboxIndexes,
+	4: addNotificacaoInboxIndex,
+	5: addCandidatoStatistics,
+	6: addVagaDeEmpregoSalarioRange,
+	7: addVersaoColumns,
+	8: addRecomendacoes,
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def getSchemaVersion(connection):
+	if not inspect(connection).has_table(schema_version_table.name):
+		return None
+	return connection.execute(
+		select(schema_version_table.c.version)
+		.order_by(schema_version_table.c.version.desc())
+		.limit(1)
+	).scalar()
+
+
+def stampSchemaVersion(connection, version: int):
+	connection.execute(
+		schema_version_table.insert().values(
+			version=version, data_aplicacao=datetime.now()
+		)
+	)
+
+
+def migrate(bind=engine):
+	with bind.begin() as connection:
+		if connection.dialect.name == 'postgresql':
+			# Serializa deploys concorrentes; liberado no fim da transação
+			connection.execute(
+				text('SELECT pg_advisory_xact_lock(:id)'), {'id': MIGRATION_LOCK_ID}
+			)
+
+		current_version = getSchemaVersion(connection)
+		schema_metadata.create_all(bind=connection)
+
+		if current_version is None:
+			if not inspect(connection).has_table(models.Usuario.__tablename__):
+				createBaseline(connection)
+				stampSchemaVersion(connection, SCHEMA_VERSION)
+				logger.info('Schema criado na versão %s', SCHEMA_VERSION)
+				return SCHEMA_VERSION
+			# Banco anterior ao versionamento: corresponde à versão 1
+			createBaseline(connection)
+			stampSchemaVersion(connection, 1)
+			current_version = 1
+
+		for version in range(current_version + 1, SCHEMA_VERSION + 1):
+			MIGRATIONS[version](connection)
+			stampSchemaVersion(connection, version)
+			logger.info('Migração %s aplicada', version)
+
+	return SCHEMA_VERSION
+
+
+def checkSchemaVersion(bind=engine):
+	with bind.connect() as connection:
+		current_version = getSchemaVersion(connection)
+
+	if current_version is not None and current_version >= SCHEMA_VERSION:
+		return current_version
+	if DATABASE_AUTO_MIGRATE:
+		return migrate(bind)
+	raise SchemaVersionError(
+		f'Schema do banco na versão {current_version}, esperado {SCHEMA_VERSION}.'
+		' Execute "python -m src.migrations" antes de subir a aplicação.'
+	)
+
+
+if __name__ == '__main__':
+	logging.basicConfig(level=logging.INFO)
+	print(f'Schema na versão {migrate()}')
@@ -0,0 +1,215 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from . import migrations
+from .database import createDatabaseEngine
+from .migrations import (
+	SCHEMA_VERSION,
+	SchemaVersionError,
+	checkSchemaVersion,
+	getSchemaVersion,
+	migrate,
+)
+
+
+@pytest.fixture
+def fresh_engine():
+	engine = createDatabaseEngine('sqlite:///:memory:', name='testing_migrations')
+	yield engine
+	engine.dispose()
+
+
+def add_candidato_vaga(connection, *ids_vagas):
+	connection.execute(
+		text(
+			'INSERT INTO usuario (id, nome, email, senha, papel, ativo)'
+			" VALUES (1, 'João', 'joao@example.com', '123', 'candidato', 1)"
+		)
+	)
+	connection.execute(
+		text(
+			'INSERT INTO candidato (id_candidato, nome, email)'
+			" VALUES (1, 'João', 'joao@example.com')"
+		)
+	)
+	connection.execute(
+		text(
+			'INSERT INTO empresa (id_empresa, nome_empresa, cnpj, cidade, estado)'
+			" VALUES (1, 'Empresa G', '123', 'Gama', 'DF')"
+		)
+	)
+	connection.execute(
+		text(
+			'INSERT INTO "vagaDeEmprego" (id_vaga_de_emprego, id_empresa,'
+			' nome_vaga_de_emprego, data, cidade, estado, salario, cargo, nivel,'
+			" tipo_contrato, modalidade, descricao) VALUES (:id, 1, 'Dev',"
+			" '2024-01-01', 'Gama', 'DF', '1', 'Dev', 'Pleno', 'CLT', 'Remoto', 'Dev')"
+		),
+		[{'id': id_vaga} for id_vaga in ids_vagas],
+	)
+
+
+def test_migrate_fresh_database(fresh_engine):
+	assert migrate(fresh_engine) == SCHEMA_VERSION
+
+	with fresh_engine.connect() as connection:
+		assert getSchemaVersion(connection) == SCHEMA_VERSION
+		assert inspect(connection).has_table('usuario')
+
+
+def test_migrate_is_idempotent(fresh_engine):
+	migrate(fresh_engine)
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		versions = connection.execute(
+			text('SELECT COUNT(*) FROM schema_version')
+		).scalar()
+	assert versions == 1
+
+
+def test_migrate_stamps_database_created_before_versioning(fresh_engine):
+	migrations.createBaseline(fresh_engine)
+
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		assert getSchemaVersion(connection) == SCHEMA_VERSION
+
+
+def test_checkSchemaVersion_up_to_date(fresh_engine, monkeypatch):
+	migrate(fresh_engine)
+	monkeypatch.setattr(migrations, 'DATABASE_AUTO_MIGRATE', False)
+
+	assert checkSchemaVersion(fresh_engine) == SCHEMA_VERSION
+
+
+def test_checkSchemaVersion_without_migrations(fresh_engine, monkeypatch):
+	monkeypatch.setattr(migrations, 'DATABASE_AUTO_MIGRATE', False)
+
+	with pytest.raises(SchemaVersionError):
+		checkSchemaVersion(fresh_engine)
+
+
+def test_checkSchemaVersion_auto_migrate(fresh_engine, monkeypatch):
+	monkeypatch.setattr(migrations, 'DATABASE_AUTO_MIGRATE', True)
+
+	assert checkSchemaVersion(fresh_engine) == SCHEMA_VERSION
+	with fresh_engine.connect() as connection:
+		assert inspect(connection).has_table('vagaDeEmprego')
+
+
+def test_migrate_removes_repeated_candidaturas(fresh_engine):
+	migrate(fresh_engine)
+	with fresh_engine.begin() as connection:
+		connection.execute(text('DROP INDEX uq_candidatura_candidato_vaga'))
+		connection.execute(text('DELETE FROM schema_version WHERE version > 1'))
+		add_candidato_vaga(connection, 1)
+		for id_candidatura in (1, 2, 3):
+			connection.execute(
+				text(
+					'INSERT INTO candidatura (id_candidatura, id_candidato,'
+					' id_vaga_de_emprego, status, data)'
+					" VALUES (:id, 1, 1, 'Pendente', '2024-01-02 00:00:00')"
+				),
+				{'id': id_candidatura},
+			)
+
+	migrate(fresh_engine)
+
+	with fresh_engine.begin() as connection:
+		ids = connection.execute(
+			text('SELECT id_candidatura FROM candidatura')
+		).scalars()
+		assert list(ids) == [1]
+		with pytest.raises(IntegrityError):
+			connection.execute(
+				text(
+					'INSERT INTO candidatura (id_candidato, id_vaga_de_emprego,'
+					" status, data) VALUES (1, 1, 'Pendente', '2024-01-03 00:00:00')"
+				)
+			)
+
+
+def test_migrate_builds_candidato_statistics(fresh_engine):
+	migrate(fresh_engine)
+	with fresh_engine.begin() as connection:
+		connection.execute(text('DROP TABLE candidato_statistics'))
+		connection.execute(text('DELETE FROM schema_version WHERE version > 4'))
+		add_candidato_vaga(connection, 1, 2)
+		connection.execute(
+			text(
+				'INSERT INTO candidatura (id_candidatura, id_candidato,'
+				' id_vaga_de_emprego, status, data) VALUES'
+				" (1, 1, 1, 'Aceito', '2024-01-02 00:00:00'),"
+				" (2, 1, 2, 'Pendente', '2024-01-05 00:00:00')"
+			)
+		)
+
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		row = connection.execute(
+			text(
+				'SELECT candidaturas, candidaturas_aceitas, candidaturas_pendentes'
+				' FROM candidato_statistics WHERE id_candidato = 1'
+			)
+		).one()
+	assert tuple(row) == (2, 1, 1)
+
+
+def test_migrate_adds_salario_columns(fresh_engine):
+	migrate(fresh_engine)
+	with fresh_engine.begin() as connection:
+		connection.execute(text('DROP INDEX ix_vagaDeEmprego_salario_max_id'))
+		connection.execute(text('DROP INDEX ix_vagaDeEmprego_salario_min'))
+		connection.execute(text('ALTER TABLE "vagaDeEmprego" DROP COLUMN salario_min'))
+		connection.execute(text('ALTER TABLE "vagaDeEmprego" DROP COLUMN salario_max'))
+		connection.execute(text('DELETE FROM schema_version WHERE version > 5'))
+
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		inspector = inspect(connection)
+		columns = {column['name'] for column in inspector.get_columns('vagaDeEmprego')}
+		indexes = {index['name'] for index in inspector.get_indexes('vagaDeEmprego')}
+	assert {'salario_min', 'salario_max'} <= columns
+	assert 'ix_vagaDeEmprego_salario_max_id' in indexes
+
+
+def test_migrate_adds_versao_columns(fresh_engine):
+	migrate(fresh_engine)
+	with fresh_engine.begin() as connection:
+		connection.execute(text('ALTER TABLE empresa DROP COLUMN versao'))
+		connection.execute(text('DELETE FROM schema_version WHERE version > 6'))
+		connection.execute(
+			text(
+				'INSERT INTO empresa (id_empresa, nome_empresa, cnpj, cidade, estado)'
+				" VALUES (1, 'Empresa G', '123', 'Gama', 'DF')"
+			)
+		)
+
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		versao = connection.execute(text('SELECT versao FROM empresa')).scalar()
+	assert versao == 1
+
+
+def test_migrate_adds_recomendacoes(fresh_engine):
+	migrate(fresh_engine)
+	with fresh_engine.begin() as connection:
+		connection.execute(text('DROP TABLE candidato_recomendacao'))
+		connection.execute(text('DROP TABLE recomendacao_pendente'))
+		connection.execute(text('DELETE FROM schema_version WHERE version > 7'))
+		add_candidato_vaga(connection, 1)
+
+	migrate(fresh_engine)
+
+	with fresh_engine.connect() as connection:
+		assert inspect(connection).has_table('candidato_recomendacao')
+		pendentes = connection.execute(
+			text('SELECT tipo, id FROM recomendacao_pendente')
+		).all()
+	assert pendentes == [('candidato', 1)]
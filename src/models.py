@@ -3,10 +3,12 @@ from sqlalchemy import (
 	Column,
 	Date,
 	DateTime,
+	Float,
 	Integer,
 	String,
 	ForeignKey,
 	Enum,
+	Index,
 )
 from sqlalchemy.orm import relationship
 import enum
@@ -58,8 +60,20 @@ class Candidato(Base):
 	cidade = Column(String(50), nullable=True)
 	resumo = Column(String(1500), nullable=True)
 	situacao_empregaticia = Column(String(20), nullable=True)
+	# Incrementada a cada UPDATE pelo ORM; compõe o ETag das rotas de leitura
+	versao = Column(Integer, nullable=False, default=1, server_default='1')
 
 	candidaturas = relationship('Candidatura', back_populates='candidato')
+	experiencias = relationship(
+		'Experiencia',
+		back_populates='candidato',
+		cascade='all, delete-orphan',
+		order_by='Experiencia.id_experiencia',
+	)
+	notificacoes = relationship('Notificacao', cascade='all, delete-orphan')
+	estatisticas = relationship(
+		'CandidatoStatistics', cascade='all, delete-orphan', uselist=False
+	)
 	usuario = relationship(
 		'Usuario',
 		back_populates='candidato',
@@ -67,6 +81,8 @@ class Candidato(Base):
 		single_parent=True,
 	)
 
+	__mapper_args__ = {'version_id_col': versao}
+
 
 class Experiencia(Base):
 	__tablename__ = 'experiencia'
@@ -81,6 +97,11 @@ class Experiencia(Base):
 	descricao = Column(String(500), nullable=True)
 	nome_curso = Column(String(100), nullable=True)
 	grau_obtido = Column(String(50), nullable=True)
+	versao = Column(Integer, nullable=False, default=1, server_default='1')
+
+	candidato = relationship('Candidato', back_populates='experiencias')
+
+	__mapper_args__ = {'version_id_col': versao}
 
 
 class Empresa(Base):
@@ -93,9 +114,12 @@ class Empresa(Base):
 	estado = Column(String(3), nullable=False)
 	email_contato = Column(String(100), nullable=True)
 	descricao = Column(String(2000), nullable=True)
+	versao = Column(Integer, nullable=False, default=1, server_default='1')
 
 	vagas = relationship('VagaDeEmprego', back_populates='empresa')
 
+	__mapper_args__ = {'version_id_col': versao}
+
 
 class VagaDeEmprego(Base):
 	__tablename__ = 'vagaDeEmprego'
@@ -109,6 +133,10 @@ class VagaDeEmprego(Base):
 	cidade = Column(String(50), nullable=False)
 	estado = Column(String(3), nullable=False)
 	salario = Column(String(20), nullable=False)
+	# Faixa extraída de salario, em centavos (ver vaga_de_emprego/salario.py)
+	salario_min = Column(Integer, nullable=True)
+	salario_max = Column(Integer, nullable=True)
+	versao = Column(Integer, nullable=False, default=1, server_default='1')
 	cargo = Column(String(50), nullable=False)
 	nivel = Column(String(50), nullable=False)
 	tipo_contrato = Column(String(50), nullable=False)
@@ -120,7 +148,37 @@ class VagaDeEmprego(Base):
 		'Candidatura',
 		back_populates='vaga',
 		cascade='all, delete-orphan',
-		passive_deletes=True,
+	)
+	notificacoes = relationship('Notificacao')
+
+	__mapper_args__ = {'version_id_col': versao}
+
+	# Índices compostos para a listagem paginada por (data, id_vaga_de_emprego)
+	__table_args__ = (
+		Index('ix_vagaDeEmprego_data_id', 'data', 'id_vaga_de_emprego'),
+		Index(
+			'ix_vagaDeEmprego_estado_cidade_data_id',
+			'estado',
+			'cidade',
+			'data',
+			'id_vaga_de_emprego',
+		),
+		Index('ix_vagaDeEmprego_nivel_data_id', 'nivel', 'data', 'id_vaga_de_emprego'),
+		Index(
+			'ix_vagaDeEmprego_tipo_contrato_data_id',
+			'tipo_contrato',
+			'data',
+			'id_vaga_de_emprego',
+		),
+		Index(
+			'ix_vagaDeEmprego_modalidade_data_id',
+			'modalidade',
+			'data',
+			'id_vaga_de_emprego',
+		),
+		# Ordenação por salário e filtros de faixa
+		Index('ix_vagaDeEmprego_salario_max_id', 'salario_max', 'id_vaga_de_emprego'),
+		Index('ix_vagaDeEmprego_salario_min', 'salario_min'),
 	)
 
 
@@ -136,8 +194,34 @@ class Candidatura(Base):
 	data = Column(DateTime, nullable=False)
 	data_atualizacao = Column(DateTime, nullable=True)
 
+	__table_args__ = (
+		# Um candidato só se candidata uma vez a cada vaga
+		Index(
+			'uq_candidatura_candidato_vaga',
+			'id_candidato',
+			'id_vaga_de_emprego',
+			unique=True,
+		),
+		# Lista de candidatos de uma vaga, paginada por data e filtrada por status
+		Index(
+			'ix_candidatura_vaga_data_id',
+			'id_vaga_de_emprego',
+			'data',
+			'id_candidatura',
+		),
+		Index(
+			'ix_candidatura_vaga_status_data_id',
+			'id_vaga_de_emprego',
+			'status',
+			'data',
+			'id_candidatura',
+		),
+	)
+
 	vaga = relationship('VagaDeEmprego', back_populates='candidaturas')
 	candidato = relationship('Candidato', back_populates='candidaturas')
+	# Sem cascade: ao remover a candidatura, as notificações só perdem a referência
+	notificacoes = relationship('Notificacao')
 
 
 class Notificacao(Base):
@@ -156,9 +240,20 @@ class Notificacao(Base):
 	)
 	titulo = Column(String(50), nullable=False)
 	mensagem = Column(String(500), nullable=False)
-	visualizada = Column(Boolean, nullable=False)
+	visualizada = Column(Boolean, nullable=False, default=False)
 	data = Column(DateTime, nullable=False)
 
+	# Caixa de entrada do candidato: não visualizadas primeiro, mais recentes no topo
+	__table_args__ = (
+		Index(
+			'ix_notificacao_candidato_visualizada_data',
+			'id_candidato',
+			'visualizada',
+			'data',
+			'id_notificacao',
+		),
+	)
+
 
 class Gestor(Base):
 	__tablename__ = 'gestor'
@@ -183,3 +278,65 @@ class Gestor(Base):
 		cascade='all, delete-orphan',
 		single_parent=True,
 	)
+
+
+class PlatformCounters(Base):
+	__tablename__ = 'platform_counters'
+
+	id = Column(Integer, primary_key=True)
+	usuarios = Column(Integer, nullable=False, default=0)
+	candidatos = Column(Integer, nullable=False, default=0)
+	empresas = Column(Integer, nullable=False, default=0)
+	vagas = Column(Integer, nullable=False, default=0)
+	candidaturas = Column(Integer, nullable=False, default=0)
+	data_reconciliacao = Column(DateTime, nullable=True)
+
+
+# Contagens por candidato mantidas pelas escritas em candidatura (ver
+# src/candidato/statistics.py), para o painel não varrer o histórico
+class CandidatoStatistics(Base):
+	__tablename__ = 'candidato_statistics'
+
+	id_candidato = Column(
+		Integer, ForeignKey('candidato.id_candidato'), primary_key=True, nullable=False
+	)
+	candidaturas = Column(Integer, nullable=False, default=0)
+	candidaturas_pendentes = Column(Integer, nullable=False, default=0)
+	candidaturas_em_analise = Column(Integer, nullable=False, default=0)
+	candidaturas_aceitas = Column(Integer, nullable=False, default=0)
+	candidaturas_rejeitadas = Column(Integer, nullable=False, default=0)
+	data_ultima_candidatura = Column(DateTime, nullable=True)
+	data_ultima_atualizacao = Column(DateTime, nullable=True)
+
+
+# Top-K de vagas por candidato, calculado em lote fora das requisições (ver
+# src/candidato/recomendacao.py); a rota só lê pelo índice (id_candidato, score)
+class CandidatoRecomendacao(Base):
+	__tablename__ = 'candidato_recomendacao'
+
+	id_candidato = Column(
+		Integer,
+		ForeignKey('candidato.id_candidato', ondelete='CASCADE'),
+		primary_key=True,
+		nullable=False,
+	)
+	id_vaga_de_emprego = Column(
+		Integer,
+		ForeignKey('vagaDeEmprego.id_vaga_de_emprego', ondelete='CASCADE'),
+		primary_key=True,
+		nullable=False,
+	)
+	score = Column(Float, nullable=False)
+
+	__table_args__ = (
+		Index('ix_candidato_recomendacao_candidato_score', 'id_candidato', 'score'),
+	)
+
+
+# Candidatos e vagas alterados desde o último refresh das recomendações
+class RecomendacaoPendente(Base):
+	__tablename__ = 'recomendacao_pendente'
+
+	tipo = Column(String(20), primary_key=True)
+	id = Column(Integer, primary_key=True)
+	data = Column(DateTime, nullable=False)
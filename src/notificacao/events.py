@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Vazio: pub/sub só dentro do processo. Com vários workers, aponte todos para o
+# mesmo broker (unix:///tmp/talent-base-events.sock ou tcp://host:porta) e suba
+# o broker com "python -m src.notificacao.events <url>"
+EVENT_BROKER_URL = os.getenv('EVENT_BROKER_URL', '')
+EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', 100))
+EVENT_BROKER_BUFFER_BYTES = int(os.getenv('EVENT_BROKER_BUFFER_BYTES', 1_048_576))
+EVENT_BROKER_RECONNECT_SECONDS = float(os.getenv('EVENT_BROKER_RECONNECT_SECONDS', 0.5))
+EVENT_BROKER_RECONNECT_MAX_SECONDS = float(
+	os.getenv('EVENT_BROKER_RECONNECT_MAX_SECONDS', 30)
+)
+
+
+class Subscription:
+	def __init__(self, topic: str, maxsize: int):
+		self.topic = topic
+		self.queue = asyncio.Queue(maxsize=maxsize)
+		self.overflowed = False
+
+	def push(self, event):
+		if self.overflowed:
+			return
+		try:
+			self.queue.put_nowait(event)
+		except asyncio.QueueFull:
+			# Cliente lento: descarta a fila e encerra a conexão. Ele reconecta com
+			# Last-Event-ID e recupera o que perdeu, sem a memória crescer aqui
+			self.overflowed = True
+			while not self.queue.empty():
+				self.queue.get_nowait()
+			self.queue.put_nowait(None)
+
+	async def get(self, timeout: float):
+		return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+	def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+		self.queue_size = queue_size
+		self._subscriptions = {}
+
+	async def subscribe(self, topic: str):
+		subscription = Subscription(topic, self.queue_size)
+		self._subscriptions.setdefault(topic, set()).add(subscription)
+		return subscription
+
+	def unsubscribe(self, subscription: Subscription):
+		subscriptions = self._subscriptions.get(subscription.topic)
+		if subscriptions is not None:
+			subscriptions.discard(subscription)
+			if not subscriptions:
+				del self._subscriptions[subscription.topic]
+
+	def dispatch(self, topic: str, event: dict):
+		for subscription in list(self._subscriptions.get(topic, ())):
+			subscription.push(event)
+
+	async def publish(self, topic: str, event: dict):
+		self.dispatch(topic, event)
+
+	async def close(self):
+		pass
+
+	def stats(self):
+		return {
+			'topics': len(self._subscriptions),
+			'subscriptions': sum(len(subs) for subs in self._subscriptions.values()),
+		}
+
+
+# Cada worker mantém uma conexão com o broker (ver serveBroker): publica por ela
+# e recebe de volta os eventos de todos os workers, entregues às inscrições locais
+class SocketBroker(LocalBroker):
+	def __init__(
+		self,
+		url: str,
+		queue_size: int = EVENT_QUEUE_SIZE,
+		reconnect_seconds: float = EVENT_BROKER_RECONNECT_SECONDS,
+	):
+		super().__init__(queue_size)
+		self.url = urlparse(url)
+		self.reconnect_seconds = reconnect_seconds
+		self._writer = None
+		self._reader_task = None
+		self._reconnect_task = None
+		self._closed = False
+		self._lock = asyncio.Lock()
+
+	async def _connect(self):
+		async with self._lock:
+			if self._writer is not None and not self._writer.is_closing():
+				return self._writer
+			if self.url.scheme == 'unix':
+				reader, writer = await asyncio.open_unix_connection(self.url.path)
+			else:
+				reader, writer = await asyncio.open_connection(
+					self.url.hostname, self.url.port
+				)
+			self._writer = writer
+			self._reader_task = asyncio.create_task(self._read(reader, writer))
+			return writer
+
+	async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		try:
+			async for line in reader:
+				message = json.loads(line)
+				self.dispatch(message['topic'], message['event'])
+		except (ConnectionError, ValueError):
+			logger.warning('Conexão com o broker de eventos perdida', exc_info=True)
+		finally:
+			writer.close()
+			if self._writer is writer:
+				self._writer = None
+			# Worker que só atende streams não publica: sem reconectar aqui, as
+			# inscrições abertas deixariam de receber eventos
+			if not self._closed and self._subscriptions:
+				self._reconnect_task = asyncio.create_task(self._reconnect())
+
+	async def _reconnect(self):
+		espera = self.reconnect_seconds
+		while not self._closed and self._subscriptions:
+			await asyncio.sleep(espera)
+			try:
+				await self._connect()
+				return
+			except OSError:
+				logger.warning(
+					'Falha ao reconectar ao broker de eventos', exc_info=True
+				)
+				espera = min(espera * 2, EVENT_BROKER_RECONNECT_MAX_SECONDS)
+
+	async def subscribe(self, topic: str):
+		await self._connect()
+		return await super().subscribe(topic)
+
+	async def publish(self, topic: str, event: dict):
+		writer = await self._connect()
+		writer.write(json.dumps({'topic': topic, 'event': event}).encode() + b'\n')
+		await writer.drain()
+
+	async def close(self):
+		self._closed = True
+		for task in (self._reader_task, self._reconnect_task):
+			if task is not None:
+				task.cancel()
+		if self._writer is not None:
+			self._writer.close()
+		self._writer = None
+
+
+async def serveBroker(url: str, ready: asyncio.Event = None):
+	clients = set()
+
+	async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		clients.add(writer)
+		try:
+			async for line in reader:
+				for client in list(clients):
+					# Worker que não consome é desconectado em vez de acumular memória
+					if (
+						client.transport.get_write_buffer_size()
+						> EVENT_BROKER_BUFFER_BYTES
+					):
+						clients.discard(client)
+						client.close()
+						continue
+					client.write(line)
+		except ConnectionError:
+			pass
+		finally:
+			clients.discard(writer)
+			writer.close()
+
+	parsed = urlparse(url)
+	if parsed.scheme == 'unix':
+		server = await asyncio.start_unix_server(handle, parsed.path)
+	else:
+		server = await asyncio.start_server(handle, parsed.hostname, parsed.port)
+	async with server:
+		if ready is not None:
+			ready.set()
+		await server.serve_forever()
+
+
+def createBroker(url: str = EVENT_BROKER_URL):
+	if not url:
+		return LocalBroker()
+	return SocketBroker(url)
+
+
+event_broker = createBroker()
+
+
+if __name__ == '__main__':
+	logging.basicConfig(level=logging.INFO)
+	broker_url = sys.argv[1] if len(sys.argv) > 1 else EVENT_BROKER_URL
+	if not broker_url:
+		sys.exit('Informe a URL do broker (unix:///caminho.sock ou tcp://host:porta)')
+	logger.info('Broker de eventos em %s', broker_url)
+	asyncio.run(serveBroker(broker_url))
@@ -0,0 +1,182 @@
+from datetime import datetime
+
+from sqlalchemy import and_, false, func, insert, or_, select, true, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models import Notificacao, VagaDeEmprego
+from ..pagination import decodeCursor, encodeCursor
+
+TITULO_MUDANCA_STATUS = 'Candidatura atualizada'
+
+
+def notificacoesPageStatement(
+	id_candidato: int,
+	limit: int,
+	cursor: str = None,
+	apenas_nao_visualizadas: bool = False,
+):
+	statement = select(*Notificacao.__table__.columns).where(
+		Notificacao.id_candidato == id_candidato
+	)
+	if apenas_nao_visualizadas:
+		statement = statement.where(Notificacao.visualizada == false())
+
+	# Keyset sobre (visualizada asc, data desc, id desc): não visualizadas primeiro.
+	# Comparações com "= false" (e não "IS false") para o Postgres usar o índice
+	if cursor:
+		last_visualizada, last_data, last_id = decodeCursor(
+			cursor, bool, datetime.fromisoformat, int
+		)
+		mesmo_grupo = and_(
+			Notificacao.visualizada == (true() if last_visualizada else false()),
+			tuple_(Notificacao.data, Notificacao.id_notificacao)
+			< tuple_(last_data, last_id),
+		)
+		if last_visualizada:
+			statement = statement.where(mesmo_grupo)
+		else:
+			statement = statement.where(
+				or_(Notificacao.visualizada == true(), mesmo_grupo)
+			)
+
+	return statement.order_by(
+		Notificacao.visualizada.asc(),
+		Notificacao.data.desc(),
+		Notificacao.id_notificacao.desc(),
+	).limit(limit + 1)
+
+
+def naoVisualizadasStatement(id_candidato: int):
+	return select(func.count()).where(
+		Notificacao.id_candidato == id_candidato,
+		Notificacao.visualizada == false(),
+	)
+
+
+def notificacoesPage(notificacoes: list, limit: int, nao_visualizadas: int):
+	next_cursor = None
+	if len(notificacoes) > limit:
+		notificacoes = notificacoes[:limit]
+		last = notificacoes[-1]
+		next_cursor = encodeCursor(last.visualizada, last.data, last.id_notificacao)
+	return {
+		'items': notificacoes,
+		'next_cursor': next_cursor,
+		'nao_visualizadas': nao_visualizadas,
+	}
+
+
+class NotificacaoRepository:
+	def notifyStatusChanges(alteracoes: list, database: Session):
+		# alteracoes: pares (candidatura, status anterior). Não faz commit: as
+		# notificações entram na mesma transação da mudança de status
+		alteradas = [
+			candidatura
+			for candidatura, status_anterior in alteracoes
+			if candidatura.status != status_anterior
+		]
+		if not alteradas:
+			return []
+
+		nomes_vagas = dict(
+			database.execute(
+				select(
+					VagaDeEmprego.id_vaga_de_emprego, VagaDeEmprego.nome_vaga_de_emprego
+				).where(
+					VagaDeEmprego.id_vaga_de_emprego.in_(
+						{candidatura.id_vaga_de_emprego for candidatura in alteradas}
+					)
+				)
+			).all()
+		)
+		agora = datetime.now()
+		notificacoes = [
+			{
+				'id_candidato': candidatura.id_candidato,
+				'id_candidatura': candidatura.id_candidatura,
+				'id_vaga_de_emprego': candidatura.id_vaga_de_emprego,
+				'titulo': TITULO_MUDANCA_STATUS,
+				'mensagem': (
+					'O status da sua candidatura para a vaga '
+					f'{nomes_vagas.get(candidatura.id_vaga_de_emprego, "")} '
+					f'mudou para {candidatura.status}.'
+				),
+				'visualizada': False,
+				'data': agora,
+			}
+			for candidatura in alteradas
+		]
+		# Um único executemany para o lote inteiro; o RETURNING devolve os ids que
+		# viram o id dos eventos enviados por SSE
+		return database.execute(
+			insert(Notificacao).returning(*Notificacao.__table__.columns),
+			notificacoes,
+		).all()
+
+	async def getNotificacoesAfterIdAsync(
+		id_candidato: int, last_id: int, database: AsyncSession, limit: int = 100
+	):
+		return (
+			await database.execute(
+				select(*Notificacao.__table__.columns)
+				.where(
+					Notificacao.id_candidato == id_candidato,
+					Notificacao.id_notificacao > last_id,
+				)
+				.order_by(Notificacao.id_notificacao.asc())
+				.limit(limit)
+			)
+		).all()
+
+	def getNotificacoesPage(
+		id_candidato: int,
+		database: Session,
+		limit: int = 20,
+		cursor: str = None,
+		apenas_nao_visualizadas: bool = False,
+	):
+		notificacoes = database.execute(
+			notificacoesPageStatement(
+				id_candidato, limit, cursor, apenas_nao_visualizadas
+			)
+		).all()
+		nao_visualizadas = database.execute(
+			naoVisualizadasStatement(id_candidato)
+		).scalar()
+		return notificacoesPage(notificacoes, limit, nao_visualizadas)
+
+	async def getNotificacoesPageAsync(
+		id_candidato: int,
+		database: AsyncSession,
+		limit: int = 20,
+		cursor: str = None,
+		apenas_nao_visualizadas: bool = False,
+	):
+		notificacoes = (
+			await database.execute(
+				notificacoesPageStatement(
+					id_candidato, limit, cursor, apenas_nao_visualizadas
+				)
+			)
+		).all()
+		nao_visualizadas = (
+			await database.execute(naoVisualizadasStatement(id_candidato))
+		).scalar()
+		return notificacoesPage(notificacoes, limit, nao_visualizadas)
+
+	def markNotificacoesAsRead(id_candidato: int, ids: list, database: Session):
+		statement = (
+			update(Notificacao)
+			.where(
+				Notificacao.id_candidato == id_candidato,
+				Notificacao.visualizada == false(),
+			)
+			.values(visualizada=True)
+			.execution_options(synchronize_session=False)
+		)
+		if ids:
+			statement = statement.where(Notificacao.id_notificacao.in_(ids))
+		atualizadas = database.execute(statement).rowcount
+		database.commit()
+		return atualizadas
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..auth.repository import requireCandidato
+
+from ..database import getAsyncDatabase, getDatabase
+from .repository import NotificacaoRepository
+from .schema import (
+	MarcarVisualizadasRequest,
+	MarcarVisualizadasResponse,
+	NotificacaoPageResponse,
+)
+from .stream import notificacoesEvents
+from ..models import Usuario
+
+router = APIRouter(
+	prefix='/notificacoes',
+	tags=['notificacoes'],
+	responses={404: {'description': 'Not found'}},
+)
+
+
+@router.get('/', response_model=NotificacaoPageResponse)
+async def getNotificacoes(
+	database: AsyncSession = Depends(getAsyncDatabase),
+	limit: int = Query(20, ge=1, le=100),
+	cursor: str = Query(None),
+	apenas_nao_visualizadas: bool = Query(False),
+	current_user: Usuario = Depends(requireCandidato),
+):
+	page = await NotificacaoRepository.getNotificacoesPageAsync(
+		current_user.id,
+		database,
+		limit=limit,
+		cursor=cursor,
+		apenas_nao_visualizadas=apenas_nao_visualizadas,
+	)
+	return page
+
+
+@router.get('/stream', response_class=StreamingResponse)
+async def streamNotificacoes(
+	request: Request,
+	last_event_id: int = Header(None),
+	current_user: Usuario = Depends(requireCandidato),
+):
+	return StreamingResponse(
+		notificacoesEvents(request, current_user.id, last_event_id),
+		media_type='text/event-stream',
+		headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+	)
+
+
+@router.put('/visualizar', response_model=MarcarVisualizadasResponse)
+async def markNotificacoesAsRead(
+	payload: MarcarVisualizadasRequest,
+	database: Session = Depends(getDatabase),
+	current_user: Usuario = Depends(requireCandidato),
+):
+	atualizadas = NotificacaoRepository.markNotificacoesAsRead(
+		current_user.id, payload.ids, database
+	)
+	return {'atualizadas': atualizadas}
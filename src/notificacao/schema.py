@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class NotificacaoResponse(BaseModel):
+	id_notificacao: int
+	id_candidato: int
+	id_candidatura: Optional[int] = None
+	id_vaga_de_emprego: Optional[int] = None
+	titulo: str
+	mensagem: str
+	visualizada: bool
+	data: datetime
+
+	model_config = {'from_attributes': True}
+
+
+class NotificacaoPageResponse(BaseModel):
+	items: list[NotificacaoResponse]
+	next_cursor: Optional[str] = None
+	nao_visualizadas: int
+
+
+class MarcarVisualizadasRequest(BaseModel):
+	# Sem ids, marca todas as notificações do candidato
+	ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=500)
+
+
+class MarcarVisualizadasResponse(BaseModel):
+	atualizadas: int
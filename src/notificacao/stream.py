@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+import os
+
+from ..database import AsyncSessionLocal
+from .events import event_broker
+from .repository import NotificacaoRepository
+from .schema import NotificacaoResponse
+
+logger = logging.getLogger(__name__)
+
+EVENT_HEARTBEAT_SECONDS = float(os.getenv('EVENT_HEARTBEAT_SECONDS', 15))
+EVENT_RETRY_MILLISECONDS = int(os.getenv('EVENT_RETRY_MILLISECONDS', 3000))
+EVENT_REPLAY_BATCH = 100
+EVENTO_STATUS = 'candidatura.status'
+
+
+def formatEvent(notificacao: dict):
+	return (
+		f'id: {notificacao["id_notificacao"]}\n'
+		f'event: {EVENTO_STATUS}\n'
+		f'data: {json.dumps(notificacao, ensure_ascii=False)}\n\n'
+	)
+
+
+async def publishNotificacoes(notificacoes: list):
+	# Chamado depois do commit: o evento nunca chega antes da linha existir, e quem
+	# perder o evento recupera pelo Last-Event-ID
+	for notificacao in notificacoes:
+		evento = NotificacaoResponse.model_validate(notificacao).model_dump(mode='json')
+		try:
+			await event_broker.publish(str(evento['id_candidato']), evento)
+		except (OSError, ConnectionError):
+			logger.warning('Falha ao publicar evento de notificação', exc_info=True)
+
+
+async def notificacoesEvents(
+	request,
+	id_candidato: int,
+	last_event_id: int = None,
+	database_factory=AsyncSessionLocal,
+):
+	# Inscreve no primeiro passo do gerador, antes do replay: eventos publicados
+	# enquanto ele consulta o banco ficam na fila. Se o cliente desconectar antes
+	# de a resposta começar, o gerador nunca roda e nada fica inscrito no broker
+	subscription = await event_broker.subscribe(str(id_candidato))
+	try:
+		yield f'retry: {EVENT_RETRY_MILLISECONDS}\n\n'
+
+		# Reconexão: reenvia do banco o que ficou depois do último id recebido. A
+		# inscrição já está ativa, então nada publicado durante a consulta se perde
+		last_id = last_event_id or 0
+		if last_event_id is not None:
+			async with database_factory() as database:
+				while True:
+					notificacoes = (
+						await NotificacaoRepository.getNotificacoesAfterIdAsync(
+							id_candidato, last_id, database, limit=EVENT_REPLAY_BATCH
+						)
+					)
+					for notificacao in notificacoes:
+						yield formatEvent(
+							NotificacaoResponse.model_validate(notificacao).model_dump(
+								mode='json'
+							)
+						)
+						last_id = notificacao.id_notificacao
+					if len(notificacoes) < EVENT_REPLAY_BATCH:
+						break
+
+		while not await request.is_disconnected():
+			try:
+				evento = await subscription.get(EVENT_HEARTBEAT_SECONDS)
+			except asyncio.TimeoutError:
+				# Comentário SSE: mantém proxies e o cliente com a conexão aberta
+				yield ': ping\n\n'
+				continue
+			if evento is None:
+				# Fila estourou: encerra e o cliente retoma pelo Last-Event-ID
+				break
+			if evento['id_notificacao'] <= last_id:
+				continue
+			last_id = evento['id_notificacao']
+			yield formatEvent(evento)
+	finally:
+		event_broker.unsubscribe(subscription)
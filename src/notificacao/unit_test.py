@@ -0,0 +1,375 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from ..models import (
+	Candidato,
+	Candidatura,
+	Empresa,
+	Notificacao,
+	Usuario,
+	VagaDeEmprego,
+)
+from . import stream
+from .events import LocalBroker, SocketBroker, serveBroker
+from .repository import NotificacaoRepository
+from ..candidato.repository import CandidatoRepository
+from ..candidatura.repository import CandidaturaRepository
+from ..empresa.repository import EmpresaRepository
+from ..usuario.repository import UsuarioRepository
+from ..vaga_de_emprego.repository import VagaDeEmpregoRepository
+
+
+def add_candidato(db, id):
+	UsuarioRepository.createUsuario(
+		Usuario(
+			id=id,
+			nome=f'Candidato {id}',
+			email=f'candidato{id}@example.com',
+			senha='123',
+			papel='candidato',
+		),
+		db,
+	)
+	return CandidatoRepository.createCandidato(
+		Candidato(
+			id_candidato=id, nome=f'Candidato {id}', email=f'candidato{id}@example.com'
+		),
+		db,
+	)
+
+
+@pytest.fixture
+def add_candidatura(db):
+	add_candidato(db, 1)
+	EmpresaRepository.createEmpresa(
+		Empresa(
+			id_empresa=1,
+			nome_empresa='Empresa G',
+			cnpj='12345671234567',
+			cidade='Gama',
+			estado='DF',
+		),
+		db,
+	)
+	VagaDeEmpregoRepository.createVagaDeEmprego(
+		VagaDeEmprego(
+			id_vaga_de_emprego=1,
+			id_empresa=1,
+			nome_vaga_de_emprego='Desenvolvedor Backend',
+			data=date(2023, 10, 28),
+			cidade='São Paulo',
+			estado='SP',
+			salario='8000.00',
+			cargo='Desenvolvedor Backend',
+			nivel='Pleno',
+			tipo_contrato='CLT',
+			modalidade='Presencial',
+			descricao='Vaga para desenvolvedor backend.',
+		),
+		db,
+	)
+	return CandidaturaRepository.createCandidatura(
+		Candidatura(
+			id_candidato=1,
+			id_vaga_de_emprego=1,
+			status='Pendente',
+			data=datetime(2025, 10, 28),
+		),
+		db,
+	)
+
+
+def add_notificacoes(db, id_candidato, quantidade, visualizada=False):
+	inicio = datetime(2025, 1, 1)
+	db.add_all(
+		[
+			Notificacao(
+				id_candidato=id_candidato,
+				titulo='Aviso',
+				mensagem=f'Mensagem {i}',
+				visualizada=visualizada,
+				data=inicio + timedelta(days=i),
+			)
+			for i in range(quantidade)
+		]
+	)
+	db.commit()
+
+
+def test_notifyStatusChanges(add_candidatura, db):
+	candidatura = add_candidatura
+	status_anterior = candidatura.status
+	candidatura.status = 'Em análise'
+
+	criadas = NotificacaoRepository.notifyStatusChanges(
+		[(candidatura, status_anterior), (candidatura, 'Em análise')], db
+	)
+	CandidaturaRepository.updateCandidatura(candidatura, db)
+
+	notificacao = db.query(Notificacao).one()
+	assert len(criadas) == 1
+	assert criadas[0].id_notificacao == notificacao.id_notificacao
+	assert notificacao.id_candidatura == candidatura.id_candidatura
+	assert notificacao.id_vaga_de_emprego == 1
+	assert not notificacao.visualizada
+	assert 'Desenvolvedor Backend' in notificacao.mensagem
+	assert 'Em análise' in notificacao.mensagem
+
+
+def test_unchangedStatus_notifyStatusChanges(add_candidatura, db):
+	criadas = NotificacaoRepository.notifyStatusChanges(
+		[(add_candidatura, add_candidatura.status)], db
+	)
+	assert criadas == []
+	assert db.query(Notificacao).count() == 0
+
+
+def test_getNotificacoesPage(db):
+	add_candidato(db, 1)
+	add_notificacoes(db, 1, 3, visualizada=True)
+	add_notificacoes(db, 1, 2)
+
+	vistas = []
+	cursor = None
+	while True:
+		page = NotificacaoRepository.getNotificacoesPage(1, db, limit=2, cursor=cursor)
+		vistas.extend(page['items'])
+		cursor = page['next_cursor']
+		if cursor is None:
+			break
+
+	assert page['nao_visualizadas'] == 2
+	assert [(n.visualizada, n.mensagem) for n in vistas] == [
+		(False, 'Mensagem 1'),
+		(False, 'Mensagem 0'),
+		(True, 'Mensagem 2'),
+		(True, 'Mensagem 1'),
+		(True, 'Mensagem 0'),
+	]
+
+
+def test_markNotificacoesAsRead(db):
+	add_candidato(db, 1)
+	add_candidato(db, 2)
+	add_notificacoes(db, 1, 3)
+	add_notificacoes(db, 2, 2)
+	primeira = db.query(Notificacao).filter(Notificacao.id_candidato == 1).first()
+
+	uma = NotificacaoRepository.markNotificacoesAsRead(1, [primeira.id_notificacao], db)
+	restantes = NotificacaoRepository.markNotificacoesAsRead(1, None, db)
+	page = NotificacaoRepository.getNotificacoesPage(2, db)
+
+	assert uma == 1
+	assert restantes == 2
+	assert page['nao_visualizadas'] == 2
+
+
+def test_deleteCandidatura_keeps_notificacoes(add_candidatura, db):
+	candidatura = add_candidatura
+	candidatura.status = 'Rejeitado'
+	NotificacaoRepository.notifyStatusChanges([(candidatura, 'Pendente')], db)
+	CandidaturaRepository.updateCandidatura(candidatura, db)
+
+	CandidaturaRepository.deleteCandidatura(candidatura, db)
+
+	notificacao = db.query(Notificacao).one()
+	assert notificacao.id_candidatura is None
+
+
+def test_getNotificacoesPageAsync(run_async_db):
+	async def scenario(database):
+		database.add(
+			Usuario(
+				id=1,
+				nome='João',
+				email='joao@example.com',
+				senha='123',
+				papel='candidato',
+			)
+		)
+		database.add(
+			Candidato(id_candidato=1, nome='João Silva', email='joao@example.com')
+		)
+		database.add_all(
+			[
+				Notificacao(
+					id_candidato=1,
+					titulo='Aviso',
+					mensagem=f'Mensagem {i}',
+					visualizada=i == 0,
+					data=datetime(2025, 1, 1 + i),
+				)
+				for i in range(3)
+			]
+		)
+		await database.commit()
+		return await NotificacaoRepository.getNotificacoesPageAsync(
+			1, database, apenas_nao_visualizadas=True
+		)
+
+	page = run_async_db(scenario)
+
+	assert [n.mensagem for n in page['items']] == ['Mensagem 2', 'Mensagem 1']
+	assert page['nao_visualizadas'] == 2
+
+
+class FakeRequest:
+	async def is_disconnected(self):
+		return False
+
+
+def test_localBroker_publish():
+	async def scenario():
+		broker = LocalBroker()
+		subscription = await broker.subscribe('1')
+		outra = await broker.subscribe('2')
+		await broker.publish('1', {'id_notificacao': 1})
+		evento = await subscription.get(1)
+		broker.unsubscribe(subscription)
+		broker.unsubscribe(outra)
+		return evento, outra.queue.empty(), broker.stats()
+
+	evento, outra_vazia, stats = asyncio.run(scenario())
+
+	assert evento == {'id_notificacao': 1}
+	assert outra_vazia
+	assert stats == {'topics': 0, 'subscriptions': 0}
+
+
+def test_localBroker_overflow():
+	async def scenario():
+		broker = LocalBroker(queue_size=2)
+		subscription = await broker.subscribe('1')
+		for id_notificacao in range(5):
+			await broker.publish('1', {'id_notificacao': id_notificacao})
+		return subscription
+
+	subscription = asyncio.run(scenario())
+
+	assert subscription.overflowed
+	assert subscription.queue.qsize() == 1
+	assert subscription.queue.get_nowait() is None
+
+
+def test_socketBroker_fan_out(tmp_path):
+	url = f'unix://{tmp_path}/events.sock'
+
+	async def scenario():
+		ready = asyncio.Event()
+		server = asyncio.create_task(serveBroker(url, ready))
+		await ready.wait()
+		worker_a, worker_b = SocketBroker(url), SocketBroker(url)
+		try:
+			subscription = await worker_b.subscribe('1')
+			await worker_a.publish('1', {'id_notificacao': 7})
+			return await subscription.get(1)
+		finally:
+			await worker_a.close()
+			await worker_b.close()
+			server.cancel()
+
+	assert asyncio.run(scenario()) == {'id_notificacao': 7}
+
+
+def test_socketBroker_reconnect(tmp_path):
+	url = f'unix://{tmp_path}/events.sock'
+
+	async def scenario():
+		ready = asyncio.Event()
+		server = asyncio.create_task(serveBroker(url, ready))
+		await ready.wait()
+		worker_a = SocketBroker(url)
+		worker_b = SocketBroker(url, reconnect_seconds=0.01)
+		try:
+			subscription = await worker_b.subscribe('1')
+			# Conexão cai sem que o worker_b publique nada depois
+			perdida = worker_b._writer
+			perdida.transport.abort()
+			while worker_b._writer in (None, perdida):
+				await asyncio.sleep(0.01)
+			await worker_a.publish('1', {'id_notificacao': 8})
+			return perdida.is_closing(), await subscription.get(1)
+		finally:
+			await worker_a.close()
+			await worker_b.close()
+			server.cancel()
+
+	assert asyncio.run(scenario()) == (True, {'id_notificacao': 8})
+
+
+def test_notificacoesEvents_resume(run_async_db, monkeypatch):
+	broker = LocalBroker()
+	monkeypatch.setattr(stream, 'event_broker', broker)
+
+	async def scenario(database):
+		database.add(
+			Usuario(
+				id=1,
+				nome='João',
+				email='joao@example.com',
+				senha='123',
+				papel='candidato',
+			)
+		)
+		database.add(
+			Candidato(id_candidato=1, nome='João Silva', email='joao@example.com')
+		)
+		database.add_all(
+			[
+				Notificacao(
+					id_notificacao=i,
+					id_candidato=1,
+					titulo='Aviso',
+					mensagem=f'Mensagem {i}',
+					data=datetime(2025, 1, i),
+				)
+				for i in (1, 2, 3)
+			]
+		)
+		await database.commit()
+
+		events = stream.notificacoesEvents(
+			FakeRequest(),
+			1,
+			last_event_id=1,
+			database_factory=lambda: AsyncSession(database.bind),
+		)
+		recebidos = [await anext(events)]
+		# Chega pelo broker um evento já reenviado pelo replay e um novo
+		await broker.publish('1', {'id_notificacao': 3})
+		await broker.publish('1', {'id_notificacao': 4})
+		recebidos += [await anext(events) for _ in range(3)]
+		await events.aclose()
+		return recebidos
+
+	recebidos = run_async_db(scenario)
+
+	assert recebidos[0].startswith('retry: ')
+	assert [evento.split('\n')[0] for evento in recebidos[1:]] == [
+		'id: 2',
+		'id: 3',
+		'id: 4',
+	]
+	assert broker.stats()['subscriptions'] == 0
+
+
+def test_notificacoesEvents_never_started(monkeypatch):
+	broker = LocalBroker()
+	monkeypatch.setattr(stream, 'event_broker', broker)
+
+	async def scenario():
+		# Cliente desconectou antes de a resposta começar a iterar o gerador
+		events = stream.notificacoesEvents(FakeRequest(), 1)
+		await events.aclose()
+
+	asyncio.run(scenario())
+
+	assert broker.stats()['subscriptions'] == 0
@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+
+
+def encodeCursor(*values):
+	payload = [
+		value.isoformat() if isinstance(value, (date, datetime)) else value
+		for value in values
+	]
+	raw = json.dumps(payload, separators=(',', ':')).encode()
+	return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decodeCursor(cursor: str, *parsers):
+	try:
+		padded = cursor + '=' * (-len(cursor) % 4)
+		values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+		if not isinstance(values, list) or len(values) != len(parsers):
+			raise ValueError(cursor)
+		return tuple(parse(value) for parse, value in zip(parsers, values, strict=True))
+	except (ValueError, TypeError) as error:
+		raise HTTPException(status_code=400, detail='Cursor inválido') from error
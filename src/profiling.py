@@ -0,0 +1,283 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+import logging
+import os
+import re
+from threading import Lock
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILING_SLOW_QUERY_MS = float(os.getenv('PROFILING_SLOW_QUERY_MS', 200))
+# Mesma consulta (a menos dos parâmetros) repetida mais vezes que isso numa
+# requisição indica um laço que deveria ser um JOIN ou um selectinload
+PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv('PROFILING_N_PLUS_ONE_THRESHOLD', 10))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Listas de parâmetros expandidas (IN (?, ?, ?)) e literais viram um marcador só
+PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+PLACEHOLDER_LIST = re.compile(rf'\(\s*{PLACEHOLDER}(?:\s*,\s*{PLACEHOLDER})*\s*\)')
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r'\s+')
+
+
+def statementShape(statement: str):
+	shape = WHITESPACE.sub(' ', statement).strip()
+	shape = LITERAL.sub('?', shape)
+	return PLACEHOLDER_LIST.sub('(?)', shape)
+
+
+class RequestProfile:
+	def __init__(self, scope: dict):
+		self.scope = scope
+		self.queries = 0
+		self.db_seconds = 0.0
+		self.shapes = Counter()
+
+	@property
+	def route(self):
+		# O roteamento preenche scope['route'] antes do endpoint: usa o template
+		# da rota, não o path com ids (404 e afins ficam num label só)
+		route = self.scope.get('route')
+		return route.path if route is not None else '<sem rota>'
+
+
+current_profile = ContextVar('current_profile', default=None)
+
+
+def escapeLabel(value):
+	return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatLabels(labels: tuple, values: tuple, **extra):
+	pairs = [*zip(labels, values, strict=True), *extra.items()]
+	if not pairs:
+		return ''
+	return (
+		'{' + ','.join(f'{name}="{escapeLabel(value)}"' for name, value in pairs) + '}'
+	)
+
+
+class Histogram:
+	def __init__(self, name: str, description: str, labels: tuple, buckets: tuple):
+		self.name = name
+		self.description = description
+		self.labels = labels
+		self.buckets = buckets
+		# Por combinação de labels: contagem por faixa (não acumulada), soma, total
+		self.series = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0, 0])
+
+	def observe(self, value: float, *labels):
+		counts, _, _ = series = self.series[labels]
+		counts[bisect_left(self.buckets, value)] += 1
+		series[1] += value
+		series[2] += 1
+
+	def render(self):
+		yield f'# HELP {self.name} {self.description}'
+		yield f'# TYPE {self.name} histogram'
+		for labels, (counts, total, count) in sorted(self.series.items()):
+			cumulative = 0
+			for bucket, bucket_count in zip(
+				(*self.buckets, '+Inf'), counts, strict=True
+			):
+				cumulative += bucket_count
+				yield (
+					f'{self.name}_bucket'
+					f'{formatLabels(self.labels, labels, le=bucket)} {cumulative}'
+				)
+			yield f'{self.name}_sum{formatLabels(self.labels, labels)} {total}'
+			yield f'{self.name}_count{formatLabels(self.labels, labels)} {count}'
+
+
+class CounterMetric:
+	def __init__(self, name: str, description: str, labels: tuple):
+		self.name = name
+		self.description = description
+		self.labels = labels
+		self.series = defaultdict(float)
+
+	def inc(self, *labels, amount: float = 1):
+		self.series[labels] += amount
+
+	def render(self):
+		yield f'# HELP {self.name} {self.description}'
+		yield f'# TYPE {self.name} counter'
+		for labels, value in sorted(self.series.items()):
+			yield f'{self.name}{formatLabels(self.labels, labels)} {value}'
+
+
+class ProfilingMetrics:
+	def __init__(self):
+		self._lock = Lock()
+		self.request_duration = Histogram(
+			'http_request_duration_seconds',
+			'Latência das requisições por rota',
+			('method', 'route', 'status'),
+			LATENCY_BUCKETS,
+		)
+		self.request_queries = Histogram(
+			'http_request_db_queries',
+			'Consultas ao banco por requisição',
+			('method', 'route'),
+			QUERY_COUNT_BUCKETS,
+		)
+		self.request_db_seconds = CounterMetric(
+			'http_request_db_seconds_total',
+			'Tempo gasto no banco pelas requisições da rota',
+			('method', 'route'),
+		)
+		self.query_duration = Histogram(
+			'db_query_duration_seconds',
+			'Duração de cada consulta ao banco',
+			('route',),
+			QUERY_BUCKETS,
+		)
+		self.slow_queries = CounterMetric(
+			'db_slow_queries_total',
+			f'Consultas acima de {PROFILING_SLOW_QUERY_MS:g} ms',
+			('route',),
+		)
+		self.n_plus_one = CounterMetric(
+			'db_n_plus_one_total',
+			'Requisições com a mesma consulta repetida acima do limite',
+			('method', 'route'),
+		)
+
+	def recordQuery(self, route: str, seconds: float, slow: bool):
+		with self._lock:
+			self.query_duration.observe(seconds, route)
+			if slow:
+				self.slow_queries.inc(route)
+
+	def recordRequest(
+		self, method: str, route: str, status: int, seconds: float, profile
+	):
+		with self._lock:
+			self.request_duration.observe(seconds, method, route, status)
+			self.request_queries.observe(profile.queries, method, route)
+			self.request_db_seconds.inc(method, route, amount=profile.db_seconds)
+
+	def recordNPlusOne(self, method: str, route: str):
+		with self._lock:
+			self.n_plus_one.inc(method, route)
+
+	def render(self):
+		with self._lock:
+			return [
+				line
+				for metric in (
+					self.request_duration,
+					self.request_queries,
+					self.request_db_seconds,
+					self.query_duration,
+					self.slow_queries,
+					self.n_plus_one,
+				)
+				for line in metric.render()
+			]
+
+
+profiling_metrics = ProfilingMetrics()
+
+
+def recordQuery(statement: str, seconds: float):
+	# Chamado pelo evento after_cursor_execute dos engines (ver database.py)
+	profile = current_profile.get()
+	route = profile.route if profile else '<fora de requisição>'
+	slow = seconds * 1000 >= PROFILING_SLOW_QUERY_MS
+	profiling_metrics.recordQuery(route, seconds, slow)
+	if slow:
+		logger.warning(
+			'Consulta lenta (%.1f ms) em %s: %s',
+			seconds * 1000,
+			route,
+			WHITESPACE.sub(' ', statement)[:500],
+		)
+	if profile is not None:
+		profile.queries += 1
+		profile.db_seconds += seconds
+		profile.shapes[statementShape(statement)] += 1
+
+
+def renderPoolMetrics(pool_statistics: dict):
+	metricas = {
+		'db_pool_size': ('gauge', 'size', 'Tamanho configurado do pool'),
+		'db_pool_checked_out': ('gauge', 'checked_out', 'Conexões em uso'),
+		'db_pool_overflow': ('gauge', 'overflow', 'Conexões além do pool_size'),
+		'db_pool_connections_total': ('counter', 'connections', 'Conexões abertas'),
+		'db_pool_checkouts_total': ('counter', 'checkouts', 'Retiradas do pool'),
+		'db_pool_invalidations_total': (
+			'counter',
+			'invalidations',
+			'Conexões invalidadas',
+		),
+	}
+	for name, (kind, field, description) in metricas.items():
+		yield f'# HELP {name} {description}'
+		yield f'# TYPE {name} {kind}'
+		for engine, statistics in sorted(pool_statistics.items()):
+			# Pools sem limite (StaticPool do SQLite) não têm size/overflow
+			if statistics.get(field) is not None:
+				yield f'{name}{formatLabels(("engine",), (engine,))} {statistics[field]}'
+
+
+def renderMetrics(pool_statistics: dict):
+	lines = [*profiling_metrics.render(), *renderPoolMetrics(pool_statistics)]
+	return '\n'.join(lines) + '\n'
+
+
+class ProfilingMiddleware:
+	# ASGI puro: o ContextVar fica visível no endpoint (inclusive nas rotas
+	# síncronas, rodadas no threadpool) e o tempo cobre o corpo inteiro, também
+	# nas respostas em streaming
+	def __init__(self, app):
+		self.app = app
+
+	async def __call__(self, scope, receive, send):
+		if scope['type'] != 'http':
+			return await self.app(scope, receive, send)
+
+		profile = RequestProfile(scope)
+		token = current_profile.set(profile)
+		status_code = 500
+		started = time.perf_counter()
+
+		async def sendWithStatus(message):
+			nonlocal status_code
+			if message['type'] == 'http.response.start':
+				status_code = message['status']
+			await send(message)
+
+		try:
+			await self.app(scope, receive, sendWithStatus)
+		finally:
+			current_profile.reset(token)
+			finishRequest(
+				scope['method'], status_code, time.perf_counter() - started, profile
+			)
+
+
+def finishRequest(method: str, status_code: int, seconds: float, profile):
+	profiling_metrics.recordRequest(
+		method, profile.route, status_code, seconds, profile
+	)
+	repetidas = {
+		shape: count
+		for shape, count in profile.shapes.items()
+		if count > PROFILING_N_PLUS_ONE_THRESHOLD
+	}
+	if repetidas:
+		profiling_metrics.recordNPlusOne(method, profile.route)
+		for shape, count in repetidas.items():
+			logger.warning(
+				'Possível N+1 em %s %s: %s consultas iguais: %s',
+				method,
+				profile.route,
+				count,
+				shape[:500],
+			)
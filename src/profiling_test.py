@@ -0,0 +1,87 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from .database import createAsyncDatabaseEngine, createDatabaseEngine
+from .profiling import (
+	PROFILING_N_PLUS_ONE_THRESHOLD,
+	Histogram,
+	ProfilingMiddleware,
+	renderMetrics,
+	statementShape,
+)
+
+
+def test_statementShape():
+	assert statementShape(
+		'SELECT * FROM vaga\n WHERE id IN (?, ?, ?) AND estado = ?'
+	) == statementShape('SELECT * FROM vaga WHERE id IN (?) AND estado = ?')
+	assert statementShape("SELECT 1 WHERE nome = 'a'") == 'SELECT ? WHERE nome = ?'
+
+
+def test_histogram_render():
+	histogram = Histogram('latencia', 'Latência', ('route',), (0.1, 1))
+	histogram.observe(0.05, '/a')
+	histogram.observe(0.5, '/a')
+	histogram.observe(3, '/a')
+
+	lines = list(histogram.render())
+
+	assert 'latencia_bucket{route="/a",le="0.1"} 1' in lines
+	assert 'latencia_bucket{route="/a",le="1"} 2' in lines
+	assert 'latencia_bucket{route="/a",le="+Inf"} 3' in lines
+	assert 'latencia_count{route="/a"} 3' in lines
+
+
+def make_app():
+	engine = createDatabaseEngine('sqlite:///:memory:', name='profiling_sync')
+	async_engine = createAsyncDatabaseEngine(
+		'sqlite+aiosqlite:///:memory:', name='profiling_async'
+	)
+	app = FastAPI()
+	app.add_middleware(ProfilingMiddleware)
+
+	# Rota síncrona: roda no threadpool e ainda enxerga o perfil da requisição
+	@app.get('/itens/{id_item}')
+	def getItem(id_item: int):
+		with engine.connect() as connection:
+			return {'valor': connection.scalar(text('SELECT :id'), {'id': id_item})}
+
+	@app.get('/laco')
+	async def laco():
+		async with async_engine.connect() as connection:
+			for numero in range(PROFILING_N_PLUS_ONE_THRESHOLD + 1):
+				await connection.execute(text('SELECT :numero'), {'numero': numero})
+		return {}
+
+	return app
+
+
+def test_ProfilingMiddleware(caplog):
+	client = TestClient(make_app())
+	with caplog.at_level(logging.WARNING, logger='src.profiling'):
+		assert client.get('/itens/7').json() == {'valor': 7}
+		assert client.get('/laco').status_code == 200
+
+	metrics = renderMetrics({'profiling_sync': {'checked_out': 0, 'size': None}})
+
+	# Rota pelo template, não pelo path com o id
+	assert (
+		'http_request_duration_seconds_count'
+		'{method="GET",route="/itens/{id_item}",status="200"} 1'
+	) in metrics
+	assert (
+		'http_request_db_queries_bucket{method="GET",route="/itens/{id_item}",le="1"} 1'
+		in metrics
+	)
+	assert (
+		'http_request_db_queries_bucket{method="GET",route="/laco",le="10"} 0'
+	) in metrics
+	assert 'db_n_plus_one_total{method="GET",route="/laco"} 1.0' in metrics
+	assert 'db_pool_checked_out{engine="profiling_sync"} 0' in metrics
+	assert 'db_pool_size{engine="profiling_sync"}' not in metrics
+	assert any(
+		'Possível N+1 em GET /laco' in record.message for record in caplog.records
+	)
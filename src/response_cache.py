@@ -0,0 +1,261 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+import os
+from threading import Lock
+import time
+from urllib.parse import urlencode, urlparse
+
+from fastapi import Response
+
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 512))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 60))
+# Vazio: só o LRU do processo. memory:// compartilha entre instâncias do mesmo
+# processo (testes); redis://host:porta/0 compartilha entre workers (requer redis)
+RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL', '')
+
+# Cada listagem declara de quais tabelas depende; as escritas invalidam a tag
+CACHE_TAG_VAGAS = 'vagas_de_emprego'
+CACHE_TAG_EMPRESAS = 'empresas'
+# Perfis de candidatos (dados e experiências): rankings que incluem candidatos
+# do estado, não só os inscritos
+CACHE_TAG_CANDIDATOS = 'candidatos'
+
+
+def vagaCacheTag(id_vaga_de_emprego: int):
+	# Respostas de uma vaga só (ranking de candidatos): invalidadas pelas
+	# candidaturas e alterações daquela vaga, sem afetar as das outras
+	return f'vaga_de_emprego:{id_vaga_de_emprego}'
+
+
+class CacheBackend(ABC):
+	@abstractmethod
+	def get(self, key: str):
+		pass
+
+	@abstractmethod
+	def set(self, key: str, value: bytes, ttl: float):
+		pass
+
+	@abstractmethod
+	def incr(self, key: str):
+		pass
+
+
+class MemoryCacheBackend(CacheBackend):
+	def __init__(self):
+		self._values = {}
+		self._lock = Lock()
+
+	def get(self, key: str):
+		with self._lock:
+			entry = self._values.get(key)
+			if entry is None:
+				return None
+			expires_at, value = entry
+			if expires_at is not None and expires_at < time.monotonic():
+				del self._values[key]
+				return None
+			return value
+
+	def set(self, key: str, value: bytes, ttl: float):
+		with self._lock:
+			self._values[key] = (time.monotonic() + ttl, value)
+
+	def incr(self, key: str):
+		with self._lock:
+			_, value = self._values.get(key, (None, b'0'))
+			value = str(int(value) + 1).encode()
+			self._values[key] = (None, value)
+			return int(value)
+
+
+class RedisCacheBackend(CacheBackend):
+	def __init__(self, url: str):
+		try:
+			import redis
+		except ImportError as error:
+			raise RuntimeError(
+				'RESPONSE_CACHE_URL usa redis://, mas o pacote redis não está instalado'
+			) from error
+		self._client = redis.Redis.from_url(url)
+
+	def get(self, key: str):
+		return self._client.get(key)
+
+	def set(self, key: str, value: bytes, ttl: float):
+		self._client.set(key, value, px=int(ttl * 1000))
+
+	def incr(self, key: str):
+		return self._client.incr(key)
+
+
+def normalizeParams(params: dict):
+	# Ordem e parâmetros ausentes não mudam a resposta, então não mudam a chave
+	return urlencode(
+		sorted(
+			(name, value.value if isinstance(value, Enum) else value)
+			for name, value in params.items()
+			if value is not None
+		)
+	)
+
+
+class ResponseCache:
+	def __init__(
+		self,
+		maxsize: int,
+		max_bytes: int,
+		ttl: float,
+		backend: CacheBackend = None,
+	):
+		self.maxsize = maxsize
+		self.max_bytes = max_bytes
+		self.ttl = ttl
+		self.backend = backend
+		self.hits = 0
+		self.shared_hits = 0
+		self.misses = 0
+		self.invalidations = 0
+		self.bytes = 0
+		self._entries = OrderedDict()
+		self._generations = {}
+		self._lock = Lock()
+
+	def generation(self, tag: str):
+		if self.backend is not None:
+			return int(self.backend.get(f'geracao:{tag}') or 0)
+		with self._lock:
+			return self._generations.get(tag, 0)
+
+	def key(self, route: str, params: dict, tags: tuple):
+		# A chave leva a geração das tags: invalidar só incrementa a geração, e
+		# uma resposta montada antes da escrita é gravada numa chave que ninguém
+		# mais lê, em vez de sobrescrever a nova
+		geracoes = ','.join(f'{tag}:{self.generation(tag)}' for tag in tags)
+		return f'{route}?{normalizeParams(params)}#{geracoes}'
+
+	def get(self, key: str):
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				expires_at, body = entry
+				if expires_at >= time.monotonic():
+					self._entries.move_to_end(key)
+					self.hits += 1
+					return body
+				self._remove(key)
+
+		body = self.backend.get(key) if self.backend is not None else None
+		with self._lock:
+			if body is None:
+				self.misses += 1
+				return None
+			self.shared_hits += 1
+		self._store(key, body)
+		return body
+
+	def set(self, key: str, body: bytes):
+		self._store(key, body)
+		if self.backend is not None:
+			self.backend.set(key, body, self.ttl)
+
+	def invalidate(self, *tags: str):
+		with self._lock:
+			self.invalidations += 1
+			for tag in tags:
+				self._generations[tag] = self._generations.get(tag, 0) + 1
+			# Entradas das gerações antigas não são mais lidas; sair do LRU já
+			prefixos = tuple(f'{tag}:' for tag in tags)
+			for key in [
+				key
+				for key in self._entries
+				if any(
+					parte.startswith(prefixos)
+					for parte in key.rsplit('#', 1)[1].split(',')
+				)
+			]:
+				self._remove(key)
+		if self.backend is not None:
+			for tag in tags:
+				self.backend.incr(f'geracao:{tag}')
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self.bytes = 0
+			self.hits = 0
+			self.shared_hits = 0
+			self.misses = 0
+			self.invalidations = 0
+
+	def stats(self):
+		with self._lock:
+			hits = self.hits + self.shared_hits
+			total = hits + self.misses
+			return {
+				'hits': self.hits,
+				'shared_hits': self.shared_hits,
+				'misses': self.misses,
+				'hit_ratio': hits / total if total else 0.0,
+				'invalidations': self.invalidations,
+				'size': len(self._entries),
+				'maxsize': self.maxsize,
+				'bytes': self.bytes,
+				'max_bytes': self.max_bytes,
+				'ttl': self.ttl,
+				'shared': self.backend is not None,
+			}
+
+	def _store(self, key: str, body: bytes):
+		if self.maxsize <= 0 or len(body) > self.max_bytes:
+			return
+		with self._lock:
+			self._remove(key)
+			self._entries[key] = (time.monotonic() + self.ttl, body)
+			self.bytes += len(body)
+			while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+				self._remove(next(iter(self._entries)))
+
+	def _remove(self, key: str):
+		entry = self._entries.pop(key, None)
+		if entry is not None:
+			self.bytes -= len(entry[1])
+
+
+def createCacheBackend(url: str = RESPONSE_CACHE_URL):
+	scheme = urlparse(url).scheme
+	if not scheme:
+		return None
+	if scheme == 'memory':
+		return MemoryCacheBackend()
+	if scheme in ('redis', 'rediss'):
+		return RedisCacheBackend(url)
+	raise ValueError(f'RESPONSE_CACHE_URL não suportada: {url}')
+
+
+response_cache = ResponseCache(
+	RESPONSE_CACHE_SIZE,
+	RESPONSE_CACHE_MAX_BYTES,
+	RESPONSE_CACHE_TTL_SECONDS,
+	createCacheBackend(),
+)
+
+
+async def cachedJsonResponse(
+	route: str, params: dict, tags: tuple, adapter, load, cache=response_cache
+):
+	# adapter: TypeAdapter do response_model; o corpo guardado já é o JSON final
+	key = cache.key(route, params, tags)
+	body = cache.get(key)
+	status = 'HIT'
+	if body is None:
+		status = 'MISS'
+		body = adapter.dump_json(
+			adapter.validate_python(await load(), from_attributes=True)
+		)
+		cache.set(key, body)
+	return Response(
+		content=body, media_type='application/json', headers={'X-Cache': status}
+	)
@@ -0,0 +1,102 @@
+import asyncio
+
+from pydantic import TypeAdapter
+import pytest
+
+from .response_cache import (
+	CacheBackend,
+	MemoryCacheBackend,
+	ResponseCache,
+	cachedJsonResponse,
+	normalizeParams,
+)
+from .vaga_de_emprego.schema import OrdenacaoVaga
+
+
+def test_normalizeParams():
+	assert normalizeParams(
+		{'limit': 20, 'estado': 'DF', 'cursor': None, 'ordenacao': OrdenacaoVaga.DATA}
+	) == normalizeParams({'ordenacao': 'data', 'estado': 'DF', 'limit': 20})
+
+
+def test_evicts_by_size_and_bytes():
+	cache = ResponseCache(maxsize=3, max_bytes=10, ttl=60)
+	cache.set('a', b'1234')
+	cache.set('b', b'1234')
+	assert cache.get('a') == b'1234'
+	# Passa do limite de bytes: sai a menos usada recentemente
+	cache.set('c', b'1234')
+	assert cache.get('b') is None
+	assert cache.get('a') == b'1234'
+	assert cache.stats()['bytes'] == 8
+	# Maior que o cache inteiro: não é guardada
+	cache.set('d', b'x' * 11)
+	assert cache.get('d') is None
+
+
+def test_invalidate_changes_key():
+	cache = ResponseCache(maxsize=10, max_bytes=1024, ttl=60)
+	key_vagas = cache.key('vagas', {'limit': 20}, ('vagas',))
+	key_empresas = cache.key('empresas', {}, ('empresas',))
+	cache.set(key_vagas, b'[1]')
+	cache.set(key_empresas, b'[2]')
+
+	cache.invalidate('vagas')
+
+	assert cache.key('vagas', {'limit': 20}, ('vagas',)) != key_vagas
+	assert cache.get(key_vagas) is None
+	assert cache.get(key_empresas) == b'[2]'
+	stats = cache.stats()
+	assert stats['size'] == 1
+	assert stats['invalidations'] == 1
+
+
+def test_shared_backend():
+	backend = MemoryCacheBackend()
+	worker_a = ResponseCache(maxsize=10, max_bytes=1024, ttl=60, backend=backend)
+	worker_b = ResponseCache(maxsize=10, max_bytes=1024, ttl=60, backend=backend)
+	key = worker_a.key('empresas', {}, ('empresas',))
+	worker_a.set(key, b'[]')
+
+	assert worker_b.get(key) == b'[]'
+	assert worker_b.stats()['shared_hits'] == 1
+
+	# Invalidação num worker muda a chave dos outros
+	worker_b.invalidate('empresas')
+	assert worker_a.key('empresas', {}, ('empresas',)) != key
+
+
+def test_incomplete_CacheBackend():
+	class SemIncr(CacheBackend):
+		def get(self, key: str):
+			return None
+
+		def set(self, key: str, value: bytes, ttl: float):
+			pass
+
+	# Falha ao instanciar, não na primeira invalidação
+	with pytest.raises(TypeError):
+		SemIncr()
+
+
+def test_cachedJsonResponse():
+	cache = ResponseCache(maxsize=10, max_bytes=1024, ttl=60)
+	adapter = TypeAdapter(list[int])
+	loads = []
+
+	async def load():
+		loads.append(1)
+		return [1, 2]
+
+	async def scenario():
+		first = await cachedJsonResponse('numeros', {}, ('t',), adapter, load, cache)
+		second = await cachedJsonResponse('numeros', {}, ('t',), adapter, load, cache)
+		return first, second
+
+	first, second = asyncio.run(scenario())
+
+	assert first.headers['X-Cache'] == 'MISS'
+	assert second.headers['X-Cache'] == 'HIT'
+	assert second.body == b'[1,2]'
+	assert len(loads) == 1
+	assert cache.stats()['hit_ratio'] == 0.5
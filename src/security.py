@@ -1,5 +1,12 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import os
+from threading import Lock
+
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
+from pwdlib.exceptions import UnknownHashError
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 SECRET_KEY = os.getenv(
 	'SECRET_KEY', '3451923f1a545ea6fe648d5a2ff6eca91a5522d9652d742df632779c8a75c8ce'
@@ -7,7 +14,30 @@ SECRET_KEY = os.getenv(
 ALGORITHM = os.getenv('ALGORITHM', 'HS256')
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', 30)
 
-password_hash = PasswordHash.recommended()
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 3))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 65536))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 4))
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+
+password_hash = PasswordHash(
+	(
+		Argon2Hasher(
+			time_cost=ARGON2_TIME_COST,
+			memory_cost=ARGON2_MEMORY_COST,
+			parallelism=ARGON2_PARALLELISM,
+		),
+	)
+)
+
+# O argon2 libera o GIL durante o cálculo, então threads bastam para tirar o
+# hashing do event loop
+password_hash_executor = ThreadPoolExecutor(
+	max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+)
+password_hash_pending = 0
+password_hash_lock = Lock()
 
 
 def getPasswordHash(password):
@@ -16,3 +46,42 @@ def getPasswordHash(password):
 
 def verifyPassword(plain_password, hashed_password):
 	return password_hash.verify(plain_password, hashed_password)
+
+
+def verifyAndUpdatePassword(plain_password, hashed_password):
+	try:
+		return password_hash.verify_and_update(plain_password, hashed_password)
+	except UnknownHashError:
+		return False, None
+
+
+async def runPasswordHashTask(function, *args):
+	global password_hash_pending
+	with password_hash_lock:
+		if password_hash_pending >= PASSWORD_HASH_QUEUE_SIZE:
+			raise HTTPException(
+				status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+				detail='Servidor ocupado. Tente novamente em instantes.',
+				headers={'Retry-After': '1'},
+			)
+		password_hash_pending += 1
+	try:
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(password_hash_executor, function, *args)
+	finally:
+		with password_hash_lock:
+			password_hash_pending -= 1
+
+
+async def getPasswordHashAsync(password):
+	return await runPasswordHashTask(getPasswordHash, password)
+
+
+async def verifyPasswordAsync(plain_password, hashed_password):
+	return await runPasswordHashTask(verifyPassword, plain_password, hashed_password)
+
+
+async def verifyAndUpdatePasswordAsync(plain_password, hashed_password):
+	return await runPasswordHashTask(
+		verifyAndUpdatePassword, plain_password, hashed_password
+	)
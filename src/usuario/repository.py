@@ -1,6 +1,8 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from ..auth.cache import usuario_cache
+from ..counters import incrementCounters
 from ..database import getDatabase
 from ..models import Usuario
 
@@ -26,16 +28,22 @@ class UsuarioRepository:
 
 	def createUsuario(new_usuario: Usuario, database: Session = Depends(getDatabase)):
 		database.add(new_usuario)
+		incrementCounters(database, usuarios=1)
 		database.commit()
 		database.refresh(new_usuario)
 		return new_usuario
 
 	def updateUsuario(usuario_data: Usuario, database: Session = Depends(getDatabase)):
-		database.merge(usuario_data)
+		usuario = database.merge(usuario_data)
 		database.commit()
-		return usuario_data
+		usuario_cache.invalidate(usuario_data.email, usuario_data.id)
+		return usuario
 
 	def deleteUsuario(usuario: Usuario, database: Session = Depends(getDatabase)):
 		database.delete(usuario)
+		incrementCounters(
+			database, usuarios=-1, candidatos=-1 if usuario.candidato else 0
+		)
 		database.commit()
+		usuario_cache.invalidate(usuario.email, usuario.id)
 		return True
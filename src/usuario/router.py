@@ -3,8 +3,8 @@ from sqlalchemy.orm import Session
 
 from src.empresa.repository import EmpresaRepository
 
-from ..database import engine, Base, getDatabase
-from ..security import getPasswordHash
+from ..database import getDatabase
+from ..security import getPasswordHashAsync
 from .repository import UsuarioRepository
 from .schema import (
 	AuthResponse,
@@ -25,8 +25,6 @@ from ..auth.repository import (
 	requireAdmin,
 )
 
-Base.metadata.create_all(bind=engine)
-
 router = APIRouter(
 	prefix='/usuarios',
 	tags=['usuarios'],
@@ -34,13 +32,13 @@ router = APIRouter(
 )
 
 
-@router.get('/')
+@router.get('/', response_model=list[UsuarioResponse])
 async def getAllUsuarios(database: Session = Depends(getDatabase)):
 	usuarios = UsuarioRepository.getAllUsuarios(database)
 	return usuarios
 
 
-@router.get('/{id_usuario}')
+@router.get('/{id_usuario}', response_model=UsuarioResponse)
 async def getUsuarioById(id_usuario: str, database: Session = Depends(getDatabase)):
 	usuario = UsuarioRepository.getUsuarioById(id_usuario, database)
 	if not usuario:
@@ -58,7 +56,7 @@ async def createUsuario(
 	if usuario_already_exists:
 		raise HTTPException(status_code=400, detail='Email já registrado')
 	else:
-		usuario_data.senha = getPasswordHash(usuario_data.senha)
+		usuario_data.senha = await getPasswordHashAsync(usuario_data.senha)
 		new_usuario = UsuarioRepository.createUsuario(
 			Usuario(**usuario_data.model_dump()), database
 		)
@@ -99,7 +97,7 @@ async def createUsuarioCandidato(
 	if usuario_already_exists:
 		raise HTTPException(status_code=400, detail='Email já registrado')
 	else:
-		usuario_data.senha = getPasswordHash(usuario_data.senha)
+		usuario_data.senha = await getPasswordHashAsync(usuario_data.senha)
 		new_usuario = UsuarioRepository.createUsuario(
 			Usuario(**usuario_data.model_dump()), database
 		)
@@ -139,7 +137,7 @@ async def createUsuarioGestor(
 			else 'Empresa already registered',
 		)
 	else:
-		usuario_data.senha = getPasswordHash(usuario_data.senha)
+		usuario_data.senha = await getPasswordHashAsync(usuario_data.senha)
 		new_usuario = UsuarioRepository.createUsuario(
 			Usuario(
 				nome=usuario_data.nome,
@@ -170,7 +168,7 @@ async def createUsuarioGestor(
 		}
 
 
-@router.put('/{id_usuario}')
+@router.put('/{id_usuario}', response_model=UsuarioResponse)
 async def updateUsuarioById(
 	id_usuario: int,
 	usuario_data: UsuarioUpdate,
@@ -182,15 +180,18 @@ async def updateUsuarioById(
 			status_code=403, detail='Você não tem permissão para editar este usuário.'
 		)
 	usuario = UsuarioRepository.getUsuarioById(id_usuario, database)
-	if usuario:
-		updated_usuario = UsuarioRepository.updateUsuario(
-			Usuario(id=id_usuario, **usuario_data.model_dump(exclude_unset=True)),
-			database,
-		)
-		return updated_usuario
+	if not usuario:
+		raise HTTPException(status_code=404, detail='Usuário não encontrado')
+	updated_usuario = UsuarioRepository.updateUsuario(
+		Usuario(id=id_usuario, **usuario_data.model_dump(exclude_unset=True)),
+		database,
+	)
+	return updated_usuario
 
 
-@router.delete('/{id_usuario}')
+@router.delete(
+	'/{id_usuario}', status_code=status.HTTP_204_NO_CONTENT, response_class=Response
+)
 async def deleteUsuarioById(
 	id_usuario: int,
 	database: Session = Depends(getDatabase),
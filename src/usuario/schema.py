@@ -34,6 +34,7 @@ class UsuarioUpdate(BaseModel):
 
 class UsuarioResponse(UsuarioBase):
 	id: int
+	ativo: Optional[bool] = None
 
 	class Config:
 		orm_mode = True
@@ -0,0 +1,63 @@
+import codecs
+import csv
+from itertools import islice
+import json
+from pathlib import PurePath
+
+IMPORT_CHUNK_SIZE = 500
+
+
+def readCsvRows(file):
+	# Linhas vêm uma a uma do arquivo enviado; o número é o da linha no arquivo.
+	# Sem io.TextIOWrapper: ele exige readable(), que o SpooledTemporaryFile do
+	# UploadFile só tem a partir do Python 3.11 (a imagem de deploy usa 3.10)
+	reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+	for row in reader:
+		# Célula vazia equivale a campo ausente (descricao é opcional)
+		yield (
+			reader.line_num,
+			{key: value for key, value in row.items() if key and value != ''},
+		)
+
+
+def readNdjsonRows(file):
+	for linha, line in enumerate(file, start=1):
+		if not line.strip():
+			continue
+		try:
+			yield linha, json.loads(line)
+		except ValueError:
+			yield linha, None
+
+
+IMPORT_READERS = {
+	'.csv': readCsvRows,
+	'text/csv': readCsvRows,
+	'.ndjson': readNdjsonRows,
+	'.jsonl': readNdjsonRows,
+	'application/x-ndjson': readNdjsonRows,
+	'application/jsonl': readNdjsonRows,
+}
+
+
+def getImportReader(filename: str, content_type: str):
+	suffix = PurePath(filename or '').suffix.lower()
+	return IMPORT_READERS.get(suffix) or IMPORT_READERS.get(
+		(content_type or '').split(';')[0].strip()
+	)
+
+
+def chunked(linhas, size: int = IMPORT_CHUNK_SIZE):
+	linhas = iter(linhas)
+	while chunk := list(islice(linhas, size)):
+		yield chunk
+
+
+def validationErrors(error):
+	return [
+		{
+			'campo': '.'.join(str(parte) for parte in detalhe['loc']) or None,
+			'mensagem': detalhe['msg'],
+		}
+		for detalhe in error.errors()
+	]
@@ -0,0 +1,143 @@
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..candidato.recomendacao import (
+	REFRESH_BATCH_SIZE,
+	RECOMENDACAO_FEATURES,
+	documentMatrix,
+	localFeatures,
+	normalizeRows,
+	vagaDocument,
+	weighted,
+)
+from ..models import Candidato, Candidatura, Experiencia, VagaDeEmprego
+from ..response_cache import CACHE_TAG_CANDIDATOS, vagaCacheTag
+
+
+def rankingCacheTags(database: Session, ids_candidatos):
+	# Rankings em que o perfil destes candidatos entra: os das vagas a que se
+	# candidataram e todos os que incluem os candidatos do estado. Lido antes do
+	# commit, para valer também quando as candidaturas são removidas em cascata
+	vagas = database.scalars(
+		select(Candidatura.id_vaga_de_emprego)
+		.where(Candidatura.id_candidato.in_(ids_candidatos))
+		.distinct()
+	)
+	return (CACHE_TAG_CANDIDATOS, *(vagaCacheTag(id_vaga) for id_vaga in vagas))
+
+
+def rankingVagaDocument(vaga_de_emprego: VagaDeEmprego):
+	# O nível também entra como texto: casa com "Pleno", "Sênior" nos títulos
+	return [*vagaDocument(vaga_de_emprego), *weighted(vaga_de_emprego.nivel, 1.0)]
+
+
+def perfilDocuments(database: Session, ids: list):
+	# Diferente de candidatoDocuments, não usa o histórico de candidaturas:
+	# todos os inscritos têm esta vaga nele, o que só achataria os scores
+	candidatos = {}
+	documentos = {}
+	for inicio in range(0, len(ids), REFRESH_BATCH_SIZE):
+		lote = ids[inicio : inicio + REFRESH_BATCH_SIZE]
+		for candidato in database.execute(
+			select(
+				Candidato.id_candidato,
+				Candidato.nome,
+				Candidato.titulo_profissional,
+				Candidato.resumo,
+				Candidato.estado,
+				Candidato.cidade,
+			).where(Candidato.id_candidato.in_(lote))
+		):
+			candidatos[candidato.id_candidato] = candidato
+			documentos[candidato.id_candidato] = [
+				*weighted(candidato.titulo_profissional, 2.0),
+				*weighted(candidato.resumo, 0.5),
+				*localFeatures(candidato.estado, candidato.cidade),
+			]
+
+		for experiencia in database.execute(
+			select(
+				Experiencia.id_candidato,
+				Experiencia.cargo,
+				Experiencia.descricao,
+				Experiencia.nome_curso,
+			).where(Experiencia.id_candidato.in_(lote))
+		):
+			documentos[experiencia.id_candidato] += [
+				*weighted(experiencia.cargo, 1.5),
+				*weighted(experiencia.descricao, 0.5),
+				*weighted(experiencia.nome_curso, 1.0),
+			]
+	ids = list(documentos)
+	return ids, [candidatos[id] for id in ids], [documentos[id] for id in ids]
+
+
+def rankCandidatos(
+	vaga_de_emprego: VagaDeEmprego,
+	database: Session,
+	incluir_estado: bool = False,
+	limit: int = 20,
+):
+	inscritos = {
+		candidatura.id_candidato: candidatura
+		for candidatura in database.execute(
+			select(
+				Candidatura.id_candidato,
+				Candidatura.id_candidatura,
+				Candidatura.status,
+			).where(
+				Candidatura.id_vaga_de_emprego == vaga_de_emprego.id_vaga_de_emprego
+			)
+		)
+	}
+	ids = set(inscritos)
+	if incluir_estado:
+		ids.update(
+			database.scalars(
+				select(Candidato.id_candidato).where(
+					Candidato.estado == vaga_de_emprego.estado
+				)
+			)
+		)
+	ids, candidatos, documentos = perfilDocuments(database, sorted(ids))
+	if not ids:
+		return []
+
+	# Uma multiplicação esparsa para todos os candidatos. O IDF vem dos próprios
+	# perfis ranqueados: termos que todos têm pesam pouco na comparação
+	contagens = documentMatrix(documentos)
+	df = np.bincount(contagens.indices, minlength=RECOMENDACAO_FEATURES)
+	idf = sparse.diags((np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32))
+	perfis = normalizeRows(contagens @ idf).tocsr()
+	vaga = normalizeRows(
+		documentMatrix([rankingVagaDocument(vaga_de_emprego)]) @ idf
+	).tocsr()
+	scores = (perfis @ vaga.T).toarray().ravel()
+
+	# Inscritos sempre entram; os demais do estado só com algo em comum
+	elegiveis = np.array([id in inscritos for id in ids]) | (scores > 0)
+	posicoes = np.flatnonzero(elegiveis)
+	if len(posicoes) > limit:
+		melhores = np.argpartition(-scores[posicoes], limit - 1)[:limit]
+		posicoes = posicoes[melhores]
+	posicoes = posicoes[np.argsort(-scores[posicoes], kind='stable')]
+
+	ranking = []
+	for posicao in posicoes:
+		candidato = candidatos[posicao]
+		candidatura = inscritos.get(candidato.id_candidato)
+		ranking.append(
+			{
+				'id_candidato': candidato.id_candidato,
+				'nome': candidato.nome,
+				'titulo_profissional': candidato.titulo_profissional,
+				'estado': candidato.estado,
+				'cidade': candidato.cidade,
+				'score': float(scores[posicao]),
+				'id_candidatura': candidatura.id_candidatura if candidatura else None,
+				'status': candidatura.status if candidatura else None,
+			}
+		)
+	return ranking
@@ -1,14 +1,202 @@
+from datetime import date
+from enum import Enum
+
 from fastapi import Depends
-from sqlalchemy.orm import Session, joinedload
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from ..candidato.recomendacao import (
+	PENDENTE_CANDIDATO,
+	PENDENTE_VAGA,
+	markRecomendacoesPendentes,
+)
+from ..candidato.statistics import rebuildCandidatoStatistics
+from ..counters import incrementCounters
 from ..database import getDatabase
-from ..models import VagaDeEmprego
+from ..models import Candidatura, CandidatoRecomendacao, Empresa, VagaDeEmprego
+from ..pagination import decodeCursor, encodeCursor
+from ..response_cache import CACHE_TAG_VAGAS, response_cache, vagaCacheTag
+from .importer import chunked, validationErrors
+from .salario import salarioColumns
+from .schema import OrdenacaoVaga, VagaDeEmpregoBase
+from .search import (
+	indexVagaDeEmprego,
+	indexVagasDeEmprego,
+	searchVagaDeEmpregoIds,
+	searchVagaDeEmpregoIdsAsync,
+	unindexVagaDeEmprego,
+)
+
+
+VAGA_DE_EMPREGO_RESUMO_COLUMNS = (
+	VagaDeEmprego.id_vaga_de_emprego,
+	VagaDeEmprego.id_empresa,
+	VagaDeEmprego.nome_vaga_de_emprego,
+	VagaDeEmprego.data,
+	VagaDeEmprego.cidade,
+	VagaDeEmprego.estado,
+	VagaDeEmprego.salario,
+	VagaDeEmprego.cargo,
+	VagaDeEmprego.nivel,
+	VagaDeEmprego.tipo_contrato,
+	VagaDeEmprego.modalidade,
+	VagaDeEmprego.salario_min,
+	VagaDeEmprego.salario_max,
+)
+
+
+def vagasDeEmpregoPageStatement(
+	limit: int,
+	cursor: str = None,
+	ordenacao: OrdenacaoVaga = OrdenacaoVaga.DATA,
+	salario_min: int = None,
+	salario_max: int = None,
+	**filters,
+):
+	# Tuplas de colunas: a listagem não precisa de objetos no identity map
+	statement = select(*VAGA_DE_EMPREGO_RESUMO_COLUMNS)
+	for column, value in filters.items():
+		if value is not None:
+			statement = statement.where(getattr(VagaDeEmprego, column) == value)
+
+	# Faixas que se sobrepõem ao intervalo pedido (valores em centavos)
+	if salario_min is not None:
+		statement = statement.where(VagaDeEmprego.salario_max >= salario_min)
+	if salario_max is not None:
+		statement = statement.where(VagaDeEmprego.salario_min <= salario_max)
+
+	if ordenacao == OrdenacaoVaga.SALARIO:
+		# Maior salário primeiro; vagas sem faixa informada ficam de fora
+		statement = statement.where(VagaDeEmprego.salario_max.is_not(None))
+		sort_key = (VagaDeEmprego.salario_max, VagaDeEmprego.id_vaga_de_emprego)
+		parsers = (int, int)
+	else:
+		sort_key = (VagaDeEmprego.data, VagaDeEmprego.id_vaga_de_emprego)
+		parsers = (date.fromisoformat, int)
+
+	# Keyset: continua a partir da última chave vista, sem OFFSET
+	if cursor:
+		statement = statement.where(
+			tuple_(*sort_key) < tuple_(*decodeCursor(cursor, *parsers))
+		)
+
+	# Busca um registro extra para saber se existe uma próxima página
+	return statement.order_by(*(column.desc() for column in sort_key)).limit(limit + 1)
+
+
+def vagasDeEmpregoPage(
+	vagas_de_emprego: list, limit: int, ordenacao: OrdenacaoVaga = OrdenacaoVaga.DATA
+):
+	next_cursor = None
+	if len(vagas_de_emprego) > limit:
+		vagas_de_emprego = vagas_de_emprego[:limit]
+		last_vaga = vagas_de_emprego[-1]
+		if ordenacao == OrdenacaoVaga.SALARIO:
+			next_cursor = encodeCursor(
+				last_vaga.salario_max, last_vaga.id_vaga_de_emprego
+			)
+		else:
+			next_cursor = encodeCursor(last_vaga.data, last_vaga.id_vaga_de_emprego)
+	return {'items': vagas_de_emprego, 'next_cursor': next_cursor}
+
+
+def searchResults(ranking: list, vagas_de_emprego: list):
+	vagas_by_id = {vaga.id_vaga_de_emprego: vaga for vaga in vagas_de_emprego}
+	return [
+		{'vaga_de_emprego': vagas_by_id[id], 'score': score}
+		for id, score in ranking
+		if id in vagas_by_id
+	]
 
 
 class VagaDeEmpregoRepository:
 	def getAllVagasDeEmprego(database: Session = Depends(getDatabase)):
 		return database.query(VagaDeEmprego).all()
 
+	def getVagasDeEmpregoPage(
+		database: Session,
+		limit: int = 20,
+		cursor: str = None,
+		estado: str = None,
+		cidade: str = None,
+		nivel: str = None,
+		tipo_contrato: str = None,
+		modalidade: str = None,
+		salario_min: int = None,
+		salario_max: int = None,
+		ordenacao: OrdenacaoVaga = OrdenacaoVaga.DATA,
+	):
+		statement = vagasDeEmpregoPageStatement(
+			limit,
+			cursor,
+			ordenacao,
+			salario_min,
+			salario_max,
+			estado=estado,
+			cidade=cidade,
+			nivel=nivel,
+			tipo_contrato=tipo_contrato,
+			modalidade=modalidade,
+		)
+		vagas_de_emprego = database.execute(statement).all()
+		return vagasDeEmpregoPage(vagas_de_emprego, limit, ordenacao)
+
+	async def getVagasDeEmpregoPageAsync(
+		database: AsyncSession,
+		limit: int = 20,
+		cursor: str = None,
+		estado: str = None,
+		cidade: str = None,
+		nivel: str = None,
+		tipo_contrato: str = None,
+		modalidade: str = None,
+		salario_min: int = None,
+		salario_max: int = None,
+		ordenacao: OrdenacaoVaga = OrdenacaoVaga.DATA,
+	):
+		statement = vagasDeEmpregoPageStatement(
+			limit,
+			cursor,
+			ordenacao,
+			salario_min,
+			salario_max,
+			estado=estado,
+			cidade=cidade,
+			nivel=nivel,
+			tipo_contrato=tipo_contrato,
+			modalidade=modalidade,
+		)
+		vagas_de_emprego = (await database.execute(statement)).all()
+		return vagasDeEmpregoPage(vagas_de_emprego, limit, ordenacao)
+
+	def searchVagasDeEmprego(termo: str, database: Session, limit: int = 20):
+		ranking = searchVagaDeEmpregoIds(termo, database, limit)
+		if not ranking:
+			return []
+		vagas_de_emprego = database.execute(
+			select(*VAGA_DE_EMPREGO_RESUMO_COLUMNS).where(
+				VagaDeEmprego.id_vaga_de_emprego.in_([id for id, _ in ranking])
+			)
+		)
+		return searchResults(ranking, vagas_de_emprego)
+
+	async def searchVagasDeEmpregoAsync(
+		termo: str, database: AsyncSession, limit: int = 20
+	):
+		ranking = await searchVagaDeEmpregoIdsAsync(termo, database, limit)
+		if not ranking:
+			return []
+		vagas_de_emprego = (
+			await database.execute(
+				select(*VAGA_DE_EMPREGO_RESUMO_COLUMNS).where(
+					VagaDeEmprego.id_vaga_de_emprego.in_([id for id, _ in ranking])
+				)
+			)
+		).all()
+		return searchResults(ranking, vagas_de_emprego)
+
 	def getAllVagasDeEmpregoComEmpresas(database: Session = Depends(getDatabase)):
 		return (
 			database.query(VagaDeEmprego)
@@ -16,12 +204,18 @@ class VagaDeEmpregoRepository:
 			.all()
 		)
 
+	async def getAllVagasDeEmpregoComEmpresasAsync(database: AsyncSession):
+		result = await database.execute(
+			select(VagaDeEmprego).options(joinedload(VagaDeEmprego.empresa))
+		)
+		return result.scalars().all()
+
 	def getVagaDeEmpregoById(
 		id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
 	):
 		vaga_de_emprego = (
 			database.query(VagaDeEmprego)
-			.filter(id_vaga_de_emprego == id_vaga_de_emprego)
+			.filter(VagaDeEmprego.id_vaga_de_emprego == id_vaga_de_emprego)
 			.first()
 		)
 		return vaga_de_emprego
@@ -37,6 +231,27 @@ class VagaDeEmpregoRepository:
 		)
 		return vaga_de_emprego
 
+	async def getVagaDeEmpregoWithEmpresaByIdAsync(
+		id_vaga_de_emprego: int, database: AsyncSession
+	):
+		result = await database.execute(
+			select(VagaDeEmprego)
+			.options(joinedload(VagaDeEmprego.empresa))
+			.where(VagaDeEmprego.id_vaga_de_emprego == id_vaga_de_emprego)
+		)
+		return result.scalars().first()
+
+	async def getVagaDeEmpregoVersaoAsync(
+		id_vaga_de_emprego: int, database: AsyncSession
+	):
+		# Versões da vaga e da empresa embutida na resposta, sem carregar as linhas
+		result = await database.execute(
+			select(VagaDeEmprego.versao, Empresa.versao.label('versao_empresa'))
+			.outerjoin(Empresa, Empresa.id_empresa == VagaDeEmprego.id_empresa)
+			.where(VagaDeEmprego.id_vaga_de_emprego == id_vaga_de_emprego)
+		)
+		return result.first()
+
 	# def getVagaDeEmpregoByEmpresaId(
 	#     id_empresa: int, database: Session = Depends(getDatabase), limit: int = None
 	# ):
@@ -63,23 +278,177 @@ class VagaDeEmpregoRepository:
 
 		return vaga_de_emprego
 
+	async def getVagaDeEmpregoByEmpresaIdAsync(
+		id_empresa: int, database: AsyncSession, limit: int = None
+	):
+		statement = select(*VagaDeEmprego.__table__.columns).where(
+			VagaDeEmprego.id_empresa == id_empresa
+		)
+		if limit:
+			statement = statement.limit(limit)
+		result = await database.execute(statement)
+		return result.all()
+
 	def createVagaDeEmprego(
 		new_vaga_de_emprego: VagaDeEmprego, database: Session = Depends(getDatabase)
 	):
+		for column, value in salarioColumns(new_vaga_de_emprego.salario).items():
+			setattr(new_vaga_de_emprego, column, value)
 		database.add(new_vaga_de_emprego)
+		database.flush()
+		indexVagaDeEmprego(new_vaga_de_emprego, database)
+		incrementCounters(database, vagas=1)
+		markRecomendacoesPendentes(
+			database, PENDENTE_VAGA, [new_vaga_de_emprego.id_vaga_de_emprego]
+		)
 		database.commit()
+		response_cache.invalidate(CACHE_TAG_VAGAS)
 		return new_vaga_de_emprego
 
+	def importVagasDeEmprego(linhas, database: Session):
+		# linhas: pares (número da linha, dados) lidos sob demanda do arquivo.
+		# Cada lote valida, insere num executemany e faz commit próprio
+		total = 0
+		importadas = 0
+		erros = []
+		for chunk in chunked(linhas):
+			total += len(chunk)
+			validas = []
+			for linha, dados in chunk:
+				if dados is None:
+					erros.append(
+						{
+							'linha': linha,
+							'erros': [{'campo': None, 'mensagem': 'JSON inválido'}],
+						}
+					)
+					continue
+				try:
+					vaga_de_emprego = VagaDeEmpregoBase.model_validate(dados)
+				except ValidationError as error:
+					erros.append({'linha': linha, 'erros': validationErrors(error)})
+					continue
+				validas.append((linha, vaga_de_emprego))
+
+			empresas = set(
+				database.scalars(
+					select(Empresa.id_empresa).where(
+						Empresa.id_empresa.in_(
+							{
+								vaga_de_emprego.id_empresa
+								for _, vaga_de_emprego in validas
+							}
+						)
+					)
+				)
+			)
+			valores = []
+			for linha, vaga_de_emprego in validas:
+				if vaga_de_emprego.id_empresa not in empresas:
+					erros.append(
+						{
+							'linha': linha,
+							'erros': [
+								{
+									'campo': 'id_empresa',
+									'mensagem': 'Empresa não encontrada',
+								}
+							],
+						}
+					)
+					continue
+				dados_vaga = {
+					campo: valor.value if isinstance(valor, Enum) else valor
+					for campo, valor in vaga_de_emprego.model_dump().items()
+				}
+				# O schema aceita vaga sem descrição, mas a coluna é NOT NULL
+				if dados_vaga['descricao'] is None:
+					dados_vaga['descricao'] = ''
+				dados_vaga.update(salarioColumns(dados_vaga['salario']))
+				valores.append(dados_vaga)
+			if not valores:
+				continue
+
+			vagas_de_emprego = database.scalars(
+				insert(VagaDeEmprego).returning(VagaDeEmprego), valores
+			).all()
+			indexVagasDeEmprego(vagas_de_emprego, database)
+			incrementCounters(database, vagas=len(vagas_de_emprego))
+			markRecomendacoesPendentes(
+				database,
+				PENDENTE_VAGA,
+				[
+					vaga_de_emprego.id_vaga_de_emprego
+					for vaga_de_emprego in vagas_de_emprego
+				],
+			)
+			database.commit()
+			response_cache.invalidate(CACHE_TAG_VAGAS)
+			importadas += len(vagas_de_emprego)
+
+		return {
+			'linhas': total,
+			'importadas': importadas,
+			'rejeitadas': len(erros),
+			'erros': erros,
+		}
+
 	def deleteVagaDeEmprego(
 		vaga_de_emprego: VagaDeEmprego, database: Session = Depends(getDatabase)
 	):
+		# As candidaturas da vaga são removidas em cascata pelo ORM, e as
+		# notificações perdem a referência. Carregadas antes em número fixo de
+		# consultas, para o flush não buscar as notificações de cada candidatura
+		database.scalars(
+			select(VagaDeEmprego)
+			.where(
+				VagaDeEmprego.id_vaga_de_emprego == vaga_de_emprego.id_vaga_de_emprego
+			)
+			.options(
+				selectinload(VagaDeEmprego.candidaturas).selectinload(
+					Candidatura.notificacoes
+				),
+				selectinload(VagaDeEmprego.notificacoes),
+			)
+		).all()
+		candidatos = [
+			candidatura.id_candidato for candidatura in vaga_de_emprego.candidaturas
+		]
+		# As recomendações da vaga caem em cascata; quem a tinha na lista é
+		# recalculado para completar o top-K
+		markRecomendacoesPendentes(
+			database,
+			PENDENTE_CANDIDATO,
+			database.scalars(
+				select(CandidatoRecomendacao.id_candidato).where(
+					CandidatoRecomendacao.id_vaga_de_emprego
+					== vaga_de_emprego.id_vaga_de_emprego
+				)
+			).all(),
+		)
 		database.delete(vaga_de_emprego)
+		unindexVagaDeEmprego(vaga_de_emprego.id_vaga_de_emprego, database)
+		incrementCounters(database, vagas=-1, candidaturas=-len(candidatos))
+		if candidatos:
+			database.flush()
+			rebuildCandidatoStatistics(database, list(set(candidatos)))
 		database.commit()
+		response_cache.invalidate(
+			CACHE_TAG_VAGAS, vagaCacheTag(vaga_de_emprego.id_vaga_de_emprego)
+		)
 		return True
 
 	def updateVagaDeEmprego(
 		vaga_de_emprego: VagaDeEmprego, database: Session = Depends(getDatabase)
 	):
-		database.merge(vaga_de_emprego)
+		for column, value in salarioColumns(vaga_de_emprego.salario).items():
+			setattr(vaga_de_emprego, column, value)
+		indexVagaDeEmprego(database.merge(vaga_de_emprego), database)
+		markRecomendacoesPendentes(
+			database, PENDENTE_VAGA, [vaga_de_emprego.id_vaga_de_emprego]
+		)
 		database.commit()
+		response_cache.invalidate(
+			CACHE_TAG_VAGAS, vagaCacheTag(vaga_de_emprego.id_vaga_de_emprego)
+		)
 		return vaga_de_emprego
@@ -1,16 +1,60 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from typing import Union
+
+from fastapi import (
+	APIRouter,
+	HTTPException,
+	Depends,
+	File,
+	Header,
+	Query,
+	Response,
+	UploadFile,
+	status,
+)
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..auth.repository import requireAdminGestor, requireGestor
 
-from ..database import engine, Base, getDatabase
+from ..database import getAsyncDatabase, getDatabase
+from ..etag import makeEtag, notModified, setEtag
+from ..response_cache import (
+	CACHE_TAG_CANDIDATOS,
+	CACHE_TAG_EMPRESAS,
+	CACHE_TAG_VAGAS,
+	cachedJsonResponse,
+	vagaCacheTag,
+)
+from .importer import getImportReader
+from .ranking import rankCandidatos
 from .repository import VagaDeEmpregoRepository
-from .schema import VagaDeEmpregoBase, VagaDeEmpregoResponse
+from .salario import SALARIO_MAXIMO
+from .schema import (
+	CandidatoRanqueadoResponse,
+	Modalidade,
+	NivelEnum,
+	OrdenacaoVaga,
+	TipoContrato,
+	VagaDeEmpregoBase,
+	VagaDeEmpregoImportResponse,
+	VagaDeEmpregoPageResponse,
+	VagaDeEmpregoResponse,
+	VagaDeEmpregoSearchResponse,
+	VagaDeEmpregoWithEmpresaResponse,
+)
 from ..models import Gestor, Usuario, VagaDeEmprego
 
 from ..candidatura.repository import CandidaturaRepository
-
-Base.metadata.create_all(bind=engine)
+from ..candidatura.schema import (
+	CamposCandidatura,
+	CandidaturaCompletaPageResponse,
+	CandidaturaInboxPageResponse,
+	Ordem,
+	OrdenacaoCandidatura,
+	Status,
+)
 
 router = APIRouter(
 	prefix='/vagas_de_emprego',
@@ -18,43 +62,131 @@ router = APIRouter(
 	responses={404: {'description': 'Not found'}},
 )
 
+VAGA_DE_EMPREGO_PAGE_ADAPTER = TypeAdapter(VagaDeEmpregoPageResponse)
+VAGAS_DE_EMPREGO_WITH_EMPRESAS_ADAPTER = TypeAdapter(
+	list[VagaDeEmpregoWithEmpresaResponse]
+)
+CANDIDATOS_RANQUEADOS_ADAPTER = TypeAdapter(list[CandidatoRanqueadoResponse])
 
-@router.get('/')
-async def getVagasDeEmprego(database: Session = Depends(getDatabase)):
-	vagas_de_emprego = VagaDeEmpregoRepository.getAllVagasDeEmprego(database)
-	return vagas_de_emprego
 
+@router.get('/', response_model=VagaDeEmpregoPageResponse)
+async def getVagasDeEmprego(
+	database: AsyncSession = Depends(getAsyncDatabase),
+	limit: int = Query(20, ge=1, le=100),
+	cursor: str = Query(None),
+	estado: str = Query(None),
+	cidade: str = Query(None),
+	nivel: NivelEnum = Query(None),
+	tipo_contrato: TipoContrato = Query(None),
+	modalidade: Modalidade = Query(None),
+	salario_min: int = Query(None, ge=0, le=SALARIO_MAXIMO, description='Em centavos'),
+	salario_max: int = Query(None, ge=0, le=SALARIO_MAXIMO, description='Em centavos'),
+	ordenacao: OrdenacaoVaga = Query(OrdenacaoVaga.DATA),
+):
+	params = {
+		'limit': limit,
+		'cursor': cursor,
+		'estado': estado,
+		'cidade': cidade,
+		'nivel': nivel.value if nivel else None,
+		'tipo_contrato': tipo_contrato.value if tipo_contrato else None,
+		'modalidade': modalidade.value if modalidade else None,
+		'salario_min': salario_min,
+		'salario_max': salario_max,
+		'ordenacao': ordenacao,
+	}
+
+	async def load():
+		return await VagaDeEmpregoRepository.getVagasDeEmpregoPageAsync(
+			database, **params
+		)
+
+	return await cachedJsonResponse(
+		'vagas_de_emprego',
+		params,
+		(CACHE_TAG_VAGAS,),
+		VAGA_DE_EMPREGO_PAGE_ADAPTER,
+		load,
+	)
+
+
+@router.get('_com_empresas', response_model=list[VagaDeEmpregoWithEmpresaResponse])
+async def getVagasDeEmpregoWithEmpresas(
+	database: AsyncSession = Depends(getAsyncDatabase),
+):
+	async def load():
+		return await VagaDeEmpregoRepository.getAllVagasDeEmpregoComEmpresasAsync(
+			database
+		)
+
+	# A resposta embute a empresa: depende das duas tabelas
+	return await cachedJsonResponse(
+		'vagas_de_emprego_com_empresas',
+		{},
+		(CACHE_TAG_VAGAS, CACHE_TAG_EMPRESAS),
+		VAGAS_DE_EMPREGO_WITH_EMPRESAS_ADAPTER,
+		load,
+	)
 
-@router.get('_com_empresas')
-async def getVagasDeEmpregoWithEmpresas(database: Session = Depends(getDatabase)):
-	vagas_de_emprego = VagaDeEmpregoRepository.getAllVagasDeEmpregoComEmpresas(database)
-	return vagas_de_emprego
 
+@router.get('/search', response_model=list[VagaDeEmpregoSearchResponse])
+async def searchVagasDeEmprego(
+	q: str = Query(..., min_length=2, max_length=200),
+	database: AsyncSession = Depends(getAsyncDatabase),
+	limit: int = Query(20, ge=1, le=100),
+):
+	resultados = await VagaDeEmpregoRepository.searchVagasDeEmpregoAsync(
+		q, database, limit
+	)
+	return resultados
 
-@router.get('/{id_vaga_de_emprego}')
+
+@router.get('/{id_vaga_de_emprego}', response_model=VagaDeEmpregoWithEmpresaResponse)
 async def getVagaDeEmpregoById(
-	id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
+	id_vaga_de_emprego: int,
+	response: Response,
+	if_none_match: str = Header(None),
+	database: AsyncSession = Depends(getAsyncDatabase),
 ):
-	vagas_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoWithEmpresaById(
-		id_vaga_de_emprego, database
+	if if_none_match:
+		versoes = await VagaDeEmpregoRepository.getVagaDeEmpregoVersaoAsync(
+			id_vaga_de_emprego, database
+		)
+		if versoes is not None:
+			not_modified = notModified(
+				if_none_match,
+				makeEtag('vaga_de_emprego', id_vaga_de_emprego, *versoes),
+			)
+			if not_modified:
+				return not_modified
+	vagas_de_emprego = (
+		await VagaDeEmpregoRepository.getVagaDeEmpregoWithEmpresaByIdAsync(
+			id_vaga_de_emprego, database
+		)
+	)
+	if not vagas_de_emprego:
+		raise HTTPException(status_code=404, detail='Vaga de emprego não encontrado')
+	setEtag(
+		response,
+		makeEtag(
+			'vaga_de_emprego',
+			id_vaga_de_emprego,
+			vagas_de_emprego.versao,
+			vagas_de_emprego.empresa.versao if vagas_de_emprego.empresa else None,
+		),
 	)
 	return vagas_de_emprego
 
 
-@router.get('/empresa/{id_empresa}')
+@router.get('/empresa/{id_empresa}', response_model=list[VagaDeEmpregoResponse])
 async def getVagasDeEmpregoByEmpresaId(
 	id_empresa: int,
-	database: Session = Depends(getDatabase),
+	database: AsyncSession = Depends(getAsyncDatabase),
 	limit: int = Query(None, ge=1, le=5),
 ):
-	if limit:
-		vagas_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaId(
-			id_empresa, database, limit
-		)
-	else:
-		vagas_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaId(
-			id_empresa, database
-		)
+	vagas_de_emprego = await VagaDeEmpregoRepository.getVagaDeEmpregoByEmpresaIdAsync(
+		id_empresa, database, limit
+	)
 	return vagas_de_emprego
 
 
@@ -72,7 +204,36 @@ async def createVagaDeEmprego(
 	return new_vaga_de_emprego
 
 
-@router.delete('/{id_vaga_de_emprego}')
+@router.post('/import', response_model=VagaDeEmpregoImportResponse)
+async def importVagasDeEmprego(
+	arquivo: UploadFile = File(...),
+	database: Session = Depends(getDatabase),
+	current_gestor: Gestor = Depends(requireGestor),
+):
+	reader = getImportReader(arquivo.filename, arquivo.content_type)
+	if reader is None:
+		raise HTTPException(
+			status_code=400,
+			detail='Formato não suportado: envie um arquivo CSV ou NDJSON',
+		)
+	try:
+		# Leitura, validação e inserção bloqueiam: ficam fora do event loop
+		return await run_in_threadpool(
+			VagaDeEmpregoRepository.importVagasDeEmprego,
+			reader(arquivo.file),
+			database,
+		)
+	except UnicodeDecodeError as error:
+		raise HTTPException(
+			status_code=400, detail='Arquivo deve estar codificado em UTF-8'
+		) from error
+
+
+@router.delete(
+	'/{id_vaga_de_emprego}',
+	status_code=status.HTTP_204_NO_CONTENT,
+	response_class=Response,
+)
 async def deleteVagaDeEmpregoById(
 	id_vaga_de_emprego: int,
 	database: Session = Depends(getDatabase),
@@ -89,7 +250,7 @@ async def deleteVagaDeEmpregoById(
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.put('/{id_vaga_de_emprego}')
+@router.put('/{id_vaga_de_emprego}', response_model=VagaDeEmpregoResponse)
 async def updateVagaDeEmpregoById(
 	id_vaga_de_emprego: int,
 	vaga_de_emprego_data: VagaDeEmpregoBase,
@@ -99,22 +260,79 @@ async def updateVagaDeEmpregoById(
 	vaga_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoById(
 		id_vaga_de_emprego, database
 	)
-	if vaga_de_emprego:
-		updated_vaga_de_emprego = VagaDeEmpregoRepository.updateVagaDeEmprego(
-			VagaDeEmprego(
-				id_vaga_de_emprego=id_vaga_de_emprego,
-				**vaga_de_emprego_data.model_dump(),
-			),
-			database,
-		)
-		return updated_vaga_de_emprego
+	if not vaga_de_emprego:
+		raise HTTPException(status_code=404, detail='Vaga de emprego não encontrado')
+	updated_vaga_de_emprego = VagaDeEmpregoRepository.updateVagaDeEmprego(
+		VagaDeEmprego(
+			id_vaga_de_emprego=id_vaga_de_emprego,
+			**vaga_de_emprego_data.model_dump(),
+		),
+		database,
+	)
+	return updated_vaga_de_emprego
 
 
-@router.get('/{id_vaga_de_emprego}/candidaturas')
+@router.get(
+	'/{id_vaga_de_emprego}/candidaturas',
+	response_model=Union[CandidaturaInboxPageResponse, CandidaturaCompletaPageResponse],
+)
 async def getVagaDeEmpregosCandidaturas(
-	id_vaga_de_emprego: int, database: Session = Depends(getDatabase)
+	id_vaga_de_emprego: int,
+	database: AsyncSession = Depends(getAsyncDatabase),
+	limit: int = Query(20, ge=1, le=100),
+	cursor: str = Query(None),
+	status: Status = Query(None),
+	ordenar_por: OrdenacaoCandidatura = Query(OrdenacaoCandidatura.DATA),
+	ordem: Ordem = Query(Ordem.DESC),
+	campos: CamposCandidatura = Query(CamposCandidatura.RESUMO),
 ):
-	candidaturas = CandidaturaRepository.getCandidaturasWithCandidatoByVagaDeEmpregoId(
-		id_vaga_de_emprego, database
+	candidaturas = (
+		await CandidaturaRepository.getCandidaturasByVagaDeEmpregoIdPageAsync(
+			id_vaga_de_emprego,
+			database,
+			limit=limit,
+			cursor=cursor,
+			status=status,
+			ordenar_por=ordenar_por,
+			ordem=ordem,
+			campos=campos,
+		)
 	)
 	return candidaturas
+
+
+@router.get(
+	'/{id_vaga_de_emprego}/ranking', response_model=list[CandidatoRanqueadoResponse]
+)
+async def getRankingCandidatos(
+	id_vaga_de_emprego: int,
+	incluir_estado: bool = Query(False),
+	limit: int = Query(20, ge=1, le=100),
+	database: Session = Depends(getDatabase),
+	current_user: Usuario = Depends(requireAdminGestor),
+):
+	async def load():
+		vaga_de_emprego = VagaDeEmpregoRepository.getVagaDeEmpregoById(
+			id_vaga_de_emprego, database
+		)
+		if not vaga_de_emprego:
+			raise HTTPException(
+				status_code=404, detail='Vaga de emprego não encontrado'
+			)
+		# Montar os perfis e multiplicar as matrizes bloqueia: fora do event loop
+		return await run_in_threadpool(
+			rankCandidatos, vaga_de_emprego, database, incluir_estado, limit
+		)
+
+	# Inscritos: candidaturas e edições dos perfis deles invalidam a vaga. Com
+	# os candidatos do estado, qualquer edição de perfil invalida
+	tags = (vagaCacheTag(id_vaga_de_emprego),)
+	if incluir_estado:
+		tags += (CACHE_TAG_CANDIDATOS,)
+	return await cachedJsonResponse(
+		f'vagas_de_emprego/{id_vaga_de_emprego}/ranking',
+		{'incluir_estado': incluir_estado, 'limit': limit},
+		tags,
+		CANDIDATOS_RANQUEADOS_ADAPTER,
+		load,
+	)
@@ -0,0 +1,97 @@
+import logging
+import re
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..models import VagaDeEmprego
+from ..response_cache import CACHE_TAG_VAGAS, response_cache
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+# R$ 10 milhões, em centavos: bem abaixo do limite da coluna INTEGER (int4)
+SALARIO_MAXIMO = 1_000_000_000
+
+NUMERO = re.compile(r'(\d[\d.,]*)\s*(mil\b|k\b)?', re.IGNORECASE)
+
+
+def parseValor(numero: str, sufixo: str = None):
+	numero = numero.rstrip('.,')
+	# O último separador seguido de 1 ou 2 dígitos é o decimal ("8.000,50",
+	# "8000.00"); os demais separam milhares ("8.000", "1,200,000")
+	match = re.fullmatch(r'([\d.,]*?)[.,](\d{1,2})', numero)
+	if match:
+		inteiro, centavos = match.group(1), match.group(2).ljust(2, '0')
+	else:
+		inteiro, centavos = numero, '00'
+	inteiro = re.sub(r'[.,]', '', inteiro) or '0'
+	valor = int(inteiro) * 100 + int(centavos)
+	if sufixo:
+		valor *= 1000
+	return valor
+
+
+def parseSalario(salario: str):
+	# "8000.00", "R$ 6.000,00 - R$ 7.000,00", "8k a 10k" → (mínimo, máximo) em
+	# centavos. Texto sem números ("A combinar") fica sem faixa
+	valores = [
+		parseValor(numero, sufixo) for numero, sufixo in NUMERO.findall(salario or '')
+	]
+	# Valores absurdos ("25000000", "50 mil mil") não viram faixa: estourariam a
+	# coluna e abortariam o INSERT/UPDATE
+	if not valores or max(valores) > SALARIO_MAXIMO:
+		return None, None
+	return min(valores), max(valores)
+
+
+def salarioColumns(salario: str):
+	salario_min, salario_max = parseSalario(salario)
+	return {'salario_min': salario_min, 'salario_max': salario_max}
+
+
+def backfillSalarios(database: Session, batch_size: int = BACKFILL_BATCH_SIZE):
+	# Percorre por id (keyset) e grava em lotes com commit próprio: pode ser
+	# interrompido e executado de novo sem travar a tabela inteira
+	last_id = 0
+	atualizadas = 0
+	while True:
+		vagas_de_emprego = database.execute(
+			select(VagaDeEmprego.id_vaga_de_emprego, VagaDeEmprego.salario)
+			.where(VagaDeEmprego.id_vaga_de_emprego > last_id)
+			.order_by(VagaDeEmprego.id_vaga_de_emprego)
+			.limit(batch_size)
+		).all()
+		if not vagas_de_emprego:
+			return atualizadas
+		# UPDATE de tabela (executemany) que também incrementa a versão da linha
+		database.execute(
+			update(VagaDeEmprego.__table__)
+			.where(VagaDeEmprego.id_vaga_de_emprego == bindparam('id'))
+			.values(
+				salario_min=bindparam('salario_min'),
+				salario_max=bindparam('salario_max'),
+				versao=VagaDeEmprego.versao + 1,
+			),
+			[
+				{
+					'id': vaga_de_emprego.id_vaga_de_emprego,
+					**salarioColumns(vaga_de_emprego.salario),
+				}
+				for vaga_de_emprego in vagas_de_emprego
+			],
+		)
+		database.commit()
+		response_cache.invalidate(CACHE_TAG_VAGAS)
+		atualizadas += len(vagas_de_emprego)
+		last_id = vagas_de_emprego[-1].id_vaga_de_emprego
+		logger.info('%s vagas atualizadas', atualizadas)
+
+
+if __name__ == '__main__':
+	from ..database import SessionLocal
+
+	logging.basicConfig(level=logging.INFO)
+	with SessionLocal() as database:
+		print(f'{backfillSalarios(database)} vagas com salário recalculado')
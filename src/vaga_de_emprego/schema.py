@@ -25,6 +25,11 @@ class Modalidade(str, Enum):
 	REMOTO = 'Remoto'
 
 
+class OrdenacaoVaga(str, Enum):
+	DATA = 'data'
+	SALARIO = 'salario'
+
+
 class VagaDeEmpregoBase(BaseModel):
 	nome_vaga_de_emprego: str
 	id_empresa: int
@@ -41,7 +46,66 @@ class VagaDeEmpregoBase(BaseModel):
 
 class VagaDeEmpregoResponse(VagaDeEmpregoBase):
 	id_vaga_de_emprego: int
+	salario_min: Optional[int] = None
+	salario_max: Optional[int] = None
 
 
 class VagaDeEmpregoWithEmpresaResponse(VagaDeEmpregoResponse):
 	empresa: EmpresaResponse
+
+
+class VagaDeEmpregoResumoResponse(BaseModel):
+	id_vaga_de_emprego: int
+	id_empresa: int
+	nome_vaga_de_emprego: str
+	data: date
+	estado: str
+	cidade: str
+	salario: str
+	cargo: str
+	nivel: str
+	tipo_contrato: str
+	modalidade: str
+	salario_min: Optional[int] = None
+	salario_max: Optional[int] = None
+
+	model_config = {'from_attributes': True}
+
+
+class VagaDeEmpregoPageResponse(BaseModel):
+	items: list[VagaDeEmpregoResumoResponse]
+	next_cursor: Optional[str] = None
+
+
+class VagaDeEmpregoSearchResponse(BaseModel):
+	vaga_de_emprego: VagaDeEmpregoResumoResponse
+	score: float
+
+
+class CandidatoRanqueadoResponse(BaseModel):
+	id_candidato: int
+	nome: str
+	titulo_profissional: Optional[str] = None
+	estado: Optional[str] = None
+	cidade: Optional[str] = None
+	score: float
+	# Vazios para candidatos do estado que não se inscreveram
+	id_candidatura: Optional[int] = None
+	status: Optional[str] = None
+
+
+class ErroCampo(BaseModel):
+	campo: Optional[str] = None
+	mensagem: str
+
+
+class ErroImportacao(BaseModel):
+	linha: int
+	erros: list[ErroCampo]
+
+
+class VagaDeEmpregoImportResponse(BaseModel):
+	linhas: int
+	importadas: int
+	rejeitadas: int
+	erros: list[ErroImportacao]
@@ -0,0 +1,193 @@
+import re
+import unicodedata
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import Base
+from ..models import VagaDeEmprego
+
+SEARCH_TABLE = 'vaga_de_emprego_busca'
+
+# Palavras muito comuns que não ajudam a ranquear vagas
+STOPWORDS = {
+	'a', 'ao', 'aos', 'as', 'com', 'da', 'das', 'de', 'do', 'dos', 'e', 'em',
+	'na', 'nas', 'no', 'nos', 'o', 'os', 'ou', 'para', 'pela', 'pelo', 'por',
+	'um', 'uma',
+}  # fmt: skip
+
+POSTGRES_DOCUMENT = (
+	"setweight(to_tsvector('portuguese', unaccent(coalesce({nome}, ''))), 'A')"
+	" || setweight(to_tsvector('portuguese', unaccent(coalesce({cargo}, ''))), 'B')"
+	" || setweight(to_tsvector('portuguese', unaccent(coalesce({descricao}, ''))), 'C')"
+)
+
+POSTGRES_DDL = [
+	'CREATE EXTENSION IF NOT EXISTS unaccent',
+	(
+		f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+		' id_vaga_de_emprego INTEGER PRIMARY KEY'
+		' REFERENCES "vagaDeEmprego" (id_vaga_de_emprego) ON DELETE CASCADE,'
+		' documento TSVECTOR NOT NULL)'
+	),
+	(
+		f'CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_documento'
+		f' ON {SEARCH_TABLE} USING GIN (documento)'
+	),
+	(
+		f'INSERT INTO {SEARCH_TABLE} (id_vaga_de_emprego, documento)'
+		' SELECT v.id_vaga_de_emprego, '
+		+ POSTGRES_DOCUMENT.format(
+			nome='v.nome_vaga_de_emprego', cargo='v.cargo', descricao='v.descricao'
+		)
+		+ ' FROM "vagaDeEmprego" v WHERE NOT EXISTS ('
+		f' SELECT 1 FROM {SEARCH_TABLE} b'
+		' WHERE b.id_vaga_de_emprego = v.id_vaga_de_emprego)'
+	),
+]
+
+SQLITE_DDL = [
+	(
+		f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+		' nome_vaga_de_emprego, cargo, descricao,'
+		" tokenize = 'unicode61 remove_diacritics 2')"
+	),
+	(
+		f'INSERT INTO {SEARCH_TABLE} (rowid, nome_vaga_de_emprego, cargo, descricao)'
+		' SELECT id_vaga_de_emprego, nome_vaga_de_emprego, cargo, descricao'
+		' FROM "vagaDeEmprego" WHERE id_vaga_de_emprego NOT IN'
+		f' (SELECT rowid FROM {SEARCH_TABLE})'
+	),
+]
+
+
+def normalizeText(value: str):
+	decomposed = unicodedata.normalize('NFKD', value or '')
+	return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(value: str):
+	return [
+		token
+		for token in re.findall(r'\w+', normalizeText(value))
+		if len(token) > 1 and token not in STOPWORDS
+	]
+
+
+def isPostgres(database):
+	return database.get_bind().dialect.name == 'postgresql'
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def createSearchIndex(target, connection, **kw):
+	if connection.dialect.name == 'postgresql':
+		statements = POSTGRES_DDL
+	elif connection.dialect.name == 'sqlite':
+		statements = SQLITE_DDL
+	else:
+		return
+	for statement in statements:
+		connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, 'before_drop')
+def dropSearchIndex(target, connection, **kw):
+	if connection.dialect.name in ('postgresql', 'sqlite'):
+		connection.execute(text(f'DROP TABLE IF EXISTS {SEARCH_TABLE}'))
+
+
+def indexVagaDeEmprego(vaga_de_emprego: VagaDeEmprego, database: Session):
+	indexVagasDeEmprego([vaga_de_emprego], database)
+
+
+def indexVagasDeEmprego(vagas_de_emprego: list, database: Session):
+	# Um executemany por instrução, qualquer que seja o tamanho do lote
+	values = [
+		{
+			'id': vaga_de_emprego.id_vaga_de_emprego,
+			'nome': vaga_de_emprego.nome_vaga_de_emprego,
+			'cargo': vaga_de_emprego.cargo,
+			'descricao': vaga_de_emprego.descricao,
+		}
+		for vaga_de_emprego in vagas_de_emprego
+	]
+	if not values:
+		return
+	if isPostgres(database):
+		database.execute(
+			text(
+				f'INSERT INTO {SEARCH_TABLE} (id_vaga_de_emprego, documento)'
+				' VALUES (:id, '
+				+ POSTGRES_DOCUMENT.format(
+					nome=':nome', cargo=':cargo', descricao=':descricao'
+				)
+				+ ') ON CONFLICT (id_vaga_de_emprego)'
+				' DO UPDATE SET documento = EXCLUDED.documento'
+			),
+			values,
+		)
+	else:
+		database.execute(
+			text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = :id'),
+			[{'id': value['id']} for value in values],
+		)
+		database.execute(
+			text(
+				f'INSERT INTO {SEARCH_TABLE}'
+				' (rowid, nome_vaga_de_emprego, cargo, descricao)'
+				' VALUES (:id, :nome, :cargo, :descricao)'
+			),
+			values,
+		)
+
+
+def unindexVagaDeEmprego(id_vaga_de_emprego: int, database: Session):
+	column = 'id_vaga_de_emprego' if isPostgres(database) else 'rowid'
+	database.execute(
+		text(f'DELETE FROM {SEARCH_TABLE} WHERE {column} = :id'),
+		{'id': id_vaga_de_emprego},
+	)
+
+
+def searchStatement(termo: str, database, limit: int):
+	tokens = tokenize(termo)
+	if not tokens:
+		return None
+	if isPostgres(database):
+		statement = text(
+			'SELECT id_vaga_de_emprego, ts_rank_cd(documento, consulta) AS score'
+			f' FROM {SEARCH_TABLE},'
+			" to_tsquery('portuguese', :consulta) consulta"
+			' WHERE documento @@ consulta'
+			' ORDER BY score DESC, id_vaga_de_emprego DESC LIMIT :limit'
+		)
+		consulta = ' & '.join(f'{token}:*' for token in tokens)
+	else:
+		# bm25 é menor quanto mais relevante; invertemos para manter "maior é melhor"
+		statement = text(
+			'SELECT rowid AS id_vaga_de_emprego,'
+			f' -bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0) AS score'
+			f' FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :consulta'
+			' ORDER BY score DESC, rowid DESC LIMIT :limit'
+		)
+		consulta = ' '.join(f'"{token}"*' for token in tokens)
+	return statement, {'consulta': consulta, 'limit': limit}
+
+
+def searchVagaDeEmpregoIds(termo: str, database: Session, limit: int = 20):
+	search = searchStatement(termo, database, limit)
+	if search is None:
+		return []
+	rows = database.execute(*search)
+	return [(row.id_vaga_de_emprego, row.score) for row in rows]
+
+
+async def searchVagaDeEmpregoIdsAsync(
+	termo: str, database: AsyncSession, limit: int = 20
+):
+	search = searchStatement(termo, database, limit)
+	if search is None:
+		return []
+	rows = await database.execute(*search)
+	return [(row.id_vaga_de_emprego, row.score) for row in rows]
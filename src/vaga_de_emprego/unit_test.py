@@ -1,13 +1,39 @@
 from datetime import date
+import io
+import json
 import sys
+import tempfile
 from pathlib import Path
 import pytest
+from fastapi import HTTPException
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from ..models import VagaDeEmprego, Empresa
+from ..models import (
+	Candidato,
+	Candidatura,
+	Experiencia,
+	Notificacao,
+	PlatformCounters,
+	Usuario,
+	VagaDeEmprego,
+	Empresa,
+)
+from ..response_cache import (
+	CACHE_TAG_CANDIDATOS,
+	CACHE_TAG_EMPRESAS,
+	CACHE_TAG_VAGAS,
+	response_cache,
+	vagaCacheTag,
+)
+from .importer import getImportReader, readCsvRows, readNdjsonRows
+from .ranking import rankCandidatos
+from .salario import backfillSalarios, parseSalario
 from .repository import VagaDeEmpregoRepository
+from .schema import OrdenacaoVaga, VagaDeEmpregoPageResponse
+from ..candidatura.repository import CandidaturaRepository
 from ..empresa.repository import EmpresaRepository
+from ..experiencia.repository import ExperienciaRepository
 
 
 @pytest.fixture
@@ -126,7 +152,465 @@ def test_deleteVagaDeEmprego(add_empresa, vaga_de_emprego, db):
 	assert db.query(VagaDeEmprego).count() == 0
 
 
+def test_withCandidaturas_deleteVagaDeEmprego(add_empresa, sample_vaga_de_emprego, db):
+	vaga_de_emprego = VagaDeEmpregoRepository.createVagaDeEmprego(
+		sample_vaga_de_emprego, db
+	)
+	add_candidato_ranking(db, 101, 'Desenvolvedor', 'SP')
+	add_candidato_ranking(db, 102, 'Designer', 'SP')
+	CandidaturaRepository.createCandidaturas(
+		[
+			(101, vaga_de_emprego.id_vaga_de_emprego),
+			(102, vaga_de_emprego.id_vaga_de_emprego),
+		],
+		date(2024, 1, 1),
+		db,
+	)
+	candidatura = db.query(Candidatura).filter(Candidatura.id_candidato == 101).one()
+	db.add(
+		Notificacao(
+			id_candidato=101,
+			id_candidatura=candidatura.id_candidatura,
+			id_vaga_de_emprego=vaga_de_emprego.id_vaga_de_emprego,
+			titulo='Aviso',
+			mensagem='Candidatura em análise',
+			data=date(2024, 1, 2),
+		)
+	)
+	db.commit()
+
+	assert VagaDeEmpregoRepository.deleteVagaDeEmprego(vaga_de_emprego, db)
+
+	notificacao = db.query(Notificacao).one()
+	assert db.query(Candidatura).count() == 0
+	assert notificacao.id_candidatura is None
+	assert notificacao.id_vaga_de_emprego is None
+	assert db.get(PlatformCounters, 1).candidaturas == 0
+
+
+def test_writes_invalidate_response_cache(add_empresa, sample_vaga_de_emprego, db):
+	geracao_empresas = response_cache.generation(CACHE_TAG_EMPRESAS)
+
+	geracao = response_cache.generation(CACHE_TAG_VAGAS)
+	VagaDeEmpregoRepository.createVagaDeEmprego(sample_vaga_de_emprego, db)
+	assert response_cache.generation(CACHE_TAG_VAGAS) == geracao + 1
+
+	sample_vaga_de_emprego.salario = '10000.00'
+	VagaDeEmpregoRepository.updateVagaDeEmprego(sample_vaga_de_emprego, db)
+	VagaDeEmpregoRepository.deleteVagaDeEmprego(sample_vaga_de_emprego, db)
+	assert response_cache.generation(CACHE_TAG_VAGAS) == geracao + 3
+	# Escrever vagas não descarta a listagem de empresas
+	assert response_cache.generation(CACHE_TAG_EMPRESAS) == geracao_empresas
+
+
 @pytest.mark.parametrize('vaga_de_emprego', make_vagas_de_emprego())
 def test_nonExistentVagaDeEmprego_deleteVagaDeEmprego(add_empresa, vaga_de_emprego, db):
 	with pytest.raises(Exception):
 		VagaDeEmpregoRepository.deleteVagaDeEmprego(vaga_de_emprego, db)
+
+
+def make_vagas_paginadas(quantidade):
+	return [
+		VagaDeEmprego(
+			id_empresa=1,
+			nome_vaga_de_emprego=f'Vaga {i}',
+			data=date(2023, 10, 1 + i % 3),
+			cidade='São Paulo' if i % 2 else 'Campinas',
+			estado='SP',
+			salario='5000.00',
+			cargo='Desenvolvedor',
+			nivel='Pleno' if i % 2 else 'Senior',
+			tipo_contrato='CLT',
+			modalidade='Remoto',
+			descricao='Descrição longa da vaga.',
+		)
+		for i in range(quantidade)
+	]
+
+
+def test_getVagasDeEmpregoPage(add_empresa, db):
+	for vaga_de_emprego in make_vagas_paginadas(7):
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+
+	vistos = []
+	cursor = None
+	while True:
+		page = VagaDeEmpregoRepository.getVagasDeEmpregoPage(db, limit=3, cursor=cursor)
+		vistos.extend(page['items'])
+		cursor = page['next_cursor']
+		if cursor is None:
+			break
+
+	chaves = [(vaga.data, vaga.id_vaga_de_emprego) for vaga in vistos]
+	assert len(chaves) == 7
+	assert len(set(chaves)) == 7
+	assert chaves == sorted(chaves, reverse=True)
+
+
+def test_rows_getVagasDeEmpregoPage(add_empresa, db):
+	for vaga_de_emprego in make_vagas_paginadas(2):
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+	db.expunge_all()
+
+	page = VagaDeEmpregoRepository.getVagasDeEmpregoPage(db, limit=5)
+	response = VagaDeEmpregoPageResponse.model_validate(page)
+
+	# A listagem lê tuplas de colunas, sem carregar VagaDeEmprego na sessão
+	assert len(db.identity_map) == 0
+	assert [vaga.id_vaga_de_emprego for vaga in response.items] == [
+		vaga.id_vaga_de_emprego for vaga in page['items']
+	]
+	assert 'descricao' not in response.items[0].model_dump()
+
+
+def test_filters_getVagasDeEmpregoPage(add_empresa, db):
+	for vaga_de_emprego in make_vagas_paginadas(6):
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+
+	page = VagaDeEmpregoRepository.getVagasDeEmpregoPage(
+		db, limit=10, cidade='São Paulo', nivel='Pleno'
+	)
+
+	assert len(page['items']) == 3
+	assert page['next_cursor'] is None
+	assert all(vaga.cidade == 'São Paulo' for vaga in page['items'])
+
+
+def test_invalidCursor_getVagasDeEmpregoPage(db):
+	with pytest.raises(HTTPException) as error:
+		VagaDeEmpregoRepository.getVagasDeEmpregoPage(db, cursor='invalido')
+	assert error.value.status_code == 400
+
+
+def test_searchVagasDeEmprego(add_empresa, db):
+	for vaga_de_emprego in make_vagas_de_emprego():
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+
+	resultados = VagaDeEmpregoRepository.searchVagasDeEmprego('ANALISTA dádos', db)
+
+	assert len(resultados) == 1
+	assert resultados[0]['vaga_de_emprego'].nome_vaga_de_emprego == 'Analista de Dados'
+
+	resultados = VagaDeEmpregoRepository.searchVagasDeEmprego('experiencia', db)
+	assert len(resultados) == 3
+
+
+def test_updateAndDelete_searchVagasDeEmprego(add_empresa, db):
+	vaga_de_emprego = VagaDeEmpregoRepository.createVagaDeEmprego(
+		make_vagas_de_emprego()[0], db
+	)
+	vaga_de_emprego.cargo = 'Arquiteto de Soluções'
+	VagaDeEmpregoRepository.updateVagaDeEmprego(vaga_de_emprego, db)
+
+	assert VagaDeEmpregoRepository.searchVagasDeEmprego('solucoes', db)
+
+	VagaDeEmpregoRepository.deleteVagaDeEmprego(vaga_de_emprego, db)
+
+	assert VagaDeEmpregoRepository.searchVagasDeEmprego('solucoes', db) == []
+
+
+def test_getVagasDeEmpregoPageAsync(run_async_db):
+	async def scenario(database):
+		database.add(
+			Empresa(
+				id_empresa=1,
+				nome_empresa='Empresa G',
+				cnpj='12345671234567',
+				cidade='Gama',
+				estado='DF',
+			)
+		)
+		database.add_all(make_vagas_paginadas(5))
+		await database.commit()
+
+		first_page = await VagaDeEmpregoRepository.getVagasDeEmpregoPageAsync(
+			database, limit=3
+		)
+		second_page = await VagaDeEmpregoRepository.getVagasDeEmpregoPageAsync(
+			database, limit=3, cursor=first_page['next_cursor']
+		)
+		vaga = await VagaDeEmpregoRepository.getVagaDeEmpregoWithEmpresaByIdAsync(
+			first_page['items'][0].id_vaga_de_emprego, database
+		)
+		return first_page, second_page, vaga
+
+	first_page, second_page, vaga = run_async_db(scenario)
+
+	assert len(first_page['items']) == 3
+	assert len(second_page['items']) == 2
+	assert second_page['next_cursor'] is None
+	assert vaga.empresa.nome_empresa == 'Empresa G'
+
+
+CSV_IMPORT = (
+	'nome_vaga_de_emprego,id_empresa,data,estado,cidade,salario,cargo,nivel,'
+	'tipo_contrato,modalidade,descricao\n'
+	'Desenvolvedor Python,1,2024-05-01,DF,Gama,9000.00,Desenvolvedor,Pleno,CLT,'
+	'Remoto,"Vaga com Python, FastAPI"\n'
+	'Sem nível,1,2024-05-01,DF,Gama,9000.00,Desenvolvedor,,CLT,Remoto,\n'
+	'Outra empresa,99,2024-05-01,DF,Gama,9000.00,Analista,Junior,CLT,Remoto,\n'
+	'Analista de Dados,1,2024-05-02,SP,São Paulo,7000.00,Analista,Junior,Estagio,'
+	'Híbrido,\n'
+)
+
+
+def test_csv_importVagasDeEmprego(add_empresa, db):
+	arquivo = io.BytesIO(CSV_IMPORT.encode())
+
+	relatorio = VagaDeEmpregoRepository.importVagasDeEmprego(readCsvRows(arquivo), db)
+
+	assert relatorio['linhas'] == 4
+	assert relatorio['importadas'] == 2
+	assert [erro['linha'] for erro in relatorio['erros']] == [3, 4]
+	assert relatorio['erros'][0]['erros'][0]['campo'] == 'nivel'
+	assert relatorio['erros'][1]['erros'][0]['campo'] == 'id_empresa'
+	assert not arquivo.closed
+	vaga = db.query(VagaDeEmprego).filter_by(cidade='São Paulo').one()
+	assert vaga.descricao == ''
+	assert vaga.modalidade == 'Híbrido'
+	resultados = VagaDeEmpregoRepository.searchVagasDeEmprego('fastapi', db)
+	assert [r['vaga_de_emprego'].nome_vaga_de_emprego for r in resultados] == [
+		'Desenvolvedor Python'
+	]
+
+
+def test_ndjson_importVagasDeEmprego(add_empresa, db):
+	vaga = {
+		'nome_vaga_de_emprego': 'Engenheiro de Dados',
+		'id_empresa': 1,
+		'data': '2024-05-01',
+		'estado': 'DF',
+		'cidade': 'Gama',
+		'salario': '12000.00',
+		'cargo': 'Engenheiro',
+		'nivel': 'Senior',
+		'tipo_contrato': 'CLT',
+		'modalidade': 'Presencial',
+	}
+	linhas = [json.dumps(vaga), '', '{"nome_vaga_de_emprego": ', json.dumps(vaga)]
+	arquivo = io.BytesIO('\n'.join(linhas).encode())
+
+	relatorio = VagaDeEmpregoRepository.importVagasDeEmprego(
+		readNdjsonRows(arquivo), db
+	)
+
+	assert relatorio['linhas'] == 3
+	assert relatorio['importadas'] == 2
+	assert relatorio['erros'] == [
+		{'linha': 3, 'erros': [{'campo': None, 'mensagem': 'JSON inválido'}]}
+	]
+	assert db.query(VagaDeEmprego).count() == 2
+
+
+def test_spooledUpload_readCsvRows():
+	# Mesmo tipo de arquivo que o UploadFile entrega ao importador
+	arquivo = tempfile.SpooledTemporaryFile()
+	arquivo.write(
+		'\ufeffnome_vaga_de_emprego,descricao\r\n'
+		'Desenvolvedor Python,"Duas\r\nlinhas"\r\n'
+		'Analista,\r\n'.encode()
+	)
+	arquivo.seek(0)
+
+	linhas = list(readCsvRows(arquivo))
+
+	assert linhas == [
+		(
+			3,
+			{
+				'nome_vaga_de_emprego': 'Desenvolvedor Python',
+				'descricao': 'Duas\r\nlinhas',
+			},
+		),
+		(4, {'nome_vaga_de_emprego': 'Analista'}),
+	]
+	assert not arquivo.closed
+
+
+def test_getImportReader():
+	assert getImportReader('vagas.CSV', None) is readCsvRows
+	assert getImportReader('vagas', 'application/x-ndjson') is readNdjsonRows
+	assert getImportReader('vagas.xlsx', 'application/octet-stream') is None
+
+
+@pytest.mark.parametrize(
+	'salario, faixa',
+	[
+		('8000.00', (800000, 800000)),
+		('6000.00 - 7000.00', (600000, 700000)),
+		('R$ 6.000,00 a R$ 7.500,50', (600000, 750050)),
+		('8k a 10k', (800000, 1000000)),
+		('5 mil', (500000, 500000)),
+		('A combinar', (None, None)),
+		('25000000', (None, None)),
+		('R$ 8.000,00 a R$ 99.999.999.999,00', (None, None)),
+		('10000000', (1000000000, 1000000000)),
+	],
+)
+def test_parseSalario(salario, faixa):
+	assert parseSalario(salario) == faixa
+
+
+def make_vagas_com_salario():
+	salarios = ['3000.00', '5000.00 - 9000.00', 'A combinar', '12000.00', '7000.00']
+	vagas_de_emprego = make_vagas_paginadas(len(salarios))
+	for vaga_de_emprego, salario in zip(vagas_de_emprego, salarios, strict=True):
+		vaga_de_emprego.salario = salario
+	return vagas_de_emprego
+
+
+def test_salario_getVagasDeEmpregoPage(add_empresa, db):
+	for vaga_de_emprego in make_vagas_com_salario():
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+
+	vistos = []
+	cursor = None
+	while True:
+		page = VagaDeEmpregoRepository.getVagasDeEmpregoPage(
+			db, limit=2, cursor=cursor, ordenacao=OrdenacaoVaga.SALARIO
+		)
+		vistos.extend(page['items'])
+		cursor = page['next_cursor']
+		if cursor is None:
+			break
+	faixa = VagaDeEmpregoRepository.getVagasDeEmpregoPage(
+		db, salario_min=600000, salario_max=800000
+	)
+
+	assert [vaga.salario for vaga in vistos] == [
+		'12000.00',
+		'5000.00 - 9000.00',
+		'7000.00',
+		'3000.00',
+	]
+	assert sorted(vaga.salario for vaga in faixa['items']) == [
+		'5000.00 - 9000.00',
+		'7000.00',
+	]
+
+
+def test_backfillSalarios(add_empresa, db):
+	for vaga_de_emprego in make_vagas_com_salario():
+		VagaDeEmpregoRepository.createVagaDeEmprego(vaga_de_emprego, db)
+	db.query(VagaDeEmprego).update({'salario_min': None, 'salario_max': None})
+
+	assert backfillSalarios(db, batch_size=2) == 5
+
+	faixas = {
+		vaga.salario: (vaga.salario_min, vaga.salario_max)
+		for vaga in db.query(VagaDeEmprego).populate_existing()
+	}
+	assert faixas['5000.00 - 9000.00'] == (500000, 900000)
+	assert faixas['A combinar'] == (None, None)
+
+
+def add_candidato_ranking(db, id, titulo, estado, experiencia=None):
+	db.add(
+		Usuario(
+			id=id,
+			nome=f'Candidato {id}',
+			email=f'candidato{id}@example.com',
+			senha='123',
+			papel='candidato',
+		)
+	)
+	db.add(
+		Candidato(
+			id_candidato=id,
+			nome=f'Candidato {id}',
+			email=f'candidato{id}@example.com',
+			titulo_profissional=titulo,
+			estado=estado,
+		)
+	)
+	db.flush()
+	if experiencia:
+		db.add(
+			Experiencia(
+				id_candidato=id,
+				nome_instituicao='Empresa X',
+				cargo=experiencia,
+				periodo_experiencia='2 anos',
+			)
+		)
+	db.flush()
+
+
+def test_rankCandidatos(add_empresa, sample_vaga_de_emprego, db):
+	vaga_de_emprego = VagaDeEmpregoRepository.createVagaDeEmprego(
+		sample_vaga_de_emprego, db
+	)
+	add_candidato_ranking(db, 101, 'Contador', 'SP')
+	add_candidato_ranking(db, 102, 'Desenvolvedor', 'RJ', experiencia='Backend Python')
+	add_candidato_ranking(db, 103, 'Desenvolvedor Backend', 'SP')
+	add_candidato_ranking(db, 104, 'Designer', 'SP')
+	geracao = response_cache.generation(
+		vagaCacheTag(vaga_de_emprego.id_vaga_de_emprego)
+	)
+	CandidaturaRepository.createCandidaturas(
+		[
+			(101, vaga_de_emprego.id_vaga_de_emprego),
+			(102, vaga_de_emprego.id_vaga_de_emprego),
+		],
+		date(2024, 1, 1),
+		db,
+	)
+	assert (
+		response_cache.generation(vagaCacheTag(vaga_de_emprego.id_vaga_de_emprego))
+		== geracao + 1
+	)
+
+	ranking = rankCandidatos(vaga_de_emprego, db)
+	# Só inscritos, inclusive sem nada em comum com a vaga
+	assert [candidato['id_candidato'] for candidato in ranking] == [102, 101]
+	assert ranking[0]['score'] > ranking[1]['score']
+	assert ranking[0]['status'] == 'Pendente'
+
+	ranking = rankCandidatos(vaga_de_emprego, db, incluir_estado=True)
+	# Do mesmo estado entra também quem não se inscreveu
+	ids = [candidato['id_candidato'] for candidato in ranking]
+	assert ids[0] == 103
+	assert set(ids) == {101, 102, 103, 104}
+	assert next(c for c in ranking if c['id_candidato'] == 103)['status'] is None
+
+	assert len(rankCandidatos(vaga_de_emprego, db, incluir_estado=True, limit=1)) == 1
+
+
+def test_perfilWrites_invalidate_ranking(add_empresa, sample_vaga_de_emprego, db):
+	vaga_de_emprego = VagaDeEmpregoRepository.createVagaDeEmprego(
+		sample_vaga_de_emprego, db
+	)
+	tag = vagaCacheTag(vaga_de_emprego.id_vaga_de_emprego)
+	add_candidato_ranking(db, 101, 'Contador', 'SP')
+	add_candidato_ranking(db, 102, 'Designer', 'SP')
+	CandidaturaRepository.createCandidaturas(
+		[(101, vaga_de_emprego.id_vaga_de_emprego)], date(2024, 1, 1), db
+	)
+	geracao = response_cache.generation(tag)
+	geracao_candidatos = response_cache.generation(CACHE_TAG_CANDIDATOS)
+
+	# Perfil de um inscrito muda o ranking da vaga
+	ExperienciaRepository.createExperiencia(
+		Experiencia(
+			id_candidato=101,
+			nome_instituicao='Empresa X',
+			cargo='Desenvolvedor Backend',
+			periodo_experiencia='2 anos',
+		),
+		db,
+	)
+	assert response_cache.generation(tag) == geracao + 1
+	assert response_cache.generation(CACHE_TAG_CANDIDATOS) == geracao_candidatos + 1
+
+	# De quem não se inscreveu, só os rankings com os candidatos do estado
+	ExperienciaRepository.createExperiencia(
+		Experiencia(
+			id_candidato=102,
+			nome_instituicao='Empresa X',
+			cargo='Desenvolvedor',
+			periodo_experiencia='1 ano',
+		),
+		db,
+	)
+	assert response_cache.generation(tag) == geracao + 1
+	assert response_cache.generation(CACHE_TAG_CANDIDATOS) == geracao_candidatos + 2